@@ -0,0 +1,167 @@
+"""
+CAPTCHA detection benchmark on recorded pages
+
+Loads each page in benchmarks/fixtures/captcha (padded with a results grid so
+page.content() costs what it does on courtsportal) and times:
+    probate  - the old dallasprobate.detect_captcha_type (locator counts + 2x page.content())
+    solver   - the old CaptchaSolver.detect_captcha_type (page.content() + locators + regex)
+    engine   - services.captcha.detection.detect_captcha (one page.evaluate)
+and checks the engine's vendor against the fixture's expected result.
+
+Usage:
+    python benchmarks/captcha_detection.py --iterations 50 --rows 2000
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from playwright.sync_api import sync_playwright
+from services.captcha.detection import detect_captcha, detect_captcha_html
+
+FIXTURES_DIR = os.path.join(project_root, 'benchmarks', 'fixtures', 'captcha')
+
+EXPECTED = {
+    'courtsportal_recaptcha_v2.html': 'recaptcha_v2',
+    'recaptcha_v2_iframe.html': 'recaptcha_v2',
+    'recaptcha_v3.html': 'recaptcha_v3',
+    'hcaptcha.html': 'hcaptcha',
+    'hcaptcha_rendered.html': 'hcaptcha',
+    'turnstile.html': 'turnstile',
+    'no_captcha.html': None,
+}
+
+# Site keys that are easy to get wrong (hcaptcha_rendered keeps its key in the iframe's URL fragment)
+EXPECTED_SITE_KEYS = {
+    'hcaptcha.html': 'a5f74b19-9e45-40e0-b45d-47ff91b7a6c2',
+    'hcaptcha_rendered.html': '4c672d35-0701-42b2-88c3-78380b0db560',
+}
+
+
+# ----------------------------------------------------------------------------
+# Previous implementations, kept here for comparison
+# ----------------------------------------------------------------------------
+
+def legacy_probate_detect(page):
+    if page.locator('.g-recaptcha').count() > 0:
+        site_key = page.locator('.g-recaptcha').get_attribute('data-sitekey')
+        return "ReCaptchaV2TaskProxyLess", site_key
+    if page.locator('[data-action]').count() > 0 or 'grecaptcha.execute' in page.content():
+        match = re.search(r'grecaptcha\.execute\(["\']([^"\']+)["\']', page.content())
+        site_key = match.group(1) if match else None
+        return "ReCaptchaV3TaskProxyLess", site_key
+    if page.locator('.h-captcha').count() > 0:
+        site_key = page.locator('.h-captcha').get_attribute('data-sitekey')
+        return "HCaptchaTaskProxyLess", site_key
+    return None, None
+
+
+def legacy_solver_detect(page):
+    page_content = page.content()
+    try:
+        if page.locator('.g-recaptcha').count() > 0:
+            return "ReCaptchaV2TaskProxyLess", page.locator('.g-recaptcha').get_attribute('data-sitekey')
+    except Exception:
+        pass
+    match = re.search(r'class=["\']g-recaptcha["\'][^>]*data-sitekey=["\']([^"\']+)["\']', page_content)
+    if match:
+        return "ReCaptchaV2TaskProxyLess", match.group(1)
+    if 'grecaptcha.execute' in page_content:
+        match = re.search(r'grecaptcha\.execute\(["\']([^"\']+)["\']', page_content)
+        if match:
+            return "ReCaptchaV3TaskProxyLess", match.group(1)
+    try:
+        if page.locator('.h-captcha').count() > 0:
+            return "HCaptchaTaskProxyLess", page.locator('.h-captcha').get_attribute('data-sitekey')
+    except Exception:
+        pass
+    match = re.search(r'class=["\']h-captcha["\'][^>]*data-sitekey=["\']([^"\']+)["\']', page_content)
+    if match:
+        return "HCaptchaTaskProxyLess", match.group(1)
+    return None, None
+
+
+def pad_with_results(html, rows):
+    """Add a courtsportal-sized results grid so DOM serialization isn't free"""
+    grid = ''.join(
+        f'<tr><td>PR-{i:06d}</td><td>SMITH, JOHN {i}</td><td>Probate - Independent Administration</td>'
+        f'<td>OPEN</td><td>01/{(i % 28) + 1:02d}/2023</td></tr>'
+        for i in range(rows)
+    )
+    return html.replace('</body>', f'<table class="padding">{grid}</table></body>')
+
+
+def time_calls(fn, page, iterations):
+    timings = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn(page)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CAPTCHA detection on recorded pages')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=2000, help='Result rows added to each page')
+    args = parser.parse_args()
+
+    print(f"\n⏱️ Median ms per detection ({args.iterations} iterations, {args.rows} padding rows)\n")
+    print(f"  {'page':<32} {'probate':>9} {'solver':>9} {'engine':>9}   engine result")
+    print("  " + "-" * 96)
+
+    totals = {'probate': 0.0, 'solver': 0.0, 'engine': 0.0}
+    failures = 0
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        # Recorded pages only: never load the real captcha scripts
+        page.route('**/*', lambda route: route.abort())
+
+        for filename, expected in EXPECTED.items():
+            with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+                html = f.read()
+
+            page.set_content(pad_with_results(html, args.rows), wait_until='domcontentloaded')
+
+            probate_ms, _ = time_calls(legacy_probate_detect, page, args.iterations)
+            solver_ms, _ = time_calls(legacy_solver_detect, page, args.iterations)
+            engine_ms, captcha = time_calls(detect_captcha, page, args.iterations)
+
+            totals['probate'] += probate_ms
+            totals['solver'] += solver_ms
+            totals['engine'] += engine_ms
+
+            vendor = captcha.vendor if captcha else None
+            html_captcha = detect_captcha_html(html)
+            html_vendor = html_captcha.vendor if html_captcha else None
+            ok = vendor == expected and html_vendor == expected
+            if filename in EXPECTED_SITE_KEYS:
+                ok = ok and captcha.site_key == html_captcha.site_key == EXPECTED_SITE_KEYS[filename]
+            failures += 0 if ok else 1
+
+            label = f"{captcha.task_type} {captcha.site_key} {captcha.action or ''}" if captcha else 'none'
+            print(f"  {filename:<32} {probate_ms:9.2f} {solver_ms:9.2f} {engine_ms:9.2f}   "
+                  f"{'✓' if ok else '✗'} {label}")
+
+        browser.close()
+
+    print("  " + "-" * 96)
+    print(f"  {'total':<32} {totals['probate']:9.2f} {totals['solver']:9.2f} {totals['engine']:9.2f}")
+    print(f"\n  Engine is {totals['probate'] / totals['engine']:.1f}x faster than the probate detector, "
+          f"{totals['solver'] / totals['engine']:.1f}x faster than the solver detector")
+    if failures:
+        print(f"  ✗ {failures} page(s) detected incorrectly")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+CAPTCHA load benchmark against the local mock CapSolver
+
+Drives 50+ concurrent probate-style workers (take owner -> get token -> submit
+search) through each CAPTCHA strategy and reports end-to-end search latency
+and how many CapSolver requests it cost:
+
+    legacy  - dallasprobate.solve_captcha per worker (requests + 3s polling)
+    solver  - CaptchaSolver.solve_async per search in one event loop
+    broker  - dallasprobate's broker process + BrokerClient over manager queues
+    pool    - broker process with the pre-solved token pool
+
+The browser part of each search is simulated with --search-time; everything
+on the CAPTCHA path is the production code.
+
+Usage:
+    python benchmarks/captcha_load.py --workers 50 --searches 500 --solve-time lognormal:8,0.4
+    python benchmarks/captcha_load.py --modes broker,pool --solve-error-rate 0.05 --http-error-rate 0.02
+"""
+
+import os
+import sys
+import time
+import queue
+import asyncio
+import argparse
+import statistics
+import threading
+import multiprocessing
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from services.captcha.solver import CaptchaSolver
+from services.captcha.broker import broker_process, BrokerClient
+from services.captcha.mock_capsolver import start_mock_capsolver, make_latency
+
+SITE_KEY = "6LfqmHkUAAAAAJhsbpVHyEzVjJhALMMaSoZsD8XK"
+PAGE_URL = "https://courtsportal.dallascounty.org/DALLASPROD/Home/Dashboard/29"
+CAPTCHA_TYPE = "ReCaptchaV2TaskProxyLess"
+
+
+class Results:
+    def __init__(self):
+        self.latencies = []
+        self.token_waits = []
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency, token_wait, ok):
+        with self.lock:
+            self.latencies.append(latency)
+            self.token_waits.append(token_wait)
+            self.failures += 0 if ok else 1
+
+
+def worker_loop(work_queue, get_token, search_time, results):
+    """Same shape as dallasprobate.worker_process: pull owner, solve, submit, parse"""
+    while True:
+        try:
+            work_queue.get_nowait()
+        except queue.Empty:
+            return
+        start = time.monotonic()
+        try:
+            token = get_token()
+        except Exception:
+            token = None
+        token_wait = time.monotonic() - start
+        time.sleep(search_time())  # Submit + wait_for_results + parse
+        results.record(time.monotonic() - start, token_wait, bool(token))
+
+
+def fill_queue(searches):
+    work_queue = queue.Queue()
+    for i in range(searches):
+        work_queue.put(i)
+    return work_queue
+
+
+def run_threads(workers, searches, get_token_factory, search_time):
+    results = Results()
+    work_queue = fill_queue(searches)
+    threads = [
+        threading.Thread(target=worker_loop, args=(work_queue, get_token_factory(i), search_time, results))
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def run_legacy(args, base_url, search_time):
+    from services.scrapers.examples import dallasprobate
+    dallasprobate.CAPSOLVER_BASE_URL = base_url
+    return run_threads(args.workers, args.searches,
+                       lambda i: lambda: dallasprobate.solve_captcha("bench", CAPTCHA_TYPE, SITE_KEY, PAGE_URL),
+                       search_time)
+
+
+def run_solver(args, base_url, search_time):
+    results = Results()
+
+    async def main():
+        solver = CaptchaSolver("bench", base_url=base_url)
+        work_queue = fill_queue(args.searches)
+
+        async def worker():
+            while True:
+                try:
+                    work_queue.get_nowait()
+                except queue.Empty:
+                    return
+                start = time.monotonic()
+                token = await solver.solve_async(CAPTCHA_TYPE, SITE_KEY, PAGE_URL)
+                token_wait = time.monotonic() - start
+                await asyncio.sleep(search_time())
+                results.record(time.monotonic() - start, token_wait, bool(token))
+
+        await asyncio.gather(*[worker() for _ in range(args.workers)])
+        await solver.aclose()
+
+    asyncio.run(main())
+    return results
+
+
+def run_broker(args, base_url, search_time, use_token_pool):
+    manager = multiprocessing.Manager()
+    captcha_requests = manager.Queue()
+    captcha_responses = {i: manager.Queue() for i in range(args.workers)}
+    work_queue = manager.Queue()  # Only read for queue depth by the token pool
+
+    broker = multiprocessing.Process(
+        target=broker_process,
+        args=(captcha_requests, captcha_responses, "bench", base_url),
+        kwargs={'use_token_pool': use_token_pool, 'work_queue': work_queue}
+    )
+    broker.start()
+
+    remaining = args.searches
+    for _ in range(remaining):
+        work_queue.put(1)
+
+    def factory(i):
+        client = BrokerClient(captcha_requests, captcha_responses[i], i)
+
+        def get_token():
+            token = client.solve(CAPTCHA_TYPE, SITE_KEY, PAGE_URL)
+            work_queue.get_nowait()
+            return token
+        return get_token
+
+    results = run_threads(args.workers, args.searches, factory, search_time)
+
+    captcha_requests.put(None)
+    broker.join()
+    manager.shutdown()
+    return results
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the CAPTCHA path against a mock CapSolver')
+    parser.add_argument('--workers', type=int, default=50)
+    parser.add_argument('--searches', type=int, default=500)
+    parser.add_argument('--modes', default='legacy,solver,broker,pool')
+    parser.add_argument('--solve-time', default='lognormal:8,0.4', help='Mock solve latency spec')
+    parser.add_argument('--search-time', default='uniform:1,3', help='Simulated browser time per search')
+    parser.add_argument('--api-latency', default='0.05')
+    parser.add_argument('--create-error-rate', type=float, default=0.0)
+    parser.add_argument('--solve-error-rate', type=float, default=0.0)
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    search_time = make_latency(args.search_time)
+    rows = []
+
+    for mode in args.modes.split(','):
+        server, state, base_url = start_mock_capsolver(
+            solve_time=args.solve_time,
+            api_latency=args.api_latency,
+            create_error_rate=args.create_error_rate,
+            solve_error_rate=args.solve_error_rate,
+            http_error_rate=args.http_error_rate
+        )
+        print(f"\n▶️ {mode}: {args.workers} workers, {args.searches} searches")
+        start = time.monotonic()
+
+        if mode == 'legacy':
+            results = run_legacy(args, base_url, search_time)
+        elif mode == 'solver':
+            results = run_solver(args, base_url, search_time)
+        elif mode in ('broker', 'pool'):
+            results = run_broker(args, base_url, search_time, use_token_pool=(mode == 'pool'))
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+
+        wall = time.monotonic() - start
+        counts = state.counts()
+        server.shutdown()
+
+        rows.append({
+            'mode': mode,
+            'wall_s': wall,
+            'searches_per_min': len(results.latencies) / wall * 60,
+            'mean_s': statistics.mean(results.latencies),
+            'p50_s': percentile(results.latencies, 0.5),
+            'p95_s': percentile(results.latencies, 0.95),
+            'token_wait_s': statistics.mean(results.token_waits),
+            'failures': results.failures,
+            'requests': counts['total'],
+            'create': counts['createTask'],
+            'poll': counts['getTaskResult'],
+            'injected_errors': sum(counts['errors'].values())
+        })
+
+    print("\n" + "=" * 118)
+    print(f"CAPTCHA LOAD: {args.workers} workers, {args.searches} searches, solve {args.solve_time}, "
+          f"search {args.search_time}")
+    print("=" * 118)
+    print(f"  {'mode':<8} {'wall s':>7} {'srch/min':>9} {'mean s':>7} {'p50 s':>6} {'p95 s':>6} {'token s':>8} "
+          f"{'fail':>5} {'requests':>9} {'create':>7} {'poll':>7} {'req/search':>11} {'inj.err':>8}")
+    for r in rows:
+        print(f"  {r['mode']:<8} {r['wall_s']:7.1f} {r['searches_per_min']:9.1f} {r['mean_s']:7.2f} {r['p50_s']:6.2f} "
+              f"{r['p95_s']:6.2f} {r['token_wait_s']:8.2f} {r['failures']:5d} {r['requests']:9d} {r['create']:7d} "
+              f"{r['poll']:7d} {r['requests'] / args.searches:11.2f} {r['injected_errors']:8d}")
+    print("=" * 118)
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('spawn', force=True)
+    main()
@@ -0,0 +1,88 @@
+"""
+CAPTCHA session reuse simulation
+
+Replays the probate worker's CAPTCHA decisions (CaptchaTelemetry +
+SessionReusePolicy) against simulated portals that re-challenge a verified
+session at different rates, and reports solves per 100 searches with reuse
+off (solve every detection) and on.
+
+Usage:
+    python benchmarks/captcha_session_reuse.py --searches 2000 --context-tasks 300
+"""
+
+import os
+import sys
+import random
+import argparse
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from services.captcha.detection import CaptchaInfo
+from services.captcha.telemetry import CaptchaTelemetry, SessionReusePolicy
+
+CAPTCHA = CaptchaInfo('recaptcha_v2', 'ReCaptchaV2TaskProxyLess', '6LfqmHkUAAAAAJhsbpVHyEzVjJhALMMaSoZsD8XK')
+
+# name -> (probability a verified session is challenged again, re-challenge every N searches)
+SITES = {
+    'never re-challenges': (0.0, None),
+    'every 25 searches': (0.0, 25),
+    '5% random': (0.05, None),
+    'always': (1.0, None),
+}
+
+
+def simulate(searches, context_tasks, rechallenge_p, rechallenge_every, policy, seed=1):
+    """Run one worker's searches; returns the telemetry summary"""
+    rng = random.Random(seed)
+    telemetry = CaptchaTelemetry("Sim", 1, policy=policy)
+    context_id = 0
+    since_pass = None  # Site-side: searches since this session last passed
+
+    for i in range(searches):
+        if i % context_tasks == 0:
+            context_id += 1
+            since_pass = None
+
+        def site_accepts(with_token):
+            if with_token:
+                return True
+            if since_pass is None:
+                return False
+            if rechallenge_every and since_pass >= rechallenge_every:
+                return False
+            return rng.random() >= rechallenge_p
+
+        solved = telemetry.should_solve(context_id, CAPTCHA)
+        success = site_accepts(solved)
+        reuse_rejected = False
+        if not success and not solved:
+            reuse_rejected = True
+            solved = success = True
+
+        if solved:
+            since_pass = 0
+        since_pass += 1
+        telemetry.record_search(context_id, CAPTCHA, solved, success, reuse_rejected)
+
+    return telemetry.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate CAPTCHA session reuse')
+    parser.add_argument('--searches', type=int, default=2000)
+    parser.add_argument('--context-tasks', type=int, default=300, help='Searches per browser context')
+    args = parser.parse_args()
+
+    print(f"\n{'site behaviour':<22} {'solves/100 before':>18} {'solves/100 after':>17} {'reuse accepted':>15} {'rejected':>9}")
+    print("-" * 86)
+    for name, (p, every) in SITES.items():
+        before = simulate(args.searches, args.context_tasks, p, every, SessionReusePolicy(enabled=False))
+        after = simulate(args.searches, args.context_tasks, p, every, SessionReusePolicy())
+        print(f"{name:<22} {before['solves_per_100']:>18} {after['solves_per_100']:>17} "
+              f"{after['reuse_accepted']:>15} {after['reuse_rejected']:>9}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
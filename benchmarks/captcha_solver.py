@@ -0,0 +1,101 @@
+"""
+CaptchaSolver throughput against a local mock CapSolver
+
+Compares N solves done the old way (blocking requests.post + time.sleep, one
+after another - what happened when the async Scout modules called solve())
+with N concurrent solve_async() calls sharing one event loop and connection
+pool, and with the sync solve() wrapper called from a thread pool.
+
+Usage:
+    python benchmarks/captcha_solver.py --solves 50 --solve-time 2 --poll-interval 0.5
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from services.captcha.solver import CaptchaSolver
+from services.captcha.mock_capsolver import start_mock_capsolver
+
+SITE_KEY = "6Le-mock-site-key"
+
+
+def blocking_solve(base_url, page_url, poll_interval, timeout=180):
+    """The pre-async implementation: new connection per call, time.sleep between polls"""
+    headers = {"Content-Type": "application/json"}
+    result = requests.post(f"{base_url}/createTask", headers=headers, json={
+        "clientKey": "bench",
+        "task": {"type": "ReCaptchaV2TaskProxyLess", "websiteURL": page_url, "websiteKey": SITE_KEY}
+    }).json()
+    task_id = result["taskId"]
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        time.sleep(poll_interval)
+        data = requests.post(f"{base_url}/getTaskResult", headers=headers,
+                             json={"clientKey": "bench", "taskId": task_id}).json()
+        if data.get("status") == "ready":
+            return data["solution"]["gRecaptchaResponse"]
+    return None
+
+
+async def run_async(solver, solves):
+    results = await asyncio.gather(*[
+        solver.solve_async("ReCaptchaV2TaskProxyLess", SITE_KEY, f"https://county.example/{i}")
+        for i in range(solves)
+    ])
+    await solver.aclose()
+    return results
+
+
+def report(label, elapsed, tokens, solves):
+    ok = len([t for t in tokens if t])
+    print(f"  {label:<22} {elapsed:7.2f}s  {ok}/{solves} solved  {solves / elapsed:6.1f} solves/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CaptchaSolver against a mock CapSolver')
+    parser.add_argument('--solves', type=int, default=50)
+    parser.add_argument('--solve-time', type=float, default=2.0)
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    parser.add_argument('--skip-blocking', action='store_true', help='Skip the slow serial baseline')
+    args = parser.parse_args()
+
+    server, state, base_url = start_mock_capsolver(solve_time=args.solve_time)
+    print(f"\n⏱️ {args.solves} solves, mock solve time {args.solve_time}s, poll every {args.poll_interval}s\n")
+    print("=" * 70)
+
+    if not args.skip_blocking:
+        start = time.perf_counter()
+        tokens = [blocking_solve(base_url, f"https://county.example/{i}", args.poll_interval)
+                  for i in range(args.solves)]
+        report('blocking (serial)', time.perf_counter() - start, tokens, args.solves)
+
+    solver = CaptchaSolver("bench", base_url=base_url, poll_interval=args.poll_interval)
+    start = time.perf_counter()
+    tokens = asyncio.run(run_async(solver, args.solves))
+    report('solve_async (gather)', time.perf_counter() - start, tokens, args.solves)
+
+    solver = CaptchaSolver("bench", base_url=base_url, poll_interval=args.poll_interval)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.solves) as pool:
+        tokens = list(pool.map(
+            lambda i: solver.solve("ReCaptchaV2TaskProxyLess", SITE_KEY, f"https://county.example/{i}"),
+            range(args.solves)
+        ))
+    report('solve (threads)', time.perf_counter() - start, tokens, args.solves)
+
+    print("=" * 70)
+    print(f"  Mock saw {state.create_calls} createTask / {state.result_calls} getTaskResult calls")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Page description per exploration step: locator-based extractor vs single-evaluate digest
+
+Serves two county-style pages locally - a plain search form and a heavy
+ASP.NET-style results page (layout tables, hidden viewstate, big dropdowns,
+navigation, a 50-row results grid) - and times how long each approach takes
+to describe them and how large the resulting ELEMENTS prompt section is.
+
+Usage:
+    python benchmarks/page_digest.py --runs 5
+    python benchmarks/page_digest.py --show     # print the digest text too
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from playwright.sync_api import sync_playwright
+from services.scout.page_digest import get_page_digest, extract_targeted_html, format_targeted_html_for_prompt
+
+SIMPLE_PAGE = """
+<html><body>
+<h1>Probate Case Search</h1>
+<form id="search" action="/results" method="get">
+  <label for="last">Last name</label> <input id="last" name="last">
+  <label for="first">First name</label> <input id="first" name="first">
+  <button type="submit">Search</button>
+</form>
+</body></html>
+"""
+
+
+def heavy_page():
+    nav = "".join(f"<a href='/page{i}'>Section {i}</a> " for i in range(80))
+    courts = "".join(f"<option value='C{i}'>County Court at Law No. {i}</option>" for i in range(40))
+    years = "".join(f"<option>{y}</option>" for y in range(1950, 2026))
+    rows = "".join(
+        f"<tr><td><a href='/case?id={i}' id='gvResults_lnkCase_{i}'>PR-24-{i:05d}</a></td>"
+        f"<td>SMITH, JOHN {chr(65 + i % 26)}</td><td>Probate</td><td>2024-0{1 + i % 9}-1{i % 10}</td>"
+        f"<td>{'OPEN' if i % 3 else 'CLOSED'}</td><td>County Court at Law No. {1 + i % 5}</td></tr>"
+        for i in range(50)
+    )
+    return f"""
+<html><body><form id="aspnetForm" method="post" action="./Search.aspx">
+<input type="hidden" name="__VIEWSTATE" value="{'x' * 20000}">
+<input type="hidden" name="__EVENTVALIDATION" value="{'y' * 2000}">
+<table class="layout" width="100%"><tr><td>{nav}</td></tr><tr><td>
+  <table class="layout"><tr><td>Last Name:</td><td><input name="ctl00$Main$txtLast" id="ctl00_Main_txtLast" value="SMITH"></td></tr>
+  <tr><td>First Name:</td><td><input name="ctl00$Main$txtFirst" id="ctl00_Main_txtFirst" value="JOHN"></td></tr>
+  <tr><td>Middle:</td><td><input name="ctl00$Main$txtMiddle" id="ctl00_Main_txtMiddle"></td></tr>
+  <tr><td>Case Number:</td><td><input name="ctl00$Main$txtCase" id="ctl00_Main_txtCase"></td></tr>
+  <tr><td>Court:</td><td><select name="ctl00$Main$ddlCourt" id="ctl00_Main_ddlCourt">{courts}</select></td></tr>
+  <tr><td>Filed From:</td><td><select name="ctl00$Main$ddlFrom">{years}</select></td></tr>
+  <tr><td>Filed To:</td><td><select name="ctl00$Main$ddlTo">{years}</select></td></tr>
+  <tr><td>Party Type:</td><td><input type="radio" name="party" id="rbDecedent" checked> Decedent
+      <input type="radio" name="party" id="rbAny"> Any party</td></tr>
+  <tr><td></td><td><input type="submit" name="ctl00$Main$btnSearch" value="Search" id="ctl00_Main_btnSearch">
+      <input type="submit" name="ctl00$Main$btnClear" value="Clear" id="ctl00_Main_btnClear"></td></tr></table>
+</td></tr></table>
+<table id="ctl00_Main_gvResults" class="grid">
+<thead><tr><th>Case Number</th><th>Style</th><th>Type</th><th>Filed</th><th>Status</th><th>Court</th></tr></thead>
+<tbody>{rows}</tbody></table>
+</form></body></html>
+"""
+
+
+PAGES = {'simple': SIMPLE_PAGE.encode(), 'heavy': heavy_page().encode()}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.end_headers()
+        self.wfile.write(PAGES.get(self.path.strip('/'), PAGES['simple']))
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(fn, runs):
+    times, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark page description for exploration prompts')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--show', action='store_true', help='Print the digest text')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/"
+
+    print(f"\n⏱️ Median of {args.runs} runs per page\n")
+    print("=" * 78)
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        for name in PAGES:
+            page.goto(base + name)
+            legacy_ms, legacy_text = timed(lambda: format_targeted_html_for_prompt(extract_targeted_html(page)), args.runs)
+            digest_ms, digest = timed(lambda: get_page_digest(page), args.runs)
+            print(f"  {name:<7} locators: {legacy_ms:8.0f}ms {len(legacy_text):6d} chars (~{len(legacy_text) // 4} tok)")
+            print(f"  {'':<7} digest:   {digest_ms:8.0f}ms {len(digest['text']):6d} chars (~{len(digest['text']) // 4} tok)"
+                  f"  {legacy_ms / digest_ms:.0f}x faster"
+                  f"{'  [truncated]' if digest['truncated'] else ''}")
+            if args.show:
+                print("\n" + digest['text'] + "\n")
+        browser.close()
+    print("=" * 78)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
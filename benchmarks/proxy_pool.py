@@ -0,0 +1,205 @@
+"""
+ProxyPool and ManagedBrowser proxy routing against local mock proxies
+
+Starts a local "county site" and two local forward proxies (one healthy with
+credentials, one that bans every request), then checks:
+  - acquire() honors the county requirements and returns None for direct counties
+  - report() retires the banning proxy and cost_report() adds up
+  - a ManagedBrowser for a proxied county really sends its traffic through the pool
+    and switches proxy when report_result() retires the current one
+  - a ManagedBrowser for a direct county launches without the per-context
+    placeholder and reaches the site without touching any proxy
+
+Usage:
+    python benchmarks/proxy_pool.py
+    python benchmarks/proxy_pool.py --no-browser   # Pool checks only
+"""
+
+import os
+import sys
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from services.proxy.pool import Proxy, ProxyPool, ProxyRequirements, NoProxyAvailable
+from services.proxy.mock_proxy import start_mock_proxy
+
+# Only the mock proxies resolve this name, so a page that loads proves it went through one
+SITE_HOST = 'county.test'
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = f"<html><body><h1>Records search</h1><p id='path'>{self.path}</p></body></html>".encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Checks:
+    def __init__(self):
+        self.failed = 0
+
+    def check(self, name: str, ok: bool, detail: str = ''):
+        print(f"   {'✅' if ok else '❌'} {name}{f' ({detail})' if detail else ''}")
+        self.failed += 0 if ok else 1
+
+
+def check_pool(checks: Checks, pool: ProxyPool, good: Proxy, bad: Proxy, good_state, bad_state, site_url: str):
+    print("\n🧪 Pool")
+    direct = ProxyRequirements(label='Direct TX property')
+    residential = ProxyRequirements(requires_proxy=True, blocks_datacenter_ips=True, label='Harris TX probate')
+    any_proxy = ProxyRequirements(requires_proxy=True, proxy_type='datacenter', cost_per_request=0.002,
+                                  label='Travis TX tax')
+
+    checks.check("acquire() returns None when the county needs no proxy", pool.acquire(direct) is None)
+
+    proxy = pool.acquire(residential)
+    checks.check("acquire() skips datacenter proxies for blocks_datacenter_ips", proxy is good,
+                 proxy.label if proxy else 'None')
+    pool.release(proxy)
+
+    # Real traffic through each proxy, reported the way the scrapers do
+    for _ in range(3):
+        proxy = pool.acquire(residential)
+        response = pool.session(proxy).get(f"{site_url}/search", timeout=10)
+        pool.report(proxy, residential, success=response.ok, latency=response.elapsed.total_seconds(),
+                    banned=ProxyPool.looks_banned(response.status_code, response.text))
+        pool.release(proxy)
+    checks.check("session() routes requests through the proxy with credentials",
+                 good_state.counts()['requests'] == 3, str(good_state.counts()))
+
+    attempts = 0
+    while not bad.retired and attempts < 10:
+        proxy = pool.acquire(any_proxy)
+        response = pool.session(proxy).get(f"{site_url}/search", timeout=10)
+        pool.report(proxy, any_proxy, success=response.ok,
+                    banned=ProxyPool.looks_banned(response.status_code, response.text))
+        pool.release(proxy)
+        attempts += 1
+    checks.check("report() retires a proxy after max_consecutive_failures bans",
+                 bad.retired and attempts == pool.max_consecutive_failures,
+                 f"{attempts} requests, {bad.retired_reason}")
+    checks.check("Mock counted every ban", bad_state.counts()['injected']['banned'] == attempts)
+
+    try:
+        pool.acquire(any_proxy)
+        checks.check("acquire() raises NoProxyAvailable once every match is retired", False)
+    except NoProxyAvailable:
+        checks.check("acquire() raises NoProxyAvailable once every match is retired", True)
+
+    pool.report(None, direct, success=True)
+    costs = {row['label']: row for row in pool.cost_report()}
+    harris, travis = costs.get(residential.label), costs.get(any_proxy.label)
+    checks.check("cost_report() uses the proxy price when the county has none",
+                 harris and harris['total_cost'] == 0.03 and harris['cost_per_success'] == 0.01, str(harris))
+    checks.check("cost_report() uses the county price and has no cost per success without successes",
+                 travis and travis['total_cost'] == round(0.002 * attempts, 4) and travis['cost_per_success'] is None,
+                 str(travis))
+    checks.check("cost_report() counts direct searches at zero cost",
+                 costs.get(direct.label, {}).get('total_cost') == 0, str(costs.get(direct.label)))
+
+
+def check_browser(checks: Checks, site_url: str, direct_url: str):
+    from playwright.sync_api import sync_playwright
+    from services.scrapers.runtime import ManagedBrowser
+
+    print("\n🧪 ManagedBrowser")
+    banning, ban_state, ban_url = start_mock_proxy(ban_rate=1.0, hosts={SITE_HOST: '127.0.0.1'})
+    healthy, ok_state, ok_url = start_mock_proxy(username='scout', password='secret', hosts={SITE_HOST: '127.0.0.1'})
+    pool = ProxyPool([Proxy(ban_url, 'residential', cost_per_request=0.001),
+                      Proxy(ok_url, 'residential', cost_per_request=0.01)],
+                     max_consecutive_failures=1)
+    # Make the banning proxy the first pick by pretending the healthy one is busy
+    busy = 5
+    pool.proxies[1].in_use = busy
+
+    proxied = ProxyRequirements(requires_proxy=True, label='Harris TX probate')
+    direct = ProxyRequirements(label='Direct TX property')
+
+    with sync_playwright() as p:
+        runtime = ManagedBrowser(p, launch_kwargs={'headless': True}, label="PROXIED",
+                                 proxy_pool=pool, proxy_requirements=proxied)
+        try:
+            checks.check("Proxied county launches with the per-context placeholder",
+                         runtime.launch_kwargs.get('proxy') == {'server': 'per-context'})
+            first = runtime.proxy
+            response = runtime.page.goto(f"{site_url}/first")
+            checks.check("Context traffic goes through the acquired proxy",
+                         response.status == 403 and ban_state.counts()['requests'] >= 1, str(ban_state.counts()))
+
+            runtime.report_result(False, banned=ProxyPool.looks_banned(response.status, runtime.page.content()))
+            checks.check("report_result() retires the proxy and moves to a new context",
+                         first.retired and runtime.proxy is not first and runtime.context_id == 2)
+
+            response = runtime.page.goto(f"{site_url}/second")
+            checks.check("New context reaches the site through the healthy proxy with credentials",
+                         response.ok and runtime.page.inner_text('#path') == '/second'
+                         and ok_state.counts()['requests'] >= 1, str(ok_state.counts()))
+            runtime.report_result(True, latency=0.1)
+        finally:
+            runtime.close()
+
+        before = ok_state.counts()['requests'] + ban_state.counts()['requests']
+        runtime = ManagedBrowser(p, launch_kwargs={'headless': True}, label="DIRECT",
+                                 proxy_pool=pool, proxy_requirements=direct)
+        try:
+            checks.check("Direct county launches without the per-context placeholder",
+                         'proxy' not in runtime.launch_kwargs and runtime.proxy is None)
+            response = runtime.page.goto(f"{direct_url}/direct")
+            after = ok_state.counts()['requests'] + ban_state.counts()['requests']
+            checks.check("Direct county reaches the site without any proxy",
+                         response.ok and after == before, f"{after - before} proxied requests")
+            runtime.report_result(True, latency=0.1)
+        finally:
+            runtime.close()
+
+    checks.check("Every context released its proxy",
+                 pool.proxies[0].in_use == 0 and pool.proxies[1].in_use == busy,
+                 str([proxy.in_use for proxy in pool.proxies]))
+    pool.print_report()
+    banning.shutdown()
+    healthy.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check ProxyPool and per-context proxies against local mock proxies')
+    parser.add_argument('--no-browser', action='store_true', help='Skip the Playwright routing checks')
+    args = parser.parse_args()
+
+    site = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+    site.daemon_threads = True
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+    site_url = f"http://{SITE_HOST}:{site.server_port}"
+    direct_url = f"http://127.0.0.1:{site.server_port}"
+
+    hosts = {SITE_HOST: '127.0.0.1'}
+    good_server, good_state, good_url = start_mock_proxy(username='scout', password='secret', hosts=hosts)
+    bad_server, bad_state, bad_url = start_mock_proxy(ban_rate=1.0, hosts=hosts)
+    good = Proxy(good_url, 'residential', provider='mock', cost_per_request=0.01)
+    bad = Proxy(bad_url, 'datacenter', provider='mock', cost_per_request=0.001)
+    pool = ProxyPool([good, bad], max_consecutive_failures=3)
+
+    checks = Checks()
+    check_pool(checks, pool, good, bad, good_state, bad_state, site_url)
+    if not args.no_browser:
+        check_browser(checks, site_url, direct_url)
+
+    good_server.shutdown()
+    bad_server.shutdown()
+    site.shutdown()
+
+    print(f"\n{'✅ All checks passed' if not checks.failed else f'❌ {checks.failed} check(s) failed'}")
+    sys.exit(1 if checks.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Memory-curve benchmark for ManagedBrowser recycling
+
+Runs a long synthetic workload against a local page that leaks memory the way
+the county SPAs do (retained DOM nodes + JS objects on every search), once with
+recycling disabled and once with the given policy, and prints both curves.
+
+Usage:
+    python benchmarks/recycle_memory.py --tasks 2000 --sample-every 50
+"""
+
+import os
+import sys
+import time
+import argparse
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from playwright.sync_api import sync_playwright
+from services.scrapers.runtime import ManagedBrowser, RecyclePolicy
+
+# Each "search" appends result rows and keeps a reference to them, like a
+# Kendo grid that never disposes old data sources
+LEAKY_PAGE = """
+<html><body>
+<input id="q"><button id="go">Search</button><div id="results"></div>
+<script>
+window.__retained = [];
+document.getElementById('go').onclick = () => {
+    const rows = [];
+    for (let i = 0; i < 400; i++) {
+        const div = document.createElement('div');
+        div.textContent = document.getElementById('q').value + ' case ' + i + ' '.repeat(200);
+        rows.push(div);
+    }
+    const container = document.getElementById('results');
+    container.innerHTML = '';
+    rows.forEach(r => container.appendChild(r));
+    window.__retained.push(rows, new Array(20000).fill(Math.random()));
+};
+</script>
+</body></html>
+"""
+
+
+def setup(page):
+    page.set_content(LEAKY_PAGE)
+
+
+def run(policy, tasks, sample_every, label):
+    no_recycle_check = RecyclePolicy(None, None, None, None, None, check_every=10**9)
+    with sync_playwright() as p:
+        runtime = ManagedBrowser(p, policy or no_recycle_check,
+                                 launch_kwargs={'headless': True}, setup=setup, label=label)
+        start = time.time()
+        for i in range(1, tasks + 1):
+            page = runtime.page
+            page.fill('#q', f'SMITH, JOHN {i}')
+            page.click('#go')
+            runtime.task_done()
+            if i % sample_every == 0:
+                runtime.sample_memory('sample')
+        elapsed = time.time() - start
+        summary = runtime.summary()
+        runtime.write_memory_log(os.path.join(project_root, f"memory_{label.lower()}.csv"))
+        runtime.close()
+
+    samples = [s for s in runtime.memory_samples if s['action'] == 'sample']
+    return elapsed, summary, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark browser recycling memory curves')
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--sample-every', type=int, default=50)
+    parser.add_argument('--max-js-heap-mb', type=float, default=128)
+    parser.add_argument('--max-tasks-per-context', type=int, default=300)
+    args = parser.parse_args()
+
+    policy = RecyclePolicy(
+        max_tasks_per_page=None,
+        max_tasks_per_context=args.max_tasks_per_context,
+        max_tasks_per_browser=None,
+        max_js_heap_mb=args.max_js_heap_mb,
+        max_browser_rss_mb=None,
+        check_every=10
+    )
+
+    print(f"Running {args.tasks} synthetic searches per mode...\n")
+    base_time, base_summary, base_samples = run(None, args.tasks, args.sample_every, "BASELINE")
+    rec_time, rec_summary, rec_samples = run(policy, args.tasks, args.sample_every, "RECYCLED")
+
+    print(f"\n{'tasks':>7} | {'baseline heap MB':>16} {'rss MB':>8} | {'recycled heap MB':>16} {'rss MB':>8}")
+    print("-" * 66)
+    fmt = lambda v: f"{v:.1f}" if v is not None else "n/a"
+    for base, rec in zip(base_samples, rec_samples):
+        print(f"{base['tasks']:>7} | {fmt(base['js_heap_mb']):>16} {fmt(base['browser_rss_mb']):>8} | "
+              f"{fmt(rec['js_heap_mb']):>16} {fmt(rec['browser_rss_mb']):>8}")
+
+    print(f"\nBaseline: {base_time:.1f}s, peak heap {base_summary['peak_js_heap_mb']}MB, peak RSS {base_summary['peak_rss_mb']}MB")
+    print(f"Recycled: {rec_time:.1f}s, peak heap {rec_summary['peak_js_heap_mb']}MB, peak RSS {rec_summary['peak_rss_mb']}MB, "
+          f"recycles {rec_summary['recycles']}")
+    print("Full curves written to memory_baseline.csv / memory_recycled.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Per-search latency: browser-per-search vs injected page
+
+Serves a small county-style search form locally and runs the same scraper
+three ways:
+    launch   - legacy contract, sync_playwright + chromium.launch inside search()
+    adapter  - the same legacy scraper run through the registry's legacy adapter
+    injected - current contract, search(page, first_name, last_name)
+
+Usage:
+    python benchmarks/scraper_latency.py --searches 50
+"""
+
+import os
+import sys
+import time
+import types
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from playwright.sync_api import sync_playwright
+from services.scrapers.registry import ScraperRegistry
+
+SEARCH_PAGE = b"""
+<html><body>
+<form id="f"><input id="first"><input id="last"><button id="go" type="button">Search</button></form>
+<table id="results"></table>
+<script>
+document.getElementById('go').onclick = () => {
+    const name = document.getElementById('last').value + ', ' + document.getElementById('first').value;
+    setTimeout(() => {
+        document.getElementById('results').innerHTML =
+            '<tr><td class="case">PR-24-0001</td><td class="name">' + name + '</td><td class="status">OPEN</td></tr>';
+    }, 50);
+};
+</script>
+</body></html>
+"""
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.end_headers()
+        self.wfile.write(SEARCH_PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def scrape(page, url, first_name, last_name):
+    page.goto(url)
+    page.fill('#first', first_name)
+    page.fill('#last', last_name)
+    page.click('#go')
+    page.wait_for_selector('#results .case')
+    return [{
+        'case_number': page.inner_text('.case'),
+        'decedent_name': page.inner_text('.name'),
+        'case_status': page.inner_text('.status')
+    }]
+
+
+def make_legacy_module(url):
+    """A scraper written to the old contract: launches Chromium per search()"""
+    module = types.ModuleType('legacy_scraper')
+    module.sync_playwright = sync_playwright
+
+    def search(first_name, last_name):
+        with module.sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_page()
+            try:
+                return scrape(page, url, first_name, last_name)
+            finally:
+                browser.close()
+
+    module.search = search
+    return module
+
+
+def make_injected_module(url):
+    module = types.ModuleType('injected_scraper')
+    module.search = lambda page, first_name, last_name: scrape(page, url, first_name, last_name)
+    return module
+
+
+def timed(fn, searches):
+    latencies = []
+    for i in range(searches):
+        start = time.perf_counter()
+        results = fn('JOHN', f'SMITH{i}')
+        latencies.append(time.perf_counter() - start)
+        assert results and results[0]['decedent_name'] == f'SMITH{i}, JOHN'
+    return latencies
+
+
+def report(label, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"  {label:<10} mean={statistics.mean(latencies)*1000:7.0f}ms  "
+          f"p50={statistics.median(latencies)*1000:7.0f}ms  p95={p95*1000:7.0f}ms")
+    return statistics.mean(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-search scraper latency')
+    parser.add_argument('--searches', type=int, default=50)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    registry = ScraperRegistry()
+    legacy = make_legacy_module(url)
+    injected = make_injected_module(url)
+
+    print(f"\n⏱️ {args.searches} searches per mode against {url}\n")
+
+    # Legacy runs first, outside any Playwright instance, as it would in a subprocess
+    launch = timed(legacy.search, args.searches)
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        adapter = timed(lambda f, l: registry.invoke(legacy, page, f, l), args.searches)
+        inject = timed(lambda f, l: registry.invoke(injected, page, f, l), args.searches)
+        browser.close()
+
+    server.shutdown()
+
+    print("=" * 70)
+    launch_mean = report('launch', launch)
+    report('adapter', adapter)
+    inject_mean = report('injected', inject)
+    print("=" * 70)
+    print(f"  Saved per search: {(launch_mean - inject_mean)*1000:.0f}ms "
+          f"({launch_mean / inject_mean:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
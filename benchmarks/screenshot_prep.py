@@ -0,0 +1,129 @@
+"""
+Screenshot payload: raw viewport PNG vs prepared (cropped/downscaled/JPEG, de-duplicated)
+
+Serves a county-style search page locally and replays a typical exploration
+(landing page, filled form, results, a click that changes nothing, detail
+view) at 1920x1080, comparing what the scout agent used to send with what
+ScreenshotPreparer sends.
+
+Usage:
+    python benchmarks/screenshot_prep.py
+    python benchmarks/screenshot_prep.py --format webp --quality 60 --max-width 1280
+"""
+
+import os
+import sys
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from playwright.sync_api import sync_playwright
+from services.scout.screenshots import ScreenshotPreparer, image_tokens, _png_size
+
+ROWS = "".join(
+    f"<tr><td><a href='#' class='case'>PR-24-{i:05d}</td><td>SMITH, JOHN {chr(65 + i % 26)}</td>"
+    f"<td>2024-0{1 + i % 9}-1{i % 10}</td><td>{'OPEN' if i % 3 else 'CLOSED'}</td></tr>"
+    for i in range(25)
+)
+
+SEARCH_PAGE = f"""
+<html><head><style>
+body {{ margin: 0; background: #f2f2f2; font: 14px Arial, sans-serif; }}
+#wrap {{ width: 960px; margin: 0 auto; background: white; min-height: 100vh; }}
+header {{ background: #1d3a6b; color: white; padding: 24px; font-size: 22px; }}
+nav a {{ display: inline-block; padding: 10px 14px; color: #1d3a6b; }}
+form {{ padding: 16px; border-bottom: 1px solid #ccc; }}
+input {{ margin: 4px 8px 4px 0; padding: 4px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td {{ border: 1px solid #ddd; padding: 6px; }}
+#detail {{ display: none; padding: 16px; }}
+</style></head><body><div id="wrap">
+<header>County Clerk - Probate Records Search</header>
+<nav><a href="#">Home</a><a href="#">Courts</a><a href="#">Records</a><a href="#">Fees</a><a href="#">Help</a></nav>
+<form onsubmit="return false">
+  Last name <input id="last"> First name <input id="first">
+  Case type <select><option>All</option><option>Probate</option></select>
+  <button id="go" onclick="document.getElementById('results').innerHTML = ROWS">Search</button>
+  <button id="noop" type="button">Print</button>
+</form>
+<table id="results"></table>
+<div id="detail"><h3>PR-24-00001</h3><p>Estate of JOHN A SMITH, deceased. Status: OPEN. Filed 2024-01-10.</p></div>
+</div>
+<script>
+const ROWS = {ROWS!r};
+document.addEventListener('click', e => {{
+    if (e.target.classList.contains('case')) {{
+        document.getElementById('results').style.display = 'none';
+        document.getElementById('detail').style.display = 'block';
+    }}
+}});
+</script></body></html>
+""".encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.end_headers()
+        self.wfile.write(SEARCH_PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def exploration_screenshots(url):
+    """Viewport PNGs at the points the agent screenshots (step 1 and after clicks)"""
+    shots = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page(viewport={"width": 1920, "height": 1080})
+        page.goto(url)
+        shots.append(('landing', page.screenshot()))
+        page.fill('#last', 'SMITH')
+        page.fill('#first', 'JOHN')
+        page.click('#go')
+        shots.append(('results', page.screenshot()))
+        page.click('#noop')
+        shots.append(('no-op click', page.screenshot()))
+        page.click('.case')
+        shots.append(('detail', page.screenshot()))
+        page.click('#noop')
+        shots.append(('no-op click', page.screenshot()))
+        browser.close()
+    return shots
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark screenshot preparation')
+    parser.add_argument('--format', default='jpeg', choices=['jpeg', 'webp', 'png'])
+    parser.add_argument('--quality', type=int, default=70)
+    parser.add_argument('--max-width', type=int, default=1024)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    shots = exploration_screenshots(f"http://127.0.0.1:{server.server_port}/")
+    server.shutdown()
+
+    preparer = ScreenshotPreparer(max_width=args.max_width, image_format=args.format, quality=args.quality)
+
+    print(f"\n🖼️ {len(shots)} screenshots at 1920x1080 -> {args.format} q{args.quality}, max width {args.max_width}\n")
+    print("=" * 78)
+    for label, png in shots:
+        prepared = preparer.prepare(png)
+        raw = f"{len(png) / 1024:6.0f}KB ~{image_tokens(*_png_size(png)):5d} tok"
+        if prepared is None:
+            print(f"  {label:<12} {raw}  ->  skipped (unchanged)")
+        else:
+            print(f"  {label:<12} {raw}  ->  {prepared['bytes'] / 1024:5.0f}KB ~{prepared['tokens']:5d} tok  "
+                  f"{prepared['width']}x{prepared['height']}")
+    print("=" * 78)
+    preparer.print_report("  ")
+
+
+if __name__ == "__main__":
+    main()
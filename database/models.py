@@ -596,6 +596,72 @@ class Job(Base):
     deceased = relationship("DeceasedIndividual", back_populates="jobs")
 
 
+# ============================================================================
+# SCRAPER HEALTH TABLES
+# ============================================================================
+
+class ScraperHealthCheck(Base):
+    """
+    One cheap check of a county search page against its stored selectors
+    (services/scout/health_check.py). Only 'broken' results are sent back to
+    the Scout agent for regeneration.
+    """
+    __tablename__ = 'scraper_health_checks'
+    
+    id = Column(Integer, primary_key=True)
+    county_id = Column(Integer, ForeignKey('counties.id'), index=True)
+    record_type = Column(String(20), index=True)  # property, tax, probate
+    
+    status = Column(String(20), index=True)
+    # Status: healthy, broken, unreachable, captcha, unchecked (no usable stored selectors)
+    
+    url = Column(Text)
+    selectors_ok = Column(Boolean)  # Every stored selector resolved on the page
+    no_results_ok = Column(Boolean)  # Jargon search showed the expected "no results" state (NULL = not checkable)
+    checks = Column(JSON)  # Per-selector / per-step detail
+    error = Column(Text)
+    
+    # Latency
+    load_ms = Column(Integer)  # Search page navigation
+    search_ms = Column(Integer)  # Submit until the page settled
+    total_ms = Column(Integer)
+    
+    checked_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # Relationships
+    county = relationship("County")
+
+
+class CanaryRun(Base):
+    """
+    One canary search: a generated scraper run on its fixed known-good name
+    (services/scrapers/canary.py). The time series behind failure and
+    latency-regression alerts.
+    """
+    __tablename__ = 'canary_runs'
+    
+    id = Column(Integer, primary_key=True)
+    county_id = Column(Integer, ForeignKey('counties.id'), index=True)  # NULL if the scraper has no County row
+    state = Column(String(2), index=True)
+    county_slug = Column(String(100), index=True)  # scrapers/<state>/<county_slug>/<record_type>.py
+    record_type = Column(String(20), index=True)
+    
+    search_name = Column(String(200))
+    success = Column(Boolean, index=True)
+    result_count = Column(Integer)
+    latency_ms = Column(Integer)
+    error = Column(Text)
+    
+    # Regression flags (compared with this scraper's recent successful runs)
+    regression = Column(String(20), index=True)  # NULL, 'failure', 'latency', 'empty'
+    baseline_latency_ms = Column(Integer)  # Median of the baseline window
+    
+    run_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # Relationships
+    county = relationship("County")
+
+
 # ============================================================================
 # INDEXES FOR PERFORMANCE
 # ============================================================================
@@ -606,6 +672,12 @@ Index('idx_deceased_priority_status', DeceasedIndividual.priority, DeceasedIndiv
 Index('idx_property_delinquent', Property.is_delinquent, Property.deceased_id)
 Index('idx_jobs_status_priority', Job.status, Job.priority, Job.queued_at)
 Index('idx_heirs_legal_confidence', Heir.is_legal_heir, Heir.confidence_score)
+Index('idx_health_county_type_time', ScraperHealthCheck.county_id, ScraperHealthCheck.record_type, ScraperHealthCheck.checked_at)
+Index('idx_canary_scraper_time', CanaryRun.state, CanaryRun.county_slug, CanaryRun.record_type, CanaryRun.run_at)
+
+# Exact-match address lookups (values are USPS-normalized by services/address)
+Index('idx_property_address', Property.zip_code, Property.address)
+Index('idx_heirs_address', Heir.current_zip, Heir.current_address)
 
 
 # ============================================================================
@@ -0,0 +1,3 @@
+from .normalizer import NormalizedAddress, normalize_address, normalize_addresses, apply_to_property, apply_to_heir
+
+__all__ = ['NormalizedAddress', 'normalize_address', 'normalize_addresses', 'apply_to_property', 'apply_to_heir']
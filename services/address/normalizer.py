@@ -0,0 +1,412 @@
+"""
+Reusable address normalization service
+Turns free-form owner/property address strings into USPS-style components
+so Property and Heir rows can be joined and deduplicated on exact values
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
+
+
+# ============================================================================
+# USPS TABLES (Publication 28, most common entries)
+# ============================================================================
+
+STREET_SUFFIXES = {
+    'ALLEY': 'ALY', 'ALY': 'ALY',
+    'AVENUE': 'AVE', 'AVE': 'AVE', 'AV': 'AVE', 'AVEN': 'AVE', 'AVNUE': 'AVE',
+    'BAYOU': 'BYU', 'BYU': 'BYU',
+    'BEND': 'BND', 'BND': 'BND',
+    'BLUFF': 'BLF', 'BLF': 'BLF',
+    'BOULEVARD': 'BLVD', 'BLVD': 'BLVD', 'BOUL': 'BLVD', 'BOULV': 'BLVD',
+    'BRANCH': 'BR', 'BR': 'BR',
+    'BRIDGE': 'BRG', 'BRG': 'BRG',
+    'BROOK': 'BRK', 'BRK': 'BRK',
+    'BYPASS': 'BYP', 'BYP': 'BYP',
+    'CIRCLE': 'CIR', 'CIR': 'CIR', 'CIRC': 'CIR', 'CRCL': 'CIR',
+    'COURT': 'CT', 'CT': 'CT',
+    'COVE': 'CV', 'CV': 'CV',
+    'CREEK': 'CRK', 'CRK': 'CRK',
+    'CRESCENT': 'CRES', 'CRES': 'CRES',
+    'CROSSING': 'XING', 'XING': 'XING', 'CRSSNG': 'XING',
+    'DRIVE': 'DR', 'DR': 'DR', 'DRV': 'DR',
+    'EXPRESSWAY': 'EXPY', 'EXPY': 'EXPY', 'EXPWY': 'EXPY',
+    'FREEWAY': 'FWY', 'FWY': 'FWY',
+    'GARDENS': 'GDNS', 'GDNS': 'GDNS',
+    'GLEN': 'GLN', 'GLN': 'GLN',
+    'GROVE': 'GRV', 'GRV': 'GRV',
+    'HEIGHTS': 'HTS', 'HTS': 'HTS',
+    'HIGHWAY': 'HWY', 'HWY': 'HWY', 'HIGHWY': 'HWY',
+    'HILL': 'HL', 'HL': 'HL',
+    'HILLS': 'HLS', 'HLS': 'HLS',
+    'HOLLOW': 'HOLW', 'HOLW': 'HOLW',
+    'JUNCTION': 'JCT', 'JCT': 'JCT',
+    'LAKE': 'LK', 'LK': 'LK',
+    'LANDING': 'LNDG', 'LNDG': 'LNDG',
+    'LANE': 'LN', 'LN': 'LN',
+    'LOOP': 'LOOP',
+    'MEADOW': 'MDW', 'MDW': 'MDW',
+    'MEADOWS': 'MDWS', 'MDWS': 'MDWS',
+    'PARK': 'PARK',
+    'PARKWAY': 'PKWY', 'PKWY': 'PKWY', 'PKY': 'PKWY',
+    'PASS': 'PASS',
+    'PATH': 'PATH',
+    'PIKE': 'PIKE',
+    'PLACE': 'PL', 'PL': 'PL',
+    'PLAZA': 'PLZ', 'PLZ': 'PLZ',
+    'POINT': 'PT', 'PT': 'PT',
+    'RIDGE': 'RDG', 'RDG': 'RDG',
+    'ROAD': 'RD', 'RD': 'RD',
+    'ROW': 'ROW',
+    'RUN': 'RUN',
+    'SQUARE': 'SQ', 'SQ': 'SQ',
+    'STREET': 'ST', 'ST': 'ST', 'STR': 'ST',
+    'TERRACE': 'TER', 'TER': 'TER',
+    'TRACE': 'TRCE', 'TRCE': 'TRCE',
+    'TRAIL': 'TRL', 'TRL': 'TRL',
+    'TURNPIKE': 'TPKE', 'TPKE': 'TPKE',
+    'VIEW': 'VW', 'VW': 'VW',
+    'VILLAGE': 'VLG', 'VLG': 'VLG',
+    'VISTA': 'VIS', 'VIS': 'VIS',
+    'WALK': 'WALK',
+    'WAY': 'WAY',
+}
+
+UNIT_DESIGNATORS = {
+    'APARTMENT': 'APT', 'APT': 'APT',
+    'BUILDING': 'BLDG', 'BLDG': 'BLDG',
+    'FLOOR': 'FL', 'FL': 'FL',
+    'LOT': 'LOT',
+    'ROOM': 'RM', 'RM': 'RM',
+    'SPACE': 'SPC', 'SPC': 'SPC',
+    'SUITE': 'STE', 'STE': 'STE',
+    'TRAILER': 'TRLR', 'TRLR': 'TRLR',
+    'UNIT': 'UNIT',
+    '#': '#',
+}
+
+DIRECTIONALS = {
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+    'NORTHEAST': 'NE', 'NORTHWEST': 'NW', 'SOUTHEAST': 'SE', 'SOUTHWEST': 'SW',
+    'N': 'N', 'S': 'S', 'E': 'E', 'W': 'W',
+    'NE': 'NE', 'NW': 'NW', 'SE': 'SE', 'SW': 'SW',
+}
+
+STATE_NAMES = {
+    'ALABAMA': 'AL', 'ALASKA': 'AK', 'ARIZONA': 'AZ', 'ARKANSAS': 'AR',
+    'CALIFORNIA': 'CA', 'COLORADO': 'CO', 'CONNECTICUT': 'CT', 'DELAWARE': 'DE',
+    'DISTRICT OF COLUMBIA': 'DC', 'FLORIDA': 'FL', 'GEORGIA': 'GA', 'HAWAII': 'HI',
+    'IDAHO': 'ID', 'ILLINOIS': 'IL', 'INDIANA': 'IN', 'IOWA': 'IA',
+    'KANSAS': 'KS', 'KENTUCKY': 'KY', 'LOUISIANA': 'LA', 'MAINE': 'ME',
+    'MARYLAND': 'MD', 'MASSACHUSETTS': 'MA', 'MICHIGAN': 'MI', 'MINNESOTA': 'MN',
+    'MISSISSIPPI': 'MS', 'MISSOURI': 'MO', 'MONTANA': 'MT', 'NEBRASKA': 'NE',
+    'NEVADA': 'NV', 'NEW HAMPSHIRE': 'NH', 'NEW JERSEY': 'NJ', 'NEW MEXICO': 'NM',
+    'NEW YORK': 'NY', 'NORTH CAROLINA': 'NC', 'NORTH DAKOTA': 'ND', 'OHIO': 'OH',
+    'OKLAHOMA': 'OK', 'OREGON': 'OR', 'PENNSYLVANIA': 'PA', 'RHODE ISLAND': 'RI',
+    'SOUTH CAROLINA': 'SC', 'SOUTH DAKOTA': 'SD', 'TENNESSEE': 'TN', 'TEXAS': 'TX',
+    'UTAH': 'UT', 'VERMONT': 'VT', 'VIRGINIA': 'VA', 'WASHINGTON': 'WA',
+    'WEST VIRGINIA': 'WV', 'WISCONSIN': 'WI', 'WYOMING': 'WY',
+}
+STATE_CODES = set(STATE_NAMES.values())
+
+# PO boxes are a complete street line on their own: "PO BOX 123"
+PO_BOX_PREFIXES = [['POST', 'OFFICE', 'BOX'], ['P', 'O', 'BOX'], ['PO', 'BOX'], ['POB']]
+
+# Numbered routes ("200 HIGHWAY 67", "COUNTY ROAD 1190"): the route number ends the
+# street, and the designator is spelled out rather than treated as a suffix
+ROUTE_DESIGNATORS = {
+    ('FARM', 'TO', 'MARKET'): 'FM', ('FM',): 'FM',
+    ('RANCH', 'TO', 'MARKET'): 'RM', ('RM',): 'RM', ('RANCH', 'ROAD'): 'RANCH ROAD',
+    ('COUNTY', 'ROAD'): 'COUNTY ROAD', ('COUNTY', 'RD'): 'COUNTY ROAD', ('CO', 'RD'): 'COUNTY ROAD',
+    ('CR',): 'COUNTY ROAD',
+    ('STATE', 'HIGHWAY'): 'STATE HIGHWAY', ('STATE', 'HWY'): 'STATE HIGHWAY', ('SH',): 'STATE HIGHWAY',
+    ('US', 'HIGHWAY'): 'US HIGHWAY', ('US', 'HWY'): 'US HIGHWAY', ('US',): 'US HIGHWAY',
+    ('STATE', 'ROUTE'): 'STATE ROUTE', ('SR',): 'STATE ROUTE',
+    ('HIGHWAY',): 'HIGHWAY', ('HWY',): 'HIGHWAY', ('HIGHWY',): 'HIGHWAY',
+    ('INTERSTATE',): 'INTERSTATE', ('IH',): 'INTERSTATE',
+    ('ROUTE',): 'ROUTE', ('RTE',): 'ROUTE',
+    ('RURAL', 'ROUTE'): 'RR', ('RR',): 'RR', ('HC',): 'HC',
+}
+
+# Trailing "ST ZIP" / "ST ZIP-PLUS4" at the end of an address
+ZIP_RE = re.compile(r'(\d{5})(?:\s*-?\s*(\d{4}))?$')
+UNIT_NUMBER_RE = re.compile(r'^#?[A-Z0-9-]+$')
+
+
+class NormalizedAddress(NamedTuple):
+    """USPS-style address components. Empty strings mean 'not present'."""
+    street: str
+    unit: str
+    city: str
+    state: str
+    zip_code: str
+    zip4: str
+
+    @property
+    def address_line(self) -> str:
+        """Street line as stored in Property.address / Heir.current_address"""
+        return f"{self.street} {self.unit}".strip()
+
+    @property
+    def key(self) -> str:
+        """Exact-match key for joins and dedup (ignores ZIP+4)"""
+        return '|'.join([self.address_line, self.city, self.state, self.zip_code])
+
+
+# ============================================================================
+# PARSING HELPERS
+# ============================================================================
+
+def _clean(raw: str) -> str:
+    """Uppercase, drop punctuation USPS ignores, collapse whitespace"""
+    text = raw.upper().replace('.', ' ').replace('\n', ' ')
+    text = re.sub(r'#\s*', '# ', text)
+    text = re.sub(r'\s*,\s*', ', ', text)
+    return ' '.join(text.split()).strip(', ')
+
+
+def strip_owner_prefix(raw: str) -> str:
+    """
+    Drop owner-name text that precedes the house number, e.g.
+    "ALEXANDER OLLIE MAE EST OF 3147 MCDERMOTT AVE" -> "3147 MCDERMOTT AVE"
+    """
+    match = re.search(r'\b\d+', raw)
+    return raw[match.start():] if match else raw
+
+
+def _split_state_zip(text: str):
+    """Peel ZIP(+4) and state off the end. Returns (rest, state, zip5, zip4)"""
+    zip_code = zip4 = state = ''
+
+    match = ZIP_RE.search(text)
+    if match:
+        zip_code = match.group(1)
+        zip4 = match.group(2) or ''
+        if zip4 == '0000':  # Placeholder the county systems append
+            zip4 = ''
+        text = text[:match.start()].rstrip(', ')
+
+    # A full state name only counts before a ZIP - "12 WASHINGTON" is a street.
+    # Multi-word names ("NEW MEXICO") are checked before the 2-letter code.
+    for name, code in (STATE_NAMES.items() if zip_code else []):
+        if text.endswith(' ' + name) or text.endswith(',' + name):
+            state = code
+            text = text[:-len(name)].rstrip(', ')
+            break
+    else:
+        tokens = text.rsplit(' ', 1)
+        last = tokens[-1].strip(',')
+        # Without a ZIP or comma, "100 OAK CT" ends in a street suffix, not Connecticut
+        ambiguous = last in STREET_SUFFIXES and not zip_code and not tokens[0].endswith(',')
+        if last in STATE_CODES and len(tokens) > 1 and not ambiguous:
+            state = last
+            text = tokens[0].rstrip(', ')
+
+    return text, state, zip_code, zip4
+
+
+def _first_suffix_index(tokens: List[str]) -> int:
+    """Earliest position a suffix may appear: after number, pre-directional and one name word"""
+    has_predirectional = len(tokens) > 3 and tokens[1] in DIRECTIONALS
+    return 3 if has_predirectional else 2
+
+
+def _special_street(tokens: List[str]):
+    """
+    PO boxes and numbered routes, which have no street suffix.
+    Returns (index just past the street, normalized street tokens) or None.
+    """
+    for prefix in PO_BOX_PREFIXES:
+        if tokens[:len(prefix)] == prefix and len(tokens) > len(prefix):
+            return len(prefix) + 1, ['PO', 'BOX', tokens[len(prefix)]]
+
+    start = 0
+    street = []
+    if tokens and tokens[0][0].isdigit():
+        street.append(tokens[0])
+        start = 1
+        if len(tokens) > start + 2 and tokens[start] in DIRECTIONALS:
+            street.append(DIRECTIONALS[tokens[start]])
+            start += 1
+
+    for pattern in sorted(ROUTE_DESIGNATORS, key=len, reverse=True):
+        number_at = start + len(pattern)
+        if tuple(tokens[start:number_at]) != pattern or number_at >= len(tokens):
+            continue
+        if not any(c.isdigit() for c in tokens[number_at]):
+            continue  # "100 US STEEL DR" - not a route number
+
+        street += ROUTE_DESIGNATORS[pattern].split() + [tokens[number_at]]
+        end = number_at + 1
+        if tokens[end:end + 1] == ['BOX'] and end + 1 < len(tokens):  # "RR 2 BOX 15"
+            street += ['BOX', tokens[end + 1]]
+            end += 2
+        if end < len(tokens) and tokens[end] in DIRECTIONALS and len(tokens[end]) <= 2:
+            street.append(tokens[end])
+            end += 1
+        return end, street
+
+    return None
+
+
+def _split_unit(tokens: List[str], first: int = 1):
+    """Split "APT 4" (or "# 4") at or after `first` off. Returns (street tokens, unit)"""
+    for i, token in enumerate(tokens):
+        if token in UNIT_DESIGNATORS and i + 1 < len(tokens) and i >= first:
+            return tokens[:i] + tokens[i + 2:], ' '.join([UNIT_DESIGNATORS[token]] + tokens[i + 1:i + 2])
+    return tokens, ''
+
+
+def _normalize_street(tokens: List[str]):
+    """Abbreviate the suffix/directionals and split the unit off. Returns (street, unit)"""
+    special = _special_street(tokens)
+    if special:
+        end, street = special
+        _, unit = _split_unit(tokens[end:], first=0)
+        return ' '.join(street), unit
+
+    tokens, unit = _split_unit(tokens)
+    first_suffix = _first_suffix_index(tokens)
+
+    # Only the last suffix is abbreviated: "LAKE VIEW DRIVE" -> "LAKE VIEW DR"
+    suffix_at = None
+    for i in range(first_suffix, len(tokens)):
+        if tokens[i] in STREET_SUFFIXES:
+            suffix_at = i
+
+    street = []
+    for i, token in enumerate(tokens):
+        if i == 1 and token in DIRECTIONALS and len(tokens) > 2:
+            street.append(DIRECTIONALS[token])  # Pre-directional
+        elif i == suffix_at:
+            street.append(STREET_SUFFIXES[token])
+        elif suffix_at is not None and i == suffix_at + 1 and token in DIRECTIONALS:
+            street.append(DIRECTIONALS[token])  # Post-directional
+        else:
+            street.append(token)
+
+    return ' '.join(street), unit
+
+
+def _find_street_end(tokens: List[str]) -> Optional[int]:
+    """
+    Index just past the street line when there is no comma before the city.
+    Uses the FIRST suffix after the street name, so cities such as
+    "CEDAR HILL" or "FARMERS BRANCH" are not mistaken for suffixes.
+    PO boxes and numbered routes end at their number.
+    """
+    special = _special_street(tokens)
+    if special:
+        end = special[0]
+        if end + 1 < len(tokens) and tokens[end] in UNIT_DESIGNATORS and UNIT_NUMBER_RE.match(tokens[end + 1]):
+            end += 2
+        return end
+
+    for i in range(_first_suffix_index(tokens), len(tokens)):
+        if tokens[i] not in STREET_SUFFIXES:
+            continue
+
+        end = i + 1
+        # Abbreviated post-directional only; "NORTH RICHLAND HILLS" is a city
+        if end < len(tokens) and tokens[end] in DIRECTIONALS and len(tokens[end]) <= 2:
+            end += 1
+        if end + 1 < len(tokens) and tokens[end] in UNIT_DESIGNATORS and UNIT_NUMBER_RE.match(tokens[end + 1]):
+            end += 2
+        return end
+
+    return None
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+@lru_cache(maxsize=65536)
+def normalize_address(raw: Optional[str], owner_prefix: bool = False) -> Optional[NormalizedAddress]:
+    """
+    Parse a free-form address into USPS components (memoized)
+
+    Args:
+        raw: Address string, e.g. "3147 McDermott Avenue Dallas, TX 75215-0000"
+        owner_prefix: True if the string may start with an owner name
+                      (Dallas tax roll format)
+
+    Returns:
+        NormalizedAddress, or None if nothing usable was found
+
+    Example:
+        addr = normalize_address("CANTU MARK 1909 LEROY ROAD DALLAS, TX 75217-0000", owner_prefix=True)
+        # NormalizedAddress(street='1909 LEROY RD', unit='', city='DALLAS', state='TX', zip_code='75217', zip4='')
+    """
+    if not raw or raw.strip().upper() in ('N/A', 'UNKNOWN'):
+        return None
+
+    text = _clean(raw)
+    if owner_prefix:
+        text = strip_owner_prefix(text)
+
+    text, state, zip_code, zip4 = _split_state_zip(text)
+
+    parts = [p.strip() for p in text.split(',') if p.strip()]
+    city = ''
+
+    if len(parts) >= 2:
+        # "STREET, [UNIT,] CITY"
+        street_tokens = ' '.join(parts[:-1]).split()
+        city = parts[-1]
+    else:
+        tokens = text.replace(',', ' ').split()
+        end = _find_street_end(tokens)
+        if end is not None:
+            street_tokens, city = tokens[:end], ' '.join(tokens[end:])
+        elif tokens and not tokens[0][0].isdigit() and (state or zip_code):
+            street_tokens, city = [], ' '.join(tokens)  # "DALLAS, TX 75201" - just a city
+        else:
+            street_tokens = tokens
+
+    street, unit = _normalize_street(street_tokens)
+
+    if not any([street, city, state, zip_code]):
+        return None
+
+    return NormalizedAddress(street, unit, city, state, zip_code, zip4)
+
+
+def normalize_addresses(raws: Iterable[Optional[str]], owner_prefix: bool = False) -> List[Optional[NormalizedAddress]]:
+    """
+    Batch version of normalize_address(). Duplicate inputs are parsed once.
+
+    Example:
+        for raw, addr in zip(rows, normalize_addresses(rows)):
+            ...
+    """
+    results = {}
+    output = []
+    for raw in raws:
+        if raw not in results:
+            results[raw] = normalize_address(raw, owner_prefix)
+        output.append(results[raw])
+    return output
+
+
+def apply_to_property(prop, raw: Optional[str], owner_prefix: bool = False) -> Optional[NormalizedAddress]:
+    """Fill Property.address/city/state/zip_code from a raw address string"""
+    addr = normalize_address(raw, owner_prefix)
+    if addr:
+        prop.address = addr.address_line or None
+        prop.city = addr.city or None
+        prop.state = addr.state or None
+        prop.zip_code = addr.zip_code or None
+    return addr
+
+
+def apply_to_heir(heir, raw: Optional[str]) -> Optional[NormalizedAddress]:
+    """Fill Heir.current_address/current_city/current_state/current_zip from a raw address string"""
+    addr = normalize_address(raw)
+    if addr:
+        heir.current_address = addr.address_line or None
+        heir.current_city = addr.city or None
+        heir.current_state = addr.state or None
+        heir.current_zip = addr.zip_code or None
+    return addr
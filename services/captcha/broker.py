@@ -0,0 +1,327 @@
+"""
+Central CAPTCHA broker
+Owns every outstanding CapSolver task and polls them from one place on an
+adaptive schedule, instead of each worker polling its own task every 3s.
+
+Async callers use CaptchaBroker directly; multiprocessing workers talk to a
+broker_process() through queues via BrokerClient.
+"""
+
+import time
+import uuid
+import asyncio
+import threading
+from queue import Empty
+from typing import Dict, Optional
+
+from .solver import CaptchaSolver
+
+
+class _PendingTask:
+    def __init__(self, task_id: str, captcha_type: str, future: asyncio.Future, timeout: float):
+        self.task_id = task_id
+        self.captcha_type = captcha_type
+        self.future = future
+        self.created = time.monotonic()
+        self.deadline = self.created + timeout
+        self.next_poll = self.created
+        self.polls = 0
+        self.last_pending = None  # Seconds after creation of the last poll that came back not ready
+
+
+class CaptchaBroker:
+    """
+    Multiplexes getTaskResult polling for all outstanding tasks
+
+    The first poll for a task is scheduled near the expected solve time for its
+    captcha type (a running average of observed solves); after that it's polled
+    every min_poll_interval..max_poll_interval depending on how overdue it is.
+    At most max_polls_per_tick polls are in flight per tick.
+
+    A solve is only seen at the poll that finds it ready, so each observation is
+    the midpoint between the last not-ready poll and that one. Until a type has
+    warmup_samples observations its tasks are polled every min_poll_interval,
+    since a late first poll would inflate the estimate it's scheduled from.
+
+    Example:
+        broker = CaptchaBroker(CaptchaSolver(CAPSOLVER_API_KEY))
+        tokens = await asyncio.gather(*[broker.solve(t, key, url) for url in urls])
+        await broker.stop()
+    """
+
+    def __init__(self, solver: CaptchaSolver,
+                 min_poll_interval: float = 1.0,
+                 max_poll_interval: float = 5.0,
+                 max_polls_per_tick: int = 50,
+                 initial_solve_estimate: float = 5.0,
+                 warmup_samples: int = 3):
+        self.solver = solver
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_polls_per_tick = max_polls_per_tick
+        self.initial_solve_estimate = initial_solve_estimate
+        self.warmup_samples = warmup_samples
+
+        self.pending: Dict[str, _PendingTask] = {}
+        self.solve_estimates: Dict[str, float] = {}  # captcha_type -> EWMA seconds
+        self.solve_samples: Dict[str, int] = {}      # captcha_type -> observations behind the EWMA
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._poller: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'tasks': 0, 'solved': 0, 'failed': 0, 'timeouts': 0,
+            'create_requests': 0, 'poll_requests': 0, 'solve_seconds': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def solve(self, captcha_type: str, site_key: str, page_url: str, timeout: int = 180,
+                    page_action: str = None) -> Optional[str]:
+        """Create a CapSolver task and wait for the broker to resolve it"""
+        self._ensure_running()
+
+        self.stats['create_requests'] += 1
+        try:
+            result = await self.solver._post("/createTask", {
+                "clientKey": self.solver.api_key,
+                "task": self.solver.build_task(captcha_type, site_key, page_url, page_action)
+            })
+        except Exception as e:
+            print(f"❌ CAPTCHA createTask error: {str(e)}")
+            self.stats['failed'] += 1
+            return None
+
+        if result.get("errorId") != 0:
+            print(f"❌ CapSolver error: {result.get('errorDescription', 'Unknown error')}")
+            self.stats['failed'] += 1
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        task = _PendingTask(result["taskId"], captcha_type, future, timeout)
+        task.next_poll = task.created + self._first_poll_delay(captcha_type)
+        self.pending[task.task_id] = task
+        self.stats['tasks'] += 1
+        self._wakeup.set()
+
+        return await future
+
+    async def stop(self):
+        """Cancel the poller and fail anything still pending"""
+        if self._poller:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        for task in self.pending.values():
+            if not task.future.done():
+                task.future.set_result(None)
+        self.pending.clear()
+        await self.solver.aclose()
+
+    def summary(self) -> Dict:
+        solved = self.stats['solved']
+        tasks = self.stats['tasks']
+        avg_solve = self.stats['solve_seconds'] / solved if solved else 0
+        return {
+            **self.stats,
+            'outstanding': len(self.pending),
+            'avg_solve_s': round(avg_solve, 1),
+            'polls_per_task': round(self.stats['poll_requests'] / tasks, 2) if tasks else 0,
+            # What per-worker polling every 3s would have sent for the same solves
+            'fixed_3s_polls_estimate': int(self.stats['solve_seconds'] // 3 + solved)
+        }
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self):
+        if self._poller is None or self._poller.done():
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.get_running_loop().create_task(self._poll_loop())
+
+    def _estimate(self, captcha_type: str) -> float:
+        return self.solve_estimates.get(captcha_type, self.initial_solve_estimate)
+
+    def _warming_up(self, captcha_type: str) -> bool:
+        return self.solve_samples.get(captcha_type, 0) < self.warmup_samples
+
+    def _first_poll_delay(self, captcha_type: str) -> float:
+        if self._warming_up(captcha_type):
+            return self.min_poll_interval
+        # Slightly before the expected finish so fast solves aren't held back
+        return max(self.min_poll_interval, self._estimate(captcha_type) * 0.8)
+
+    def _next_poll_delay(self, task: _PendingTask) -> float:
+        if self._warming_up(task.captcha_type):
+            return self.min_poll_interval
+        remaining = self._estimate(task.captcha_type) - (time.monotonic() - task.created)
+        if remaining > 0:
+            return min(self.max_poll_interval, max(self.min_poll_interval, remaining))
+        # Overdue: back off gently from the minimum interval
+        return min(self.max_poll_interval, self.min_poll_interval * (1 + 0.25 * task.polls))
+
+    def _record_solve(self, task: _PendingTask):
+        ready_seen = time.monotonic() - task.created
+        # The task finished somewhere between the last not-ready poll and this one
+        elapsed = ready_seen if task.last_pending is None else (task.last_pending + ready_seen) / 2
+        previous = self.solve_estimates.get(task.captcha_type)
+        self.solve_estimates[task.captcha_type] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+        self.solve_samples[task.captcha_type] = self.solve_samples.get(task.captcha_type, 0) + 1
+        self.stats['solved'] += 1
+        self.stats['solve_seconds'] += elapsed
+
+    async def _poll_loop(self):
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            due = sorted((t for t in self.pending.values() if t.next_poll <= now), key=lambda t: t.next_poll)
+
+            if not due:
+                sleep_for = min(t.next_poll for t in self.pending.values()) - now
+                self._wakeup.clear()
+                try:
+                    # New tasks may be due sooner than anything we're waiting on
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batch = due[:self.max_polls_per_tick]
+            await asyncio.gather(*[self._poll(task) for task in batch])
+
+    async def _poll(self, task: _PendingTask):
+        task.polls += 1
+        self.stats['poll_requests'] += 1
+        sent = time.monotonic() - task.created
+        try:
+            data = await self.solver._post("/getTaskResult", {"clientKey": self.solver.api_key, "taskId": task.task_id})
+        except Exception as e:
+            print(f"⚠️ CAPTCHA poll error for {task.task_id}: {str(e)}")
+            data = {}
+
+        if data.get("errorId"):
+            print(f"❌ CapSolver error: {data.get('errorDescription', 'Unknown error')}")
+            self.stats['failed'] += 1
+            self._finish(task, None)
+        elif data.get("status") == "ready":
+            solution = data.get("solution", {})
+            self._record_solve(task)
+            self._finish(task, solution.get("gRecaptchaResponse") or solution.get("token"))
+        elif time.monotonic() >= task.deadline:
+            print(f"⚠️ CAPTCHA task {task.task_id} timed out")
+            self.stats['timeouts'] += 1
+            self._finish(task, None)
+        else:
+            task.last_pending = sent
+            task.next_poll = time.monotonic() + self._next_poll_delay(task)
+
+    def _finish(self, task: _PendingTask, token: Optional[str]):
+        self.pending.pop(task.task_id, None)
+        if not task.future.done():
+            task.future.set_result(token)
+
+
+# ============================================================================
+# MULTIPROCESSING BRIDGE
+# ============================================================================
+
+def broker_process(request_queue, response_queues: Dict, api_key: str, base_url: str = None,
+                   use_token_pool: bool = False, work_queue=None, pool_kwargs: Dict = None, **broker_kwargs):
+    """
+    Process target that serves CAPTCHA solves for a pool of worker processes.
+
+    Requests arrive on request_queue as (worker_id, request_id, captcha_type,
+    site_key, page_url, timeout, page_action); tokens go back on response_queues[worker_id]
+    as (request_id, token). Put None on request_queue to stop.
+
+    With use_token_pool, requests are served from a TokenPool that pre-solves
+    tokens; work_queue.qsize() caps pre-solving at the work still queued.
+    """
+    print(f"\n[BROKER] Starting CAPTCHA broker...")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        broker = CaptchaBroker(CaptchaSolver(api_key, base_url=base_url), **broker_kwargs)
+        stopped = asyncio.Event()
+
+        pool = None
+        if use_token_pool:
+            from .token_pool import TokenPool
+            pool = TokenPool(broker, queue_depth=work_queue.qsize if work_queue is not None else None,
+                             **(pool_kwargs or {}))
+
+        async def handle(worker_id, request_id, captcha_type, site_key, page_url, timeout, page_action=None):
+            if pool:
+                token = await pool.take(captcha_type, site_key, page_url, timeout, page_action)
+            else:
+                token = await broker.solve(captcha_type, site_key, page_url, timeout, page_action)
+            await loop.run_in_executor(None, response_queues[worker_id].put, (request_id, token))
+
+        def reader():
+            # Manager queues are blocking, so read them off the event loop
+            while True:
+                request = request_queue.get()
+                if request is None:
+                    loop.call_soon_threadsafe(stopped.set)
+                    return
+                loop.call_soon_threadsafe(lambda r=request: loop.create_task(handle(*r)))
+
+        threading.Thread(target=reader, name="broker-reader", daemon=True).start()
+        await stopped.wait()
+
+        if pool:
+            await pool.stop()
+            pool.print_report("[BROKER] ")
+        summary = broker.summary()
+        await broker.stop()
+        return summary
+
+    summary = asyncio.run(run())
+
+    print(f"\n[BROKER] {'='*80}")
+    print(f"[BROKER] Solved: {summary['solved']}/{summary['tasks']} | Failed: {summary['failed']} | Timeouts: {summary['timeouts']}")
+    print(f"[BROKER] Avg solve: {summary['avg_solve_s']}s | Polls: {summary['poll_requests']} "
+          f"({summary['polls_per_task']}/task, fixed 3s polling ≈ {summary['fixed_3s_polls_estimate']})")
+    print(f"[BROKER] {'='*80}\n")
+
+
+class BrokerClient:
+    """
+    Worker-side handle for broker_process()
+
+    Example:
+        captcha = BrokerClient(captcha_requests, captcha_responses[worker_id], worker_id)
+        token = captcha.solve("ReCaptchaV2TaskProxyLess", site_key, URL)
+    """
+
+    def __init__(self, request_queue, response_queue, worker_id):
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.worker_id = worker_id
+
+    def solve(self, captcha_type: str, site_key: str, page_url: str, timeout: int = 180,
+              page_action: str = None) -> Optional[str]:
+        request_id = uuid.uuid4().hex
+        self.request_queue.put((self.worker_id, request_id, captcha_type, site_key, page_url, timeout, page_action))
+
+        deadline = time.monotonic() + timeout + 10
+        while time.monotonic() < deadline:
+            try:
+                response_id, token = self.response_queue.get(timeout=max(0.1, deadline - time.monotonic()))
+            except Empty:
+                break
+            if response_id == request_id:
+                return token
+            # Stale answer for a request this worker already gave up on
+
+        return None
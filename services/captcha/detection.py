@@ -0,0 +1,250 @@
+"""
+Single-pass CAPTCHA detection
+One page.evaluate() returns vendor, site key and action for reCAPTCHA v2/v3
+(including Enterprise), hCaptcha and Cloudflare Turnstile - no page.content()
+round trips or per-selector locator counts.
+
+detect_captcha_html() applies the same rules to saved HTML for callers that
+only have markup (recorded pages, Jina output).
+
+A CAPTCHA without a site key can't be sent to CapSolver (check .solvable).
+Cloudflare's managed "Just a moment..." interstitial is always reported that
+way: its frame is a Turnstile widget, but with Cloudflare's own key, and a
+token for it doesn't get past the challenge.
+"""
+
+import re
+from typing import NamedTuple, Optional
+from urllib.parse import urlparse, parse_qs
+
+
+class CaptchaInfo(NamedTuple):
+    """What was found and the CapSolver task type that solves it"""
+    vendor: str            # 'recaptcha_v2', 'recaptcha_v3', 'hcaptcha', 'turnstile'
+    task_type: str         # CapSolver task type, e.g. 'ReCaptchaV2TaskProxyLess'
+    site_key: Optional[str]
+    action: Optional[str] = None     # reCAPTCHA v3 / Turnstile action
+    enterprise: bool = False
+    invisible: bool = False
+
+    @property
+    def solvable(self) -> bool:
+        """False when there's no site key to give CapSolver - don't submit a task"""
+        return bool(self.site_key)
+
+
+TASK_TYPES = {
+    ('recaptcha_v2', False): "ReCaptchaV2TaskProxyLess",
+    ('recaptcha_v2', True): "ReCaptchaV2EnterpriseTaskProxyLess",
+    ('recaptcha_v3', False): "ReCaptchaV3TaskProxyLess",
+    ('recaptcha_v3', True): "ReCaptchaV3EnterpriseTaskProxyLess",
+    ('hcaptcha', False): "HCaptchaTaskProxyLess",
+    ('turnstile', False): "AntiTurnstileTaskProxyLess",
+}
+
+# Runs in the page. Order matters: an explicit widget beats script-tag hints.
+DETECT_JS = r"""
+() => {
+    const attr = (el, name) => el ? el.getAttribute(name) : null;
+    const param = (src, name) => {
+        try { return new URL(src, location.href).searchParams.get(name); } catch (e) { return null; }
+    };
+    // hCaptcha's widget frame carries its config in the fragment: hcaptcha.html#frame=checkbox&sitekey=...
+    const hashParam = (src, name) => {
+        try { return new URLSearchParams(new URL(src, location.href).hash.slice(1)).get(name); } catch (e) { return null; }
+    };
+    const scripts = Array.from(document.scripts);
+    const srcs = scripts.map(s => s.src || '');
+    const frames = Array.from(document.querySelectorAll('iframe')).map(f => f.src || '');
+    const inline = scripts.filter(s => !s.src).map(s => s.textContent).join('\n');
+    const enterprise = srcs.some(s => s.includes('recaptcha/enterprise')) || frames.some(s => s.includes('recaptcha/enterprise'));
+
+    // Cloudflare's managed interstitial ("Just a moment...") - not a widget the page can be given a token for
+    if (window._cf_chl_opt || /^just a moment/i.test(document.title)) {
+        return {vendor: 'turnstile', site_key: null, action: null};
+    }
+
+    // Cloudflare Turnstile
+    const ts = document.querySelector('.cf-turnstile[data-sitekey], [data-sitekey^="0x4"]');
+    if (ts) {
+        return {vendor: 'turnstile', site_key: attr(ts, 'data-sitekey'), action: attr(ts, 'data-action')};
+    }
+    const tsFrame = frames.find(s => s.includes('challenges.cloudflare.com'));
+    if (tsFrame || srcs.some(s => s.includes('challenges.cloudflare.com/turnstile'))) {
+        const m = (tsFrame || '').match(/\/(0x4[A-Za-z0-9_-]+)/);
+        return {vendor: 'turnstile', site_key: m ? m[1] : null, action: null};
+    }
+
+    // hCaptcha (a container from hcaptcha.render() has a widget id but no data-sitekey)
+    const hc = document.querySelector('.h-captcha[data-sitekey], [data-hcaptcha-widget-id]');
+    const hcFrame = frames.find(s => s.includes('hcaptcha.com'));
+    if (hc || hcFrame) {
+        const key = attr(hc, 'data-sitekey') || (hcFrame ? hashParam(hcFrame, 'sitekey') || param(hcFrame, 'sitekey') : null);
+        return {vendor: 'hcaptcha', site_key: key, action: null};
+    }
+
+    // reCAPTCHA v2 widget (checkbox or invisible)
+    const rc = document.querySelector('.g-recaptcha[data-sitekey]');
+    if (rc) {
+        return {vendor: 'recaptcha_v2', site_key: attr(rc, 'data-sitekey'), action: attr(rc, 'data-action'),
+                enterprise: enterprise, invisible: attr(rc, 'data-size') === 'invisible'};
+    }
+    const anchor = frames.find(s => /recaptcha\/(api2|enterprise)\/anchor/.test(s));
+    if (anchor) {
+        return {vendor: 'recaptcha_v2', site_key: param(anchor, 'k'), action: null,
+                enterprise: enterprise, invisible: param(anchor, 'size') === 'invisible'};
+    }
+
+    // reCAPTCHA v3: api.js?render=<key> or grecaptcha.execute('<key>', {action: '...'})
+    const exec = inline.match(/grecaptcha(?:\.enterprise)?\.execute\(\s*['"]([^'"]+)['"]\s*(?:,\s*\{\s*action\s*:\s*['"]([^'"]+)['"])?/);
+    const render = srcs.map(s => param(s, 'render')).find(k => k && k !== 'explicit');
+    if (exec || render) {
+        return {vendor: 'recaptcha_v3', site_key: exec ? exec[1] : render, action: exec && exec[2] ? exec[2] : null,
+                enterprise: enterprise};
+    }
+
+    return null;
+}
+"""
+
+# Fills every vendor's response field, then calls the widget's data-callback
+# (e.g. data-callback="onSubmit" or "app.captchaDone") the way the widget would
+# on a real solve. Callbacks registered through grecaptcha/hcaptcha.render()
+# options aren't reachable from the page and are not called.
+INJECT_JS = r"""
+({token, vendor}) => {
+    const names = vendor === 'turnstile' ? ['cf-turnstile-response']
+                : vendor === 'hcaptcha' ? ['h-captcha-response', 'g-recaptcha-response']
+                : ['g-recaptcha-response'];
+    const widgets = vendor === 'turnstile' ? '.cf-turnstile'
+                  : vendor === 'hcaptcha' ? '.h-captcha, [data-hcaptcha-widget-id]'
+                  : '.g-recaptcha';
+    let filled = 0;
+    for (const name of names) {
+        document.querySelectorAll(`[name="${name}"], #${name}`).forEach(el => {
+            el.innerHTML = token;
+            el.value = token;
+            filled++;
+        });
+    }
+    const called = [];
+    document.querySelectorAll(widgets).forEach(el => {
+        const name = el.getAttribute('data-callback');
+        const fn = name ? name.split('.').reduce((obj, key) => obj ? obj[key] : undefined, window) : null;
+        if (typeof fn === 'function' && !called.includes(fn)) {
+            called.push(fn);
+            fn(token);
+        }
+    });
+    return {filled: filled, callbacks: called.length};
+}
+"""
+
+
+def _to_info(result) -> Optional[CaptchaInfo]:
+    if not result:
+        return None
+    vendor = result['vendor']
+    enterprise = bool(result.get('enterprise')) and vendor.startswith('recaptcha')
+    return CaptchaInfo(
+        vendor=vendor,
+        task_type=TASK_TYPES[(vendor, enterprise)],
+        site_key=result.get('site_key'),
+        action=result.get('action'),
+        enterprise=enterprise,
+        invisible=bool(result.get('invisible'))
+    )
+
+
+def detect_captcha(page) -> Optional[CaptchaInfo]:
+    """
+    Detect the CAPTCHA on a sync Playwright page in one evaluate
+
+    Example:
+        captcha = detect_captcha(page)
+        if captcha:
+            token = solver.solve(captcha.task_type, captcha.site_key, page.url, page_action=captcha.action)
+            inject_token(page, captcha, token)
+    """
+    return _to_info(page.evaluate(DETECT_JS))
+
+
+async def detect_captcha_async(page) -> Optional[CaptchaInfo]:
+    """detect_captcha() for async Playwright pages"""
+    return _to_info(await page.evaluate(DETECT_JS))
+
+
+def inject_token(page, captcha: CaptchaInfo, token: str):
+    """
+    Put a solved token into the page's response field(s) and call the widget's data-callback.
+    Returns the evaluate result ({'filled': fields, 'callbacks': callbacks called}) - await it when page is async.
+    """
+    return page.evaluate(INJECT_JS, {'token': token, 'vendor': captcha.vendor})
+
+
+# ============================================================================
+# HTML FALLBACK
+# ============================================================================
+
+def _attr(tag: str, name: str) -> Optional[str]:
+    match = re.search(rf'{name}\s*=\s*["\']([^"\']*)["\']', tag)
+    return match.group(1) if match else None
+
+
+def _tag_with_class(html: str, cls: str) -> Optional[str]:
+    match = re.search(rf'<[^>]*class\s*=\s*["\'][^"\']*\b{re.escape(cls)}\b[^"\']*["\'][^>]*>', html)
+    return match.group(0) if match else None
+
+
+def _src_param(src: str, name: str, fragment: bool = False) -> Optional[str]:
+    """Query parameter of src, or fragment parameter (#a=1&b=2) when fragment=True"""
+    parsed = urlparse(src.replace('&amp;', '&'))
+    values = parse_qs(parsed.fragment if fragment else parsed.query).get(name)
+    return values[0] if values else None
+
+
+def detect_captcha_html(html: str) -> Optional[CaptchaInfo]:
+    """Same rules as DETECT_JS, applied to raw HTML"""
+    if not html:
+        return None
+
+    srcs = re.findall(r'<(?:script|iframe)[^>]*\ssrc\s*=\s*["\']([^"\']+)["\']', html, re.IGNORECASE)
+    enterprise = any('recaptcha/enterprise' in s for s in srcs)
+
+    if '_cf_chl_opt' in html or re.search(r'<title>\s*just a moment', html, re.IGNORECASE):
+        return _to_info({'vendor': 'turnstile', 'site_key': None})
+
+    tag = _tag_with_class(html, 'cf-turnstile')
+    if tag and _attr(tag, 'data-sitekey'):
+        return _to_info({'vendor': 'turnstile', 'site_key': _attr(tag, 'data-sitekey'), 'action': _attr(tag, 'data-action')})
+    ts_src = next((s for s in srcs if 'challenges.cloudflare.com' in s), None)
+    if ts_src:
+        match = re.search(r'/(0x4[A-Za-z0-9_-]+)', ts_src)
+        return _to_info({'vendor': 'turnstile', 'site_key': match.group(1) if match else None})
+
+    tag = _tag_with_class(html, 'h-captcha')
+    if tag and _attr(tag, 'data-sitekey'):
+        return _to_info({'vendor': 'hcaptcha', 'site_key': _attr(tag, 'data-sitekey')})
+    hc_src = next((s for s in srcs if 'hcaptcha.com' in s and 'sitekey=' in s), None)
+    if hc_src:
+        site_key = _src_param(hc_src, 'sitekey', fragment=True) or _src_param(hc_src, 'sitekey')
+        return _to_info({'vendor': 'hcaptcha', 'site_key': site_key})
+
+    tag = _tag_with_class(html, 'g-recaptcha')
+    if tag and _attr(tag, 'data-sitekey'):
+        return _to_info({'vendor': 'recaptcha_v2', 'site_key': _attr(tag, 'data-sitekey'),
+                         'action': _attr(tag, 'data-action'), 'enterprise': enterprise,
+                         'invisible': _attr(tag, 'data-size') == 'invisible'})
+    anchor = next((s for s in srcs if re.search(r'recaptcha/(api2|enterprise)/anchor', s)), None)
+    if anchor:
+        return _to_info({'vendor': 'recaptcha_v2', 'site_key': _src_param(anchor, 'k'), 'enterprise': enterprise,
+                         'invisible': _src_param(anchor, 'size') == 'invisible'})
+
+    execute = re.search(r'grecaptcha(?:\.enterprise)?\.execute\(\s*["\']([^"\']+)["\']\s*'
+                        r'(?:,\s*\{\s*action\s*:\s*["\']([^"\']+)["\'])?', html)
+    render = next((k for k in (_src_param(s, 'render') for s in srcs) if k and k != 'explicit'), None)
+    if execute or render:
+        return _to_info({'vendor': 'recaptcha_v3', 'site_key': execute.group(1) if execute else render,
+                         'action': execute.group(2) if execute else None, 'enterprise': enterprise})
+
+    return None
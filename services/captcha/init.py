@@ -1,3 +1,11 @@
 from .solver import CaptchaSolver, solve_captcha_quick
+from .detection import CaptchaInfo, detect_captcha, detect_captcha_async, detect_captcha_html, inject_token
+from .mock_capsolver import start_mock_capsolver
+from .telemetry import CaptchaTelemetry, SessionReusePolicy
 
-__all__ = ['CaptchaSolver', 'solve_captcha_quick']
\ No newline at end of file
+__all__ = [
+    'CaptchaSolver', 'solve_captcha_quick',
+    'CaptchaInfo', 'detect_captcha', 'detect_captcha_async', 'detect_captcha_html', 'inject_token',
+    'start_mock_capsolver',
+    'CaptchaTelemetry', 'SessionReusePolicy'
+]
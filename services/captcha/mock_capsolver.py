@@ -0,0 +1,246 @@
+"""
+Local mock of the CapSolver createTask/getTaskResult API
+For benchmarks, load tests and offline testing of CaptchaSolver - no API key or balance needed
+
+Solve latency follows a configurable distribution, and createTask / solve /
+HTTP-level errors can be injected at configurable rates.
+
+Usage:
+    python services/captcha/mock_capsolver.py --port 8765 --solve-time lognormal:12,0.5 --solve-error-rate 0.02
+
+    solver = CaptchaSolver("test", base_url="http://127.0.0.1:8765")
+
+Latency specs:
+    fixed:10            always 10s
+    uniform:5,30        5-30s
+    normal:15,5         mean 15s, stdev 5s (floored at 0.1s)
+    lognormal:12,0.5    median 12s, sigma 0.5 - long right tail like real solves
+    exponential:10      mean 10s
+"""
+
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple, Union
+
+
+def make_latency(spec: Union[str, float, int]) -> Callable[[], float]:
+    """
+    Build a sampler from a latency spec (see module docstring)
+
+    Example:
+        sample = make_latency("lognormal:12,0.5")
+        sample()  # -> 10.7
+    """
+    if isinstance(spec, (int, float)):
+        return lambda: float(spec)
+
+    kind, _, params = str(spec).partition(':')
+    if not params:  # Bare number
+        value = float(kind)
+        return lambda: value
+    args = [float(x) for x in params.split(',')]
+
+    if kind == 'fixed':
+        return lambda: args[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(args[0], args[1])
+    if kind == 'normal':
+        return lambda: max(0.1, random.gauss(args[0], args[1]))
+    if kind == 'lognormal':
+        mu = math.log(args[0])
+        return lambda: random.lognormvariate(mu, args[1])
+    if kind == 'exponential':
+        return lambda: random.expovariate(1.0 / args[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockCapSolverState:
+    """Tasks in flight plus request counters"""
+
+    def __init__(self, solve_time: Union[str, float] = 5.0,
+                 create_error_rate: float = 0.0,
+                 solve_error_rate: float = 0.0,
+                 http_error_rate: float = 0.0,
+                 api_latency: Union[str, float] = 0.0):
+        """
+        Args:
+            solve_time: Latency spec for how long each task takes to become ready
+            create_error_rate: Fraction of createTask calls rejected (e.g. zero balance)
+            solve_error_rate: Fraction of tasks that end as ERROR_CAPTCHA_UNSOLVABLE
+            http_error_rate: Fraction of any request answered with HTTP 503
+            api_latency: Latency spec added to every HTTP response
+        """
+        self.solve_time = make_latency(solve_time)
+        self.api_latency = make_latency(api_latency)
+        self.create_error_rate = create_error_rate
+        self.solve_error_rate = solve_error_rate
+        self.http_error_rate = http_error_rate
+
+        self.tasks: Dict[str, Dict] = {}
+        self.create_calls = 0
+        self.result_calls = 0
+        self.errors = {'create': 0, 'unsolvable': 0, 'http': 0}
+        self.solve_times = []
+        self.lock = threading.Lock()
+
+    def create_task(self, payload: Dict) -> Dict:
+        task = payload.get('task') or {}
+
+        if not task.get('websiteKey') or not task.get('websiteURL'):
+            return {'errorId': 1, 'errorCode': 'ERROR_INVALID_TASK_DATA',
+                    'errorDescription': 'websiteKey and websiteURL are required'}
+        if random.random() < self.create_error_rate:
+            with self.lock:
+                self.errors['create'] += 1
+            return {'errorId': 1, 'errorCode': 'ERROR_ZERO_BALANCE', 'errorDescription': 'Mock: injected createTask error'}
+
+        task_id = str(uuid.uuid4())
+        solve_time = self.solve_time()
+        with self.lock:
+            self.tasks[task_id] = {
+                'type': task.get('type'),
+                'ready_at': time.monotonic() + solve_time,
+                'fails': random.random() < self.solve_error_rate
+            }
+            self.solve_times.append(solve_time)
+        return {'errorId': 0, 'taskId': task_id}
+
+    def get_task_result(self, payload: Dict) -> Dict:
+        with self.lock:
+            task = self.tasks.get(payload.get('taskId'))
+
+        if task is None:
+            return {'errorId': 1, 'errorCode': 'ERROR_TASKID_INVALID', 'errorDescription': 'Task not found'}
+        if time.monotonic() < task['ready_at']:
+            return {'errorId': 0, 'status': 'processing'}
+        if task['fails']:
+            with self.lock:
+                if not task.get('counted'):
+                    task['counted'] = True
+                    self.errors['unsolvable'] += 1
+            return {'errorId': 1, 'errorCode': 'ERROR_CAPTCHA_UNSOLVABLE', 'status': 'failed',
+                    'errorDescription': 'Mock: injected solve failure'}
+
+        token = f"mock-token-{payload['taskId'][:8]}"
+        solution = {'token': token} if task['type'] and 'Turnstile' in task['type'] else {'gRecaptchaResponse': token}
+        return {'errorId': 0, 'status': 'ready', 'solution': solution}
+
+    def count_request(self, path: str):
+        with self.lock:
+            if path == '/createTask':
+                self.create_calls += 1
+            else:
+                self.result_calls += 1
+
+    def reject_http(self) -> bool:
+        if self.http_error_rate and random.random() < self.http_error_rate:
+            with self.lock:
+                self.errors['http'] += 1
+            return True
+        return False
+
+    def counts(self) -> Dict:
+        with self.lock:
+            return {
+                'createTask': self.create_calls,
+                'getTaskResult': self.result_calls,
+                'total': self.create_calls + self.result_calls,
+                'errors': dict(self.errors),
+                'avg_solve_s': round(sum(self.solve_times) / len(self.solve_times), 2) if self.solve_times else 0
+            }
+
+
+class MockCapSolverServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Default backlog of 5 drops bursts of concurrent connects
+
+
+def make_handler(state: MockCapSolverState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length) or b'{}')
+
+            path = self.path.rstrip('/')
+            if path not in ('/createTask', '/getTaskResult'):
+                self.send_error(404)
+                return
+            state.count_request(path)
+
+            delay = state.api_latency()
+            if delay:
+                time.sleep(delay)
+
+            if state.reject_http():
+                self._send(503, {'errorId': 1, 'errorCode': 'ERROR_SERVICE_UNAVAILABLE',
+                                 'errorDescription': 'Mock: injected HTTP error'})
+                return
+
+            body = state.create_task(payload) if path == '/createTask' else state.get_task_result(payload)
+            self._send(200, body)
+
+        def _send(self, status: int, body: Dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_mock_capsolver(port: int = 0, solve_time: Union[str, float] = 5.0,
+                         **state_kwargs) -> Tuple[MockCapSolverServer, MockCapSolverState, str]:
+    """
+    Start the mock on a background thread
+
+    Args:
+        port: 0 picks a free port
+        solve_time: Latency spec, e.g. 5 or "lognormal:12,0.5"
+        **state_kwargs: create_error_rate, solve_error_rate, http_error_rate, api_latency
+
+    Returns:
+        (server, state, base_url) - call server.shutdown() when done
+    """
+    state = MockCapSolverState(solve_time, **state_kwargs)
+    server = MockCapSolverServer(('127.0.0.1', port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a local mock CapSolver API')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--solve-time', default='5', help='Latency spec, e.g. 5, uniform:5,30, lognormal:12,0.5')
+    parser.add_argument('--api-latency', default='0', help='Latency spec added to every request')
+    parser.add_argument('--create-error-rate', type=float, default=0.0)
+    parser.add_argument('--solve-error-rate', type=float, default=0.0)
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, state, url = start_mock_capsolver(
+        args.port, args.solve_time,
+        create_error_rate=args.create_error_rate,
+        solve_error_rate=args.solve_error_rate,
+        http_error_rate=args.http_error_rate,
+        api_latency=args.api_latency
+    )
+    print(f"🧪 Mock CapSolver listening on {url} (solve time {args.solve_time})")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"   {state.counts()}")
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,13 +1,22 @@
 """
 Reusable CAPTCHA solving service using CapSolver API
 Can be imported and used across multiple scripts in the project
+
+solve_async() runs on a pooled httpx.AsyncClient so many solves can share one
+event loop; solve() is a thin blocking wrapper around it.
 """
 
-import requests
+import os
 import time
-import re
+import asyncio
+import weakref
+import threading
 from typing import Optional, Tuple
 
+import httpx
+
+from .detection import DETECT_JS, detect_captcha, detect_captcha_html, inject_token, _to_info
+
 
 class CaptchaSolver:
     """
@@ -15,15 +24,31 @@ class CaptchaSolver:
     Supports: ReCaptcha v2, ReCaptcha v3, hCaptcha
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: str = None, poll_interval: float = 3.0,
+                 max_connections: int = 100):
         """
         Initialize solver with CapSolver API key
         
         Args:
             api_key: Your CapSolver API key
+            base_url: API root (defaults to CAPSOLVER_BASE_URL env var or api.capsolver.com)
+            poll_interval: Seconds between getTaskResult polls
+            max_connections: Size of the pooled HTTP connection limit
         """
         self.api_key = api_key
-        self.base_url = "https://api.capsolver.com"
+        self.base_url = (base_url or os.getenv('CAPSOLVER_BASE_URL') or "https://api.capsolver.com").rstrip('/')
+        self.poll_interval = poll_interval
+        self.max_connections = max_connections
+        
+        # One AsyncClient per event loop (httpx clients are bound to the loop that created them)
+        self._clients = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+        
+        # Background loop backing the sync solve() wrapper, created on first use
+        self._sync_loop = None
+        self._sync_thread = None
+        self._sync_pid = None
+        self._sync_lock = threading.Lock()
     
     def detect_captcha_type(self, page_content: str, page_locator=None) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -31,85 +56,136 @@ class CaptchaSolver:
         
         Args:
             page_content: HTML content of the page (string)
-            page_locator: Optional Playwright page object for element checking
+            page_locator: Optional sync Playwright page; when given, detection runs
+                as a single page.evaluate and page_content is ignored
             
         Returns:
             Tuple of (captcha_type, site_key) or (None, None) if no CAPTCHA found
             
         Example:
-            captcha_type, site_key = solver.detect_captcha_type(page.content(), page)
+            captcha_type, site_key = solver.detect_captcha_type(page.content())
+        
+        Prefer services.captcha.detection.detect_captcha(), which also returns
+        the reCAPTCHA v3 / Turnstile action.
         """
-        # ReCaptcha v2 detection
-        if page_locator and hasattr(page_locator, 'locator'):
+        captcha = None
+        if page_locator is not None and hasattr(page_locator, 'evaluate'):
             try:
-                if page_locator.locator('.g-recaptcha').count() > 0:
-                    site_key = page_locator.locator('.g-recaptcha').get_attribute('data-sitekey')
-                    return "ReCaptchaV2TaskProxyLess", site_key
-            except:
-                pass
-        
-        # Check HTML content for ReCaptcha v2
-        recaptcha_v2_match = re.search(r'class=["\']g-recaptcha["\'][^>]*data-sitekey=["\']([^"\']+)["\']', page_content)
-        if recaptcha_v2_match:
-            return "ReCaptchaV2TaskProxyLess", recaptcha_v2_match.group(1)
-        
-        # ReCaptcha v3 detection
-        if 'grecaptcha.execute' in page_content:
-            match = re.search(r'grecaptcha\.execute\(["\']([^"\']+)["\']', page_content)
-            if match:
-                return "ReCaptchaV3TaskProxyLess", match.group(1)
-        
-        # hCaptcha detection
-        if page_locator and hasattr(page_locator, 'locator'):
+                result = page_locator.evaluate(DETECT_JS)
+                if asyncio.iscoroutine(result):
+                    result.close()  # Async page: can't await here, use the HTML instead
+                else:
+                    captcha = _to_info(result)
+            except Exception:
+                captcha = None
+        if captcha is None:
+            captcha = detect_captcha_html(page_content)
+        
+        if not captcha:
+            return None, None
+        return captcha.task_type, captcha.site_key
+    
+    # ------------------------------------------------------------------
+    # HTTP client
+    # ------------------------------------------------------------------
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client for the running event loop (keep-alive across solves)"""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            # The client references its loop, so weak keys alone never drop a finished asyncio.run() loop
+            for dead in [l for l in self._clients if l.is_closed()]:
+                del self._clients[dead]
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers={"Content-Type": "application/json"},
+                    timeout=httpx.Timeout(30.0),
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections)
+                )
+                self._clients[loop] = client
+            return client
+    
+    async def _post(self, path: str, payload: dict) -> dict:
+        response = await self._get_client().post(path, json=payload)
+        if response.status_code >= 500:
+            response.raise_for_status()  # Transient - callers retry polls on exceptions
+        return response.json()
+    
+    async def aclose(self):
+        """
+        Close the pooled client of every event loop that used this solver
+        
+        Each client is closed on its own loop. Sync callers can use
+        asyncio.run(solver.aclose()).
+        """
+        with self._clients_lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+        current = asyncio.get_running_loop()
+        for loop, client in clients:
+            if client.is_closed or loop.is_closed():
+                continue  # A closed loop took its connections with it
             try:
-                if page_locator.locator('.h-captcha').count() > 0:
-                    site_key = page_locator.locator('.h-captcha').get_attribute('data-sitekey')
-                    return "HCaptchaTaskProxyLess", site_key
-            except:
-                pass
-        
-        # Check HTML content for hCaptcha
-        hcaptcha_match = re.search(r'class=["\']h-captcha["\'][^>]*data-sitekey=["\']([^"\']+)["\']', page_content)
-        if hcaptcha_match:
-            return "HCaptchaTaskProxyLess", hcaptcha_match.group(1)
-        
-        return None, None
+                if loop is current:
+                    await client.aclose()
+                elif loop.is_running():
+                    closing = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                    await asyncio.wait_for(asyncio.wrap_future(closing), timeout=5)
+            except Exception as e:
+                print(f"⚠️ Could not close CapSolver client: {e}")
+    
+    # ------------------------------------------------------------------
+    # Solving
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def build_task(captcha_type: str, site_key: str, page_url: str, page_action: str = None) -> dict:
+        """CapSolver task object for createTask"""
+        task = {
+            "type": captcha_type,
+            "websiteURL": page_url,
+            "websiteKey": site_key
+        }
+        if page_action:
+            if "Turnstile" in captcha_type:
+                task["metadata"] = {"action": page_action}
+            else:
+                task["pageAction"] = page_action
+        return task
     
-    def solve(self, captcha_type: str, site_key: str, page_url: str, timeout: int = 180) -> Optional[str]:
+    async def solve_async(self, captcha_type: str, site_key: str, page_url: str, timeout: int = 180,
+                          page_action: str = None) -> Optional[str]:
         """
-        Solve CAPTCHA using CapSolver API
+        Solve CAPTCHA using CapSolver API without blocking the event loop
         
         Args:
             captcha_type: Type of CAPTCHA (e.g., "ReCaptchaV2TaskProxyLess")
             site_key: The site key extracted from the page
             page_url: URL of the page with the CAPTCHA
             timeout: Maximum time to wait for solution (seconds)
+            page_action: reCAPTCHA v3 / Turnstile action, if the page uses one
             
         Returns:
             CAPTCHA solution token (string) or None if failed
             
         Example:
-            token = solver.solve("ReCaptchaV2TaskProxyLess", site_key, "https://example.com")
+            tokens = await asyncio.gather(*[
+                solver.solve_async("ReCaptchaV2TaskProxyLess", site_key, url) for url in urls
+            ])
         """
-        # Create task
+        if not site_key:
+            print(f"❌ No site key for {captcha_type} - not submitting a task")
+            return None
         create_payload = {
             "clientKey": self.api_key,
-            "task": {
-                "type": captcha_type,
-                "websiteURL": page_url,
-                "websiteKey": site_key
-            }
+            "task": self.build_task(captcha_type, site_key, page_url, page_action)
         }
         
-        headers = {"Content-Type": "application/json"}
-        
         try:
-            response = requests.post(
-                f"{self.base_url}/createTask",
-                json=create_payload,
-                headers=headers
-            )
-            result = response.json()
+            result = await self._post("/createTask", create_payload)
             
             if result.get("errorId") != 0:
                 error_msg = result.get('errorDescription', 'Unknown error')
@@ -121,25 +197,31 @@ class CaptchaSolver:
             
             # Poll for result
             get_payload = {"clientKey": self.api_key, "taskId": task_id}
+            started = time.monotonic()
+            polls = 0
             
-            max_attempts = timeout // 3
-            for attempt in range(max_attempts):
-                time.sleep(3)
+            while time.monotonic() - started < timeout:
+                await asyncio.sleep(self.poll_interval)
+                polls += 1
                 
-                result = requests.post(
-                    f"{self.base_url}/getTaskResult",
-                    json=get_payload,
-                    headers=headers
-                )
-                data = result.json()
+                try:
+                    data = await self._post("/getTaskResult", get_payload)
+                except httpx.HTTPError as e:
+                    print(f"⚠️ CAPTCHA poll failed, retrying: {str(e)[:100]}")
+                    continue
+                
+                if data.get("errorId"):
+                    print(f"❌ CapSolver error: {data.get('errorDescription', 'Unknown error')}")
+                    return None
                 
                 if data.get("status") == "ready":
-                    token = data["solution"]["gRecaptchaResponse"]
+                    solution = data.get("solution", {})
+                    token = solution.get("gRecaptchaResponse") or solution.get("token")
                     print(f"✅ CAPTCHA solved!")
                     return token
                 
-                if attempt % 10 == 0:
-                    print(f"⏳ Still solving... ({attempt * 3}s elapsed)")
+                if polls % 10 == 0:
+                    print(f"⏳ Still solving... ({time.monotonic() - started:.0f}s elapsed)")
             
             print(f"⚠️ CAPTCHA solving timeout after {timeout}s")
             return None
@@ -148,6 +230,46 @@ class CaptchaSolver:
             print(f"❌ CAPTCHA solving error: {str(e)}")
             return None
     
+    def _sync_runner(self) -> asyncio.AbstractEventLoop:
+        """Event loop on a daemon thread that serves every sync solve() call"""
+        with self._sync_lock:
+            # A forked worker inherits the attributes but not the thread
+            if self._sync_loop is None or self._sync_pid != os.getpid():
+                self._sync_loop = asyncio.new_event_loop()
+                self._sync_thread = threading.Thread(
+                    target=self._sync_loop.run_forever, name="captcha-solver", daemon=True
+                )
+                self._sync_thread.start()
+                self._sync_pid = os.getpid()
+            return self._sync_loop
+    
+    def solve(self, captcha_type: str, site_key: str, page_url: str, timeout: int = 180,
+              page_action: str = None) -> Optional[str]:
+        """
+        Solve CAPTCHA using CapSolver API (blocking)
+        
+        Thin wrapper over solve_async(); concurrent callers from different threads
+        share one background loop and one connection pool. Don't call this from
+        inside a running event loop - await solve_async() instead.
+        
+        Args:
+            captcha_type: Type of CAPTCHA (e.g., "ReCaptchaV2TaskProxyLess")
+            site_key: The site key extracted from the page
+            page_url: URL of the page with the CAPTCHA
+            timeout: Maximum time to wait for solution (seconds)
+            page_action: reCAPTCHA v3 / Turnstile action, if the page uses one
+            
+        Returns:
+            CAPTCHA solution token (string) or None if failed
+            
+        Example:
+            token = solver.solve("ReCaptchaV2TaskProxyLess", site_key, "https://example.com")
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.solve_async(captcha_type, site_key, page_url, timeout, page_action), self._sync_runner()
+        )
+        return future.result()
+    
     def inject_token(self, page_executor, token: str, captcha_type: str = "recaptcha"):
         """
         Inject solved CAPTCHA token into page
@@ -155,7 +277,7 @@ class CaptchaSolver:
         Args:
             page_executor: Playwright page.evaluate function or similar
             token: The solved CAPTCHA token
-            captcha_type: Type of CAPTCHA ("recaptcha" or "hcaptcha")
+            captcha_type: Type of CAPTCHA ("recaptcha", "hcaptcha" or "turnstile")
             
         Example (Playwright):
             solver.inject_token(page.evaluate, token)
@@ -179,6 +301,13 @@ class CaptchaSolver:
                     textarea.value = "{token}";
                 }}
             }}''')
+        elif captcha_type.lower() == "turnstile":
+            page_executor(f'''() => {{
+                const input = document.querySelector('[name="cf-turnstile-response"]');
+                if (input) {{
+                    input.value = "{token}";
+                }}
+            }}''')
     
     def solve_and_inject(self, page, page_url: str, timeout: int = 180) -> bool:
         """
@@ -198,35 +327,49 @@ class CaptchaSolver:
         """
         print("🔍 Detecting CAPTCHA...")
         
-        page_content = page.content()
-        captcha_type, site_key = self.detect_captcha_type(page_content, page)
+        captcha = detect_captcha(page)
         
-        if not captcha_type:
+        if not captcha:
             print("ℹ️ No CAPTCHA detected")
             return True
         
-        print(f"🤖 Found {captcha_type}")
-        print(f"🔑 Site key: {site_key}")
+        print(f"🤖 Found {captcha.task_type}")
+        if not captcha.solvable:
+            print("⚠️ No site key (Cloudflare challenge?) - can't be solved with a token")
+            return False
+        print(f"🔑 Site key: {captcha.site_key}")
         
-        token = self.solve(captcha_type, site_key, page_url, timeout)
+        token = self.solve(captcha.task_type, captcha.site_key, page_url, timeout, captcha.action)
         
         if not token:
             return False
         
         print("💉 Injecting token...")
-        self.inject_token(page.evaluate, token)
+        inject_token(page, captcha, token)
         
         return True
 
 
+# One solver per API key for solve_captcha_quick(): each CaptchaSolver owns a
+# background loop thread and a connection pool, so building one per call leaked both
+_quick_solvers = {}
+_quick_solvers_lock = threading.Lock()
+
+
 # Convenience function for quick usage
 def solve_captcha_quick(api_key: str, page, page_url: str) -> bool:
     """
     Quick one-liner to solve CAPTCHA
     
+    Repeated calls with the same API key share one CaptchaSolver (and its
+    loop thread and connection pool).
+    
     Example:
         from services.captcha.solver import solve_captcha_quick
         solve_captcha_quick(CAPSOLVER_API_KEY, page, page.url)
     """
-    solver = CaptchaSolver(api_key)
+    with _quick_solvers_lock:
+        solver = _quick_solvers.get(api_key)
+        if solver is None:
+            solver = _quick_solvers[api_key] = CaptchaSolver(api_key)
     return solver.solve_and_inject(page, page_url)
\ No newline at end of file
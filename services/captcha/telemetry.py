@@ -0,0 +1,297 @@
+"""
+CAPTCHA encounter telemetry and session reuse
+Records every search's CAPTCHA outcome (per county, per browser context, by
+searches already made on that context) to JSONL, and uses what it sees to
+decide whether a context that has already passed a CAPTCHA needs a fresh solve.
+
+The portal renders its widget on every search page, but a session that has
+passed once is often not asked again. SessionReusePolicy probes that: it
+submits without a token on verified contexts, solves only when the site
+rejects the search, and stops probing a county whose rejections stay high.
+
+Usage:
+    python services/captcha/telemetry.py output/captcha_worker_*.jsonl
+"""
+
+import sys
+import json
+import glob
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+
+class SessionReusePolicy:
+    """
+    When to skip solving a detected CAPTCHA on a context that already passed one.
+    Use enabled=False for the old behaviour (solve on every detection).
+    """
+
+    def __init__(self, enabled: bool = True,
+                 max_searches_per_pass: Optional[int] = None,
+                 min_reuse_success: float = 0.8,
+                 min_reuse_attempts: int = 10,
+                 reprobe_every: int = 100):
+        """
+        Args:
+            enabled: Try verified contexts without a token at all
+            max_searches_per_pass: Always solve after this many searches on one pass (None = no limit)
+            min_reuse_success: Stop reusing when fewer than this share of skipped solves are accepted
+            min_reuse_attempts: Skipped solves to observe before judging the success rate
+            reprobe_every: While reuse is switched off, still try it once every N searches
+        """
+        self.enabled = enabled
+        self.max_searches_per_pass = max_searches_per_pass
+        self.min_reuse_success = min_reuse_success
+        self.min_reuse_attempts = min_reuse_attempts
+        self.reprobe_every = reprobe_every
+
+
+class _SessionState:
+    """What one browser context has done so far"""
+
+    def __init__(self, context_id):
+        self.context_id = context_id
+        self.searches = 0
+        self.encounters = 0
+        self.solves = 0
+        self.passed = False
+        self.searches_since_pass = 0
+
+
+class CaptchaTelemetry:
+    """
+    Per-worker encounter log plus session reuse decisions
+
+    Example:
+        telemetry = CaptchaTelemetry("Dallas", worker_id, log_path=f"captcha_worker_{worker_id}.jsonl")
+        captcha = detect_captcha(page)
+        solve = telemetry.should_solve(runtime.context_id, captcha)
+        ...submit...
+        telemetry.record_search(runtime.context_id, captcha, solved=solve, success=success)
+        telemetry.print_report()
+    """
+
+    def __init__(self, county: str, worker_id=None, log_path: str = None, policy: SessionReusePolicy = None):
+        self.county = county
+        self.worker_id = worker_id
+        self.log_path = log_path
+        self.policy = policy or SessionReusePolicy()
+
+        self.sessions: Dict = {}
+        self._log = open(log_path, 'a', encoding='utf-8') if log_path else None
+
+        self.stats = {
+            'searches': 0, 'encounters': 0, 'solves': 0,
+            'reuse_attempts': 0, 'reuse_accepted': 0, 'reuse_rejected': 0,
+            'token_wait_s': 0.0
+        }
+        self._since_reprobe = 0
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    def session(self, context_id) -> _SessionState:
+        state = self.sessions.get(context_id)
+        if state is None:
+            state = self.sessions[context_id] = _SessionState(context_id)
+        return state
+
+    def reuse_enabled(self) -> bool:
+        """Whether skipped solves are still being accepted often enough to keep trying"""
+        policy = self.policy
+        if not policy.enabled:
+            return False
+        attempts = self.stats['reuse_attempts']
+        if attempts < policy.min_reuse_attempts:
+            return True
+        return self.stats['reuse_accepted'] / attempts >= policy.min_reuse_success
+
+    def should_solve(self, context_id, captcha) -> bool:
+        """True if the detected CAPTCHA should be solved before submitting"""
+        if not captcha:
+            return False
+        state = self.session(context_id)
+        if not state.passed:
+            return True
+
+        policy = self.policy
+        if policy.max_searches_per_pass and state.searches_since_pass >= policy.max_searches_per_pass:
+            return True
+        if self.reuse_enabled():
+            return False
+
+        # Reuse looked bad earlier - re-check occasionally in case the site relaxed
+        self._since_reprobe += 1
+        if policy.enabled and policy.reprobe_every and self._since_reprobe >= policy.reprobe_every:
+            self._since_reprobe = 0
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record_search(self, context_id, captcha, solved: bool, success: bool,
+                      reuse_rejected: bool = False, token_wait: float = 0.0):
+        """
+        Record one search.
+
+        Args:
+            context_id: ManagedBrowser.context_id the search ran on
+            captcha: CaptchaInfo from detect_captcha() (None if nothing was found)
+            solved: A token was solved and injected for this search
+            success: The search returned results / a no-results page
+            reuse_rejected: The search was first submitted without a token and the site refused it
+            token_wait: Seconds spent waiting for tokens
+        """
+        state = self.session(context_id)
+        reused = bool(captcha) and (reuse_rejected or not solved)
+
+        state.searches += 1
+        self.stats['searches'] += 1
+        self.stats['token_wait_s'] += token_wait
+        if captcha:
+            state.encounters += 1
+            self.stats['encounters'] += 1
+        if solved:
+            state.solves += 1
+            self.stats['solves'] += 1
+        if reused:
+            self.stats['reuse_attempts'] += 1
+            self.stats['reuse_rejected' if reuse_rejected else 'reuse_accepted'] += 1
+
+        if success and (solved or reused):
+            if solved:
+                state.searches_since_pass = 0
+            state.passed = True
+        elif reuse_rejected and not success:
+            state.passed = False
+        state.searches_since_pass += 1
+
+        if self._log:
+            self._log.write(json.dumps({
+                'ts': round(time.time(), 3),
+                'county': self.county,
+                'worker': self.worker_id,
+                'context': context_id,
+                'context_search': state.searches,       # 1 = first search on this context
+                'detected': bool(captcha),
+                'vendor': captcha.vendor if captcha else None,
+                'solved': solved,
+                'reused': reused,
+                'reuse_rejected': reuse_rejected,
+                'success': success,
+                'token_wait_s': round(token_wait, 2)
+            }) + '\n')
+            self._log.flush()
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict:
+        stats = self.stats
+        searches = stats['searches']
+        return {
+            **stats,
+            'contexts': len(self.sessions),
+            # Solving on every detection (the old behaviour) costs one solve per encounter
+            'solves_per_100_before': round(stats['encounters'] * 100 / searches, 1) if searches else 0,
+            'solves_per_100': round(stats['solves'] * 100 / searches, 1) if searches else 0,
+            'reuse_enabled': self.reuse_enabled()
+        }
+
+    def print_report(self, prefix: str = ""):
+        s = self.summary()
+        print(f"{prefix}CAPTCHA: {s['encounters']}/{s['searches']} searches hit one | "
+              f"Solves/100 searches: {s['solves_per_100_before']} -> {s['solves_per_100']} | "
+              f"Reuse: {s['reuse_accepted']}/{s['reuse_attempts']} accepted over {s['contexts']} contexts")
+
+
+# ============================================================================
+# LOG ANALYSIS
+# ============================================================================
+
+# Searches-on-context buckets: does the site re-challenge old sessions?
+CONTEXT_AGE_BUCKETS = [(1, 1), (2, 10), (11, 50), (51, 200), (201, None)]
+
+
+def _bucket_label(n: int) -> str:
+    for low, high in CONTEXT_AGE_BUCKETS:
+        if high is None or n <= high:
+            return f"{low}+" if high is None else (f"{low}" if low == high else f"{low}-{high}")
+
+
+def load_events(paths: List[str]) -> List[Dict]:
+    events = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+    return events
+
+
+def summarize_events(events: List[Dict]) -> Dict:
+    """
+    Aggregate JSONL events per county, and per county by searches-on-context bucket
+
+    Returns:
+        {county: {'searches', 'encounters', 'solves', 'reuse_attempts', 'reuse_accepted',
+                  'contexts', 'solves_per_100_before', 'solves_per_100', 'by_context_age': {...}}}
+    """
+    counties = defaultdict(lambda: {'searches': 0, 'encounters': 0, 'solves': 0, 'reuse_attempts': 0,
+                                    'reuse_accepted': 0, 'contexts': set(),
+                                    'by_context_age': defaultdict(lambda: {'searches': 0, 'solves': 0,
+                                                                           'reuse_rejected': 0})})
+    for e in events:
+        c = counties[e['county']]
+        c['searches'] += 1
+        c['encounters'] += e['detected']
+        c['solves'] += e['solved']
+        c['reuse_attempts'] += e['reused']
+        c['reuse_accepted'] += e['reused'] and not e['reuse_rejected']
+        c['contexts'].add((e['worker'], e['context']))
+
+        age = c['by_context_age'][_bucket_label(e['context_search'])]
+        age['searches'] += 1
+        age['solves'] += e['solved']
+        age['reuse_rejected'] += e['reuse_rejected']
+
+    report = {}
+    for county, c in counties.items():
+        searches = c['searches']
+        report[county] = {
+            **{k: v for k, v in c.items() if k not in ('contexts', 'by_context_age')},
+            'contexts': len(c['contexts']),
+            'solves_per_100_before': round(c['encounters'] * 100 / searches, 1),
+            'solves_per_100': round(c['solves'] * 100 / searches, 1),
+            'by_context_age': {label: dict(v) for label, v in c['by_context_age'].items()}
+        }
+    return report
+
+
+def print_summary(report: Dict):
+    for county, c in report.items():
+        print(f"\n📊 {county}: {c['searches']} searches over {c['contexts']} contexts")
+        print(f"   CAPTCHA shown: {c['encounters']} | Solved: {c['solves']} | "
+              f"Reuse accepted: {c['reuse_accepted']}/{c['reuse_attempts']}")
+        print(f"   Solves per 100 searches: {c['solves_per_100_before']} (solve every detection) -> {c['solves_per_100']}")
+        print(f"   {'search # on context':<22} {'searches':>9} {'solves':>7} {'rejected':>9}")
+        for label in (_bucket_label(low) for low, _ in CONTEXT_AGE_BUCKETS):
+            v = c['by_context_age'].get(label)
+            if v:
+                print(f"   {label:<22} {v['searches']:>9} {v['solves']:>7} {v['reuse_rejected']:>9}")
+
+
+if __name__ == "__main__":
+    paths = [p for pattern in sys.argv[1:] for p in glob.glob(pattern)]
+    if not paths:
+        print("Usage: python services/captcha/telemetry.py <captcha_log.jsonl> [...]")
+        sys.exit(1)
+    print_summary(summarize_events(load_events(paths)))
@@ -0,0 +1,225 @@
+"""
+Pre-solved CAPTCHA token pool
+Keeps a few solved tokens ready per (site_key, page_url) so searches take one
+instead of waiting 10-60s on a fresh solve. Pre-solving tracks the recent
+search rate and the remaining queue depth; tokens are evicted before Google's
+~120s expiry.
+"""
+
+import math
+import time
+import asyncio
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from .broker import CaptchaBroker
+
+
+class _KeyState:
+    """Pool state for one (site_key, page_url)"""
+
+    def __init__(self, captcha_type: str, site_key: str, page_url: str, page_action: str = None):
+        self.captcha_type = captcha_type
+        self.page_action = page_action
+        self.site_key = site_key
+        self.page_url = page_url
+        self.ready = deque()      # (token, solved_at)
+        self.waiters = deque()    # Futures of searches that found the pool empty
+        self.inflight = 0
+        self.takes = deque()      # Timestamps of recent take() calls
+
+
+class TokenPool:
+    """
+    Example:
+        pool = TokenPool(broker, queue_depth=lambda: work_queue.qsize())
+        token = await pool.take("ReCaptchaV2TaskProxyLess", site_key, URL)
+        ...
+        pool.print_report()
+        await pool.stop()
+    """
+
+    def __init__(self, broker: CaptchaBroker,
+                 token_ttl: float = 110.0,
+                 max_ready_per_key: int = 20,
+                 lead_factor: float = 1.2,
+                 rate_window: float = 60.0,
+                 refill_interval: float = 1.0,
+                 cost_per_solve: float = 0.0008,
+                 queue_depth: Callable[[], int] = None):
+        """
+        Args:
+            broker: CaptchaBroker that performs the solves
+            token_ttl: Seconds after solving before a token is discarded unused
+            max_ready_per_key: Cap on pre-solved (ready + in-flight) tokens per key
+            lead_factor: Over-provisioning on top of rate x solve time
+            rate_window: Seconds of take() history used to estimate search rate
+            refill_interval: Seconds between evict/top-up passes
+            cost_per_solve: USD per solve (CapSolver reCAPTCHA v2 is ~$0.80/1000)
+            queue_depth: Optional callable returning searches still queued; the
+                pool never pre-solves more tokens than there is work left
+        """
+        self.broker = broker
+        self.token_ttl = token_ttl
+        self.max_ready_per_key = max_ready_per_key
+        self.lead_factor = lead_factor
+        self.rate_window = rate_window
+        self.refill_interval = refill_interval
+        self.cost_per_solve = cost_per_solve
+        self.queue_depth = queue_depth
+
+        self.keys: Dict[Tuple[str, str], _KeyState] = {}
+        self._queue_depth: Optional[int] = None
+        self._refiller: Optional[asyncio.Task] = None
+        self._solves = set()
+
+        self.stats = {'takes': 0, 'hits': 0, 'misses': 0, 'solves': 0, 'failed': 0, 'wasted': 0, 'timeouts': 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def take(self, captcha_type: str, site_key: str, page_url: str, timeout: int = 180,
+                   page_action: str = None) -> Optional[str]:
+        """Ready token if one exists, otherwise the next token to finish solving"""
+        self._ensure_running()
+        state = self._state(captcha_type, site_key, page_url, page_action)
+
+        now = time.monotonic()
+        state.takes.append(now)
+        self.stats['takes'] += 1
+        self._evict(state, now)
+
+        if state.ready:
+            self.stats['hits'] += 1
+            token, _ = state.ready.popleft()  # Oldest first, so fewer tokens expire
+            self._top_up(state)
+            return token
+
+        self.stats['misses'] += 1
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        self._top_up(state)
+
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            return None
+        finally:
+            if waiter in state.waiters:
+                state.waiters.remove(waiter)
+
+    async def stop(self):
+        """Stop pre-solving; tokens still in the pool count as wasted"""
+        if self._refiller:
+            self._refiller.cancel()
+            try:
+                await self._refiller
+            except asyncio.CancelledError:
+                pass
+            self._refiller = None
+        for solve in list(self._solves):
+            solve.cancel()
+        for state in self.keys.values():
+            self.stats['wasted'] += len(state.ready)
+            state.ready.clear()
+
+    def metrics(self) -> Dict:
+        stats = self.stats
+        cost = stats['solves'] * self.cost_per_solve
+        return {
+            **stats,
+            'hit_rate': round(stats['hits'] / stats['takes'], 3) if stats['takes'] else 0,
+            'waste_rate': round(stats['wasted'] / stats['solves'], 3) if stats['solves'] else 0,
+            'cost': round(cost, 4),
+            'cost_per_search': round(cost / stats['takes'], 5) if stats['takes'] else 0,
+            'ready': sum(len(s.ready) for s in self.keys.values()),
+            'inflight': sum(s.inflight for s in self.keys.values())
+        }
+
+    def print_report(self, prefix: str = ""):
+        m = self.metrics()
+        print(f"{prefix}Token pool: {m['hits']}/{m['takes']} hits ({m['hit_rate']:.1%}) | "
+              f"Solves: {m['solves']} | Wasted: {m['wasted']} ({m['waste_rate']:.1%}) | "
+              f"Cost: ${m['cost']:.4f} (${m['cost_per_search']:.5f}/search)")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _state(self, captcha_type: str, site_key: str, page_url: str, page_action: str = None) -> _KeyState:
+        key = (site_key, page_url)
+        state = self.keys.get(key)
+        if state is None:
+            state = self.keys[key] = _KeyState(captcha_type, site_key, page_url, page_action)
+        return state
+
+    def _ensure_running(self):
+        if self._refiller is None or self._refiller.done():
+            self._refiller = asyncio.get_running_loop().create_task(self._refill_loop())
+
+    def _evict(self, state: _KeyState, now: float):
+        while state.ready and now - state.ready[0][1] > self.token_ttl:
+            state.ready.popleft()
+            self.stats['wasted'] += 1
+        while state.takes and now - state.takes[0] > self.rate_window:
+            state.takes.popleft()
+
+    def _target(self, state: _KeyState) -> int:
+        """Tokens to keep ready or solving beyond the searches already waiting"""
+        if not state.takes:
+            return 0
+        window = min(self.rate_window, max(1.0, time.monotonic() - state.takes[0]))
+        rate = len(state.takes) / window  # searches/second
+        lead_time = self.broker._estimate(state.captcha_type) + self.refill_interval
+        target = min(self.max_ready_per_key, math.ceil(rate * lead_time * self.lead_factor))
+        if self._queue_depth is not None:
+            target = min(target, max(0, self._queue_depth - len(state.waiters)))
+        return target
+
+    def _top_up(self, state: _KeyState):
+        desired = len(state.waiters) + self._target(state)
+        for _ in range(desired - len(state.ready) - state.inflight):
+            # Count it now, not when the task starts, or a burst of take() calls over-spawns
+            state.inflight += 1
+            solve = asyncio.get_running_loop().create_task(self._solve_one(state))
+            self._solves.add(solve)
+            solve.add_done_callback(self._solves.discard)
+
+    async def _solve_one(self, state: _KeyState):
+        self.stats['solves'] += 1
+        try:
+            token = await self.broker.solve(state.captcha_type, state.site_key, state.page_url,
+                                            page_action=state.page_action)
+        finally:
+            state.inflight -= 1
+
+        if not token:
+            self.stats['failed'] += 1
+            return
+
+        # Hand straight to a waiting search, otherwise keep it for the next one
+        while state.waiters:
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(token)
+                return
+        state.ready.append((token, time.monotonic()))
+
+    async def _refill_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if self.queue_depth:
+                try:
+                    # May be a manager-queue proxy call, so keep it off the loop
+                    self._queue_depth = await loop.run_in_executor(None, self.queue_depth)
+                except Exception:
+                    self._queue_depth = None
+
+            now = time.monotonic()
+            for state in self.keys.values():
+                self._evict(state, now)
+                self._top_up(state)
+
+            await asyncio.sleep(self.refill_interval)
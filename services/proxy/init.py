@@ -0,0 +1,3 @@
+from .pool import Proxy, ProxyPool, ProxyRequirements, NoProxyAvailable
+
+__all__ = ['Proxy', 'ProxyPool', 'ProxyRequirements', 'NoProxyAvailable']
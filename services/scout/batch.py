@@ -0,0 +1,340 @@
+"""
+Scout Batch - generate scrapers for many counties at once
+
+Selects every county/record type that has a search URL but no generated
+scraper and runs N scout agents concurrently, each with its own headless
+browser and test runner. All agents share the process-wide Claude client,
+so the on-disk response cache and the tokens/requests-per-minute limiter
+(SCOUT_LLM_TPM / SCOUT_LLM_RPM) apply across the whole batch.
+
+Progress is written to a JSON file after every job, so an interrupted batch
+picks up where it stopped: finished jobs are skipped, jobs that were running
+when the process died are re-run, and failed jobs are retried up to
+--max-attempts times. Each job's output goes to its own log file.
+
+Usage:
+    python services/scout/batch.py --state TX --concurrency 6
+    python services/scout/batch.py --state TX --record-type probate --limit 20
+    python services/scout/batch.py --state TX --retry-failed      # ignore previous failures
+    python services/scout/batch.py --state TX --dry-run           # just list what would run
+    python services/scout/batch.py --state TX --candidates 3      # 3 scrapers per job, fastest wins
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import contextvars
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+# Add project root to path (go up 2 levels: scout -> services -> root)
+project_root = Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(project_root))
+
+from database.models import SessionLocal, County
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+RECORD_TYPES = ('property', 'tax', 'probate')
+
+BATCH_DIR = project_root / ".cache" / "scout_batch"
+DEFAULT_PROGRESS_PATH = BATCH_DIR / "progress.json"
+LOG_DIR = BATCH_DIR / "logs"
+
+DEFAULT_CONCURRENCY = 4      # Scout agents running at once
+BATCH_TEST_CONCURRENCY = 2   # Test-runner browsers per agent (agents x this = test browsers)
+DEFAULT_MAX_ATTEMPTS = 2     # Runs per job before it's left for --retry-failed
+
+
+# ============================================================================
+# JOB SELECTION
+# ============================================================================
+
+def select_pending_jobs(db, state=None, record_types=RECORD_TYPES, county_ids=None) -> List[Dict]:
+    """
+    Every county/record type with a search URL and no generated scraper,
+    largest counties first.
+
+    Returns:
+        [{'key', 'county_id', 'county_name', 'state', 'record_type', 'url'}, ...]
+    """
+    query = db.query(County).filter(County.is_active == True)
+    if state:
+        query = query.filter(County.state == state.upper())
+    if county_ids:
+        query = query.filter(County.id.in_(county_ids))
+
+    jobs = []
+    for county in query.order_by(County.population.desc().nullslast(), County.name).all():
+        for record_type in record_types:
+            url = getattr(county, f"{record_type}_search_url")
+            if url and not getattr(county, f"{record_type}_scraper_generated"):
+                jobs.append({
+                    'key': f"{county.id}:{record_type}",
+                    'county_id': county.id,
+                    'county_name': county.name,
+                    'state': county.state,
+                    'record_type': record_type,
+                    'url': url
+                })
+    return jobs
+
+
+# ============================================================================
+# PROGRESS FILE
+# ============================================================================
+
+class BatchProgress:
+    """
+    Per-job status persisted as JSON (rewritten atomically after every change)
+
+    Example:
+        progress = BatchProgress()
+        if progress.should_run(job['key'], max_attempts=2):
+            progress.mark(job['key'], 'running', county=job['county_name'])
+    """
+
+    def __init__(self, path=DEFAULT_PROGRESS_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.jobs: Dict[str, Dict] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.jobs = json.load(f).get('jobs', {})
+
+    def should_run(self, key: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS, retry_failed: bool = False) -> bool:
+        entry = self.jobs.get(key)
+        if entry is None or entry['status'] == 'running':  # 'running' = process died mid-job
+            return True
+        if entry['status'] == 'done':
+            return False
+        return retry_failed or entry.get('attempts', 0) < max_attempts
+
+    def mark(self, key: str, status: str, **fields):
+        with self._lock:
+            entry = self.jobs.setdefault(key, {'attempts': 0})
+            if status == 'running':
+                entry['attempts'] = entry.get('attempts', 0) + 1
+                entry['started'] = datetime.now().isoformat(timespec='seconds')
+                entry.pop('error', None)
+            else:
+                entry['finished'] = datetime.now().isoformat(timespec='seconds')
+            entry['status'] = status
+            entry.update(fields)
+            self._save()
+
+    def reset(self, key: str):
+        """Forget a job so the next batch runs it again (e.g. its scraper failed a health check)"""
+        with self._lock:
+            if self.jobs.pop(key, None) is not None:
+                self._save()
+
+    def _save(self):
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'updated': datetime.now().isoformat(timespec='seconds'), 'jobs': self.jobs}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {}
+        for entry in self.jobs.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
+
+
+# ============================================================================
+# PER-JOB LOGS
+# ============================================================================
+
+class _ThreadRoutedStdout:
+    """
+    sys.stdout replacement: threads with a registered log file write there, the rest to the console.
+    The file is a context variable, so threads started with the job's context (parallel
+    candidates) log to the job's file too.
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self._file = contextvars.ContextVar('batch_log_file', default=None)
+
+    def route(self, log_file):
+        self._file.set(log_file)
+
+    def write(self, text):
+        target = self._file.get() or self.console
+        return target.write(text)
+
+    def flush(self):
+        target = self._file.get() or self.console
+        target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.console, name)
+
+
+def _log_path(job: Dict) -> Path:
+    slug = job['county_name'].lower().replace(' ', '_')
+    return LOG_DIR / f"{job['state'].lower()}_{slug}_{job['record_type']}.log"
+
+
+# ============================================================================
+# BATCH RUNNER
+# ============================================================================
+
+def run_job(job: Dict, router: _ThreadRoutedStdout, candidates: int = 1, optimize: bool = True) -> Dict:
+    """Run one scout agent in this thread, its output going to the job's log file"""
+    from services.scout import agent
+
+    log_path = _log_path(job)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    start = time.time()
+    with open(log_path, 'a', encoding='utf-8', buffering=1) as log:
+        router.route(log)
+        try:
+            print(f"\n{'#'*80}\n# Batch job {job['key']} started {datetime.now():%Y-%m-%d %H:%M:%S}\n{'#'*80}")
+            scraper_path = agent.generate_scraper_for_county(
+                county_id=job['county_id'], record_type=job['record_type'], headless=True, report=False,
+                candidates=candidates, optimize=optimize
+            )
+            error = None if scraper_path else "No working scraper (see log)"
+        except Exception as e:  # generate_scraper_for_county catches its own errors; this is a last resort
+            scraper_path, error = None, f"{type(e).__name__}: {e}"
+        finally:
+            router.route(None)
+    return {'scraper_path': scraper_path, 'error': error, 'elapsed_s': round(time.time() - start, 1),
+            'log': str(log_path)}
+
+
+def run_batch(jobs: List[Dict], concurrency: int = DEFAULT_CONCURRENCY, progress: BatchProgress = None,
+              max_attempts: int = DEFAULT_MAX_ATTEMPTS, retry_failed: bool = False, candidates: int = 1,
+              optimize: bool = True) -> Dict:
+    """
+    Generate scrapers for `jobs` with at most `concurrency` agents at once.
+
+    Returns:
+        {'done': int, 'failed': int, 'skipped': int, 'elapsed_s': float}
+    """
+    from services.scout import agent
+
+    progress = progress or BatchProgress()
+    todo = [job for job in jobs if progress.should_run(job['key'], max_attempts, retry_failed)]
+    skipped = len(jobs) - len(todo)
+
+    print(f"\n🚀 Scout batch: {len(todo)} jobs ({skipped} already done or out of attempts), "
+          f"{concurrency} at a time")
+    print(f"   LLM limits: {agent.LLM_REQUESTS_PER_MINUTE} req/min, {agent.LLM_TOKENS_PER_MINUTE:,} tokens/min")
+    print(f"   Progress: {progress.path}")
+    print(f"   Logs: {LOG_DIR}\n")
+
+    router = _ThreadRoutedStdout(sys.stdout)
+    sys.stdout = router
+    console = router.console
+
+    done = failed = 0
+    start = time.time()
+
+    def worker(job):
+        progress.mark(job['key'], 'running', county=job['county_name'], state=job['state'],
+                      record_type=job['record_type'], url=job['url'])
+        console.write(f"▶️ {job['county_name']}, {job['state']} - {job['record_type']}\n")
+        return run_job(job, router, candidates, optimize)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="scout")
+    try:
+        futures = {executor.submit(worker, job): job for job in todo}
+        for future in as_completed(futures):
+            job = futures[future]
+            result = future.result()
+            if result['scraper_path']:
+                done += 1
+                progress.mark(job['key'], 'done', **result)
+                mark = "✅"
+            else:
+                failed += 1
+                progress.mark(job['key'], 'failed', **result)
+                mark = "❌"
+            finished = done + failed
+            rate = finished / ((time.time() - start) / 3600)
+            console.write(f"{mark} [{finished}/{len(todo)}] {job['county_name']}, {job['state']} - "
+                          f"{job['record_type']} in {result['elapsed_s'] / 60:.1f} min "
+                          f"({rate:.1f} jobs/hour, {len(todo) - finished} left)\n")
+        executor.shutdown(wait=True)
+    except KeyboardInterrupt:
+        console.write("\n⏹️ Interrupted - running jobs stay 'running' and will be re-run on resume\n")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        sys.stdout = console
+
+    elapsed = time.time() - start
+    print(f"\n{'='*80}")
+    print(f"📊 Batch finished in {elapsed / 3600:.2f}h: {done} generated, {failed} failed, {skipped} skipped")
+    print(f"   Overall progress: {progress.counts()}")
+    agent.client.print_report("   ")
+    print(f"{'='*80}")
+    return {'done': done, 'failed': failed, 'skipped': skipped, 'elapsed_s': round(elapsed, 1)}
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate scrapers for every configured county')
+    parser.add_argument('--state', type=str, help='Only counties in this state (e.g. TX)')
+    parser.add_argument('--record-type', type=str, choices=RECORD_TYPES, action='append',
+                        help='Record type(s) to generate (default: all)')
+    parser.add_argument('--county-id', type=int, action='append', help='Only these county IDs')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Agents running at once')
+    parser.add_argument('--test-concurrency', type=int, default=BATCH_TEST_CONCURRENCY,
+                        help='Test-runner browsers per agent')
+    parser.add_argument('--candidates', type=int, default=1,
+                        help='Scrapers generated in parallel per job (fastest passing one is kept)')
+    parser.add_argument('--no-optimize', action='store_true', help='Skip the profile-driven speed rewrite')
+    parser.add_argument('--limit', type=int, help='Stop after this many jobs')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help='Runs per job before it is skipped on resume')
+    parser.add_argument('--retry-failed', action='store_true', help='Re-run failed jobs regardless of attempts')
+    parser.add_argument('--progress', type=str, default=str(DEFAULT_PROGRESS_PATH), help='Progress file')
+    parser.add_argument('--rpm', type=int, help='Claude requests/minute (default SCOUT_LLM_RPM or 50)')
+    parser.add_argument('--tpm', type=int, help='Claude tokens/minute (default SCOUT_LLM_TPM or 80000)')
+    parser.add_argument('--dry-run', action='store_true', help='List pending jobs and exit')
+    args = parser.parse_args()
+
+    # The limiter is built when agent.py is imported, from these env vars
+    if args.rpm:
+        os.environ['SCOUT_LLM_RPM'] = str(args.rpm)
+    if args.tpm:
+        os.environ['SCOUT_LLM_TPM'] = str(args.tpm)
+
+    db = SessionLocal()
+    try:
+        jobs = select_pending_jobs(db, args.state, tuple(args.record_type or RECORD_TYPES), args.county_id)
+    finally:
+        db.close()
+
+    progress = BatchProgress(args.progress)
+    if args.limit:
+        jobs = [job for job in jobs if progress.should_run(job['key'], args.max_attempts, args.retry_failed)]
+        jobs = jobs[:args.limit]
+
+    if args.dry_run:
+        for job in jobs:
+            status = progress.jobs.get(job['key'], {}).get('status', 'pending')
+            print(f"  {job['key']:<14} {job['county_name']:<20} {job['record_type']:<9} {status:<8} {job['url']}")
+        print(f"\n{len(jobs)} jobs")
+        sys.exit(0)
+
+    from services.scout import agent
+    agent.TEST_CONCURRENCY = args.test_concurrency
+
+    run_batch(jobs, args.concurrency, progress, args.max_attempts, args.retry_failed, args.candidates,
+              not args.no_optimize)
@@ -0,0 +1,213 @@
+"""
+Static checks for generated scraper code, run before any browser test
+
+A browser test costs up to a minute per name even when the candidate can't
+possibly work. These checks take milliseconds and catch the cheap failures:
+    1. the code parses
+    2. search() exists with the calling convention ScraperRegistry.invoke()
+       uses - page, first_name, last_name (+ death_date for probate)
+    3. every import resolves in this environment
+    4. no forbidden patterns in the scraper body: launching Playwright or a
+       browser per call, closing the pooled page, input(), long sleeps
+       (time.sleep or page.wait_for_timeout). Code under the __main__ guard,
+       and top-level functions only reachable from it (a `def main()` that
+       launches a browser to try search() by hand), is not checked
+
+Problems come back in the same shape as test errors so they go straight to
+fix_scraper_code.
+
+Usage:
+    issues = validate_scraper_code(code, record_type='probate')
+    if issues:
+        code = fix_scraper_code(code, as_test_errors(issues), attempt, 'probate')
+"""
+
+import ast
+import sys
+import importlib.util
+from typing import Dict, List
+
+REQUIRED_PARAMS = ['page', 'first_name', 'last_name']
+RECORD_TYPE_PARAMS = {'probate': ['death_date']}  # Passed by keyword when the caller has one
+
+MAX_SLEEP_S = 10  # Longer constant sleeps hold a pooled page for nothing
+
+# call name -> why it's forbidden inside search()
+FORBIDDEN_CALLS = {
+    'sync_playwright': "starts Playwright per call - search() must drive the `page` it is given",
+    'async_playwright': "starts async Playwright - scrapers run on the caller's sync page",
+    'launch': "launches a browser per call - search() must drive the `page` it is given",
+    'launch_persistent_context': "launches a browser per call - search() must drive the `page` it is given",
+    'connect_over_cdp': "connects to its own browser - search() must drive the `page` it is given",
+    'input': "waits for keyboard input",
+}
+
+
+def _is_main_guard(node) -> bool:
+    """if __name__ == "__main__": (the only place a browser may be launched)"""
+    test = getattr(node, 'test', None)
+    return (isinstance(node, ast.If) and isinstance(test, ast.Compare) and
+            isinstance(test.left, ast.Name) and test.left.id == '__name__' and
+            any(isinstance(c, ast.Constant) and c.value == '__main__' for c in test.comparators))
+
+
+def _guard_only_functions(tree: ast.Module) -> set:
+    """
+    Top-level functions that nothing outside the __main__ guard can reach:
+    not search(), not module-level code, and not called (or referenced) by
+    any function those reach.
+    """
+    functions = {node.name: node for node in tree.body
+                 if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+
+    def referenced(nodes) -> set:
+        return {n.id for node in nodes for n in ast.walk(node)
+                if isinstance(n, ast.Name) and n.id in functions}
+
+    roots = [node for node in tree.body if not _is_main_guard(node) and
+             not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    # Decorators and defaults run at import time
+    for func in functions.values():
+        roots += func.decorator_list + func.args.defaults + [d for d in func.args.kw_defaults if d]
+
+    reachable, todo = set(), referenced(roots) | ({'search'} & functions.keys())
+    while todo:
+        name = todo.pop()
+        if name not in reachable:
+            reachable.add(name)
+            todo |= referenced(functions[name].body) - reachable
+    return set(functions) - reachable
+
+
+def _scraper_nodes(tree: ast.Module):
+    """Every node except those under the __main__ guard or in functions only it reaches"""
+    exempt = _guard_only_functions(tree)
+    stack = [node for node in tree.body if not _is_main_guard(node) and
+             not (isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in exempt)]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(ast.iter_child_nodes(node))
+
+
+def _call_name(call: ast.Call) -> str:
+    func = call.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return ''
+
+
+def check_signature(tree: ast.Module, record_type: str = None) -> List[str]:
+    search = [n for n in tree.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) and n.name == 'search']
+    if not search:
+        return ["No top-level search() function"]
+
+    func = search[-1]  # A later definition wins at import time
+    if isinstance(func, ast.AsyncFunctionDef):
+        return ["search() is async - it must be a plain function driving the sync Playwright `page`"]
+
+    args = func.args
+    positional = args.posonlyargs + args.args
+    names = [a.arg for a in positional + args.kwonlyargs]
+    issues = []
+
+    if args.kwarg is None:
+        for param in REQUIRED_PARAMS + RECORD_TYPE_PARAMS.get(record_type, []):
+            if param not in names:
+                issues.append(f"search() is missing the `{param}` parameter "
+                              f"(expected search({', '.join(REQUIRED_PARAMS + RECORD_TYPE_PARAMS.get(record_type, []))}))")
+    if positional and positional[0].arg != 'page':
+        issues.append(f"search() must take `page` as its first parameter, not `{positional[0].arg}`")
+
+    # Parameters without defaults that the caller never passes
+    known = set(REQUIRED_PARAMS + RECORD_TYPE_PARAMS.get(record_type, []))
+    defaults_start = len(positional) - len(args.defaults)
+    for i, arg in enumerate(positional):
+        if i < defaults_start and arg.arg not in known:
+            issues.append(f"search() parameter `{arg.arg}` has no default and is never passed")
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        if default is None and arg.arg not in known:
+            issues.append(f"search() keyword-only parameter `{arg.arg}` has no default and is never passed")
+
+    for param in RECORD_TYPE_PARAMS.get(record_type, []):
+        if param in [a.arg for a in positional[:defaults_start]]:
+            issues.append(f"search() `{param}` needs a default (=None) - it is only passed when known")
+    return issues
+
+
+def check_imports(tree: ast.Module) -> List[str]:
+    issues = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [(alias.name, []) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                issues.append(f"line {node.lineno}: relative import - scrapers are loaded as standalone files")
+                continue
+            modules = [(node.module, [alias.name for alias in node.names])]
+        else:
+            continue
+
+        for module, names in modules:
+            top = module.split('.')[0]
+            if importlib.util.find_spec(top) is None:
+                issues.append(f"line {node.lineno}: cannot import `{module}` (not installed)")
+                continue
+            # Only check names on modules that are already loaded - never import scraper deps just to validate
+            loaded = sys.modules.get(module)
+            if loaded is not None:
+                for name in names:
+                    if name != '*' and not hasattr(loaded, name):
+                        issues.append(f"line {node.lineno}: `{module}` has no `{name}`")
+    return issues
+
+
+def check_forbidden(tree: ast.Module) -> List[str]:
+    issues = []
+    calls = sorted((n for n in _scraper_nodes(tree) if isinstance(n, ast.Call)), key=lambda n: n.lineno)
+    for node in calls:
+        name = _call_name(node)
+        if name in FORBIDDEN_CALLS:
+            issues.append(f"line {node.lineno}: {name}() {FORBIDDEN_CALLS[name]}")
+        elif (name == 'close' and isinstance(node.func, ast.Attribute) and
+              isinstance(node.func.value, ast.Name) and node.func.value.id in ('page', 'browser', 'context')):
+            issues.append(f"line {node.lineno}: {node.func.value.id}.close() - the pooled page belongs to the caller")
+        elif (name == 'sleep' and node.args and isinstance(node.args[0], ast.Constant) and
+              isinstance(node.args[0].value, (int, float)) and node.args[0].value > MAX_SLEEP_S):
+            issues.append(f"line {node.lineno}: sleep({node.args[0].value}) - wait for a selector instead "
+                          f"(max {MAX_SLEEP_S}s fixed delay)")
+        elif (name == 'wait_for_timeout' and node.args and isinstance(node.args[0], ast.Constant) and
+              isinstance(node.args[0].value, (int, float)) and node.args[0].value > MAX_SLEEP_S * 1000):
+            issues.append(f"line {node.lineno}: wait_for_timeout({node.args[0].value}) - wait for a selector "
+                          f"instead (max {MAX_SLEEP_S * 1000}ms fixed delay)")
+    return issues
+
+
+def validate_scraper_code(code: str, record_type: str = None) -> List[str]:
+    """
+    Args:
+        code: Generated scraper source
+        record_type: 'property', 'tax', 'probate' or 'judgment' (probate requires death_date)
+
+    Returns:
+        List of problems; empty means the code may go to browser tests
+    """
+    if not code or not code.strip():
+        return ["No code returned"]
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return [f"SyntaxError: {e.msg} (line {e.lineno}): {(e.text or '').strip()}"]
+
+    issues = check_signature(tree, record_type)
+    issues += check_imports(tree)
+    issues += check_forbidden(tree)
+    return issues
+
+
+def as_test_errors(issues: List[str]) -> List[Dict]:
+    """Shape issues like ScraperTestRunner errors for fix_scraper_code (one entry, all issues)"""
+    return [{'name': {'full_name': 'static validation (before browser tests)'},
+             'error': "\n".join(f"- {issue}" for issue in issues)}]
@@ -0,0 +1,431 @@
+"""
+Scraper Health Check - cheap selector checks before regenerating
+
+For every county/record type with a generated scraper, loads the stored
+search URL in a headless browser and checks that:
+    1. the page loads (no HTTP error, no CAPTCHA wall)
+    2. every stored form selector (name inputs, submit) still matches an
+       element in the DOM (whether it's visible on load is recorded, not judged)
+    3. a jargon search ("ZZZZZ TESTNORESULTS") shows the "no results" state
+       the Scout agent recorded, instead of an error page or a results grid
+
+Each check is stored in scraper_health_checks with its latency, and
+County.*_last_tested is updated. Only counties whose checks come back
+'broken' are handed to the (LLM-driven, expensive) Scout batch with
+--regenerate; unreachable and CAPTCHA-walled pages are reported but not
+regenerated, since a new scraper wouldn't fix them. A search form that carries
+a CAPTCHA widget (e.g. Dallas courtsportal's reCAPTCHA) still has its
+selectors checked - only the no-results search is skipped.
+
+Usage:
+    python services/scout/health_check.py --state TX
+    python services/scout/health_check.py --state TX --record-type probate --concurrency 8
+    python services/scout/health_check.py --state TX --regenerate   # regenerate only what broke
+"""
+
+import re
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add project root to path (go up 2 levels: scout -> services -> root)
+project_root = Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(project_root))
+
+from playwright.async_api import async_playwright
+
+from database.models import SessionLocal, County, ScraperHealthCheck
+from services.captcha.detection import detect_captcha_async
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+RECORD_TYPES = ('property', 'tax', 'probate')
+
+NO_RESULTS_NAME = {'first_name': 'ZZZZZ', 'last_name': 'TESTNORESULTS'}  # Same jargon the agent explores with
+
+DEFAULT_CONCURRENCY = 6
+LOAD_TIMEOUT_MS = 30000
+SEARCH_TIMEOUT_MS = 20000
+SELECTOR_TIMEOUT_MS = 5000
+CHALLENGE_WAIT_MS = 15000  # Cloudflare's managed interstitial usually clears itself in a few seconds
+
+# Statuses that send a county back to the Scout agent
+REGENERATE_STATUSES = ('broken',)
+
+
+# ============================================================================
+# STORED SELECTORS
+# ============================================================================
+
+def _field_role(field_name: str) -> str:
+    name = (field_name or '').lower()
+    if 'last' in name or 'surname' in name:
+        return 'last_name'
+    if 'first' in name or 'given' in name:
+        return 'first_name'
+    if 'name' in name:
+        return 'name'
+    return re.sub(r'[^a-z0-9]+', '_', name).strip('_') or 'field'
+
+
+def selectors_from_analysis(site_analysis: Dict, website_url: str) -> Dict:
+    """
+    The selectors the Scout agent's exploration settled on, in the form stored
+    in County.*_search_selectors and checked here.
+
+    Returns:
+        {'url', 'inputs': {role: selector}, 'submit', 'results', 'no_results_text', 'source', 'saved_at'}
+    """
+    form = site_analysis.get('search_form') or {}
+    results = site_analysis.get('results_handling') or {}
+
+    inputs = {}
+    for field in form.get('input_fields') or []:
+        if isinstance(field, dict) and field.get('selector'):
+            role = _field_role(field.get('field_name'))
+            while role in inputs:
+                role += '_'
+            inputs[role] = field['selector']
+
+    return {
+        'url': form.get('url') or website_url,
+        'inputs': inputs,
+        'submit': form.get('submit_selector'),
+        'results': results.get('results_container_selector'),
+        'no_results_text': results.get('no_results_indicator'),
+        'source': 'scout_agent',
+        'saved_at': datetime.utcnow().isoformat(timespec='seconds')
+    }
+
+
+def normalize_selectors(stored: Optional[Dict]) -> Optional[Dict]:
+    """
+    Accept both the agent's format (above) and site discovery's
+    {'owner_name_input', 'search_button'}; None if there is nothing to check.
+    """
+    if not stored or not isinstance(stored, dict):
+        return None
+    if 'inputs' in stored:
+        selectors = dict(stored)
+    else:
+        selectors = {
+            'inputs': {'name': stored['owner_name_input']} if stored.get('owner_name_input') else {},
+            'submit': stored.get('search_button'),
+            'results': None,
+            'no_results_text': None
+        }
+    if not selectors.get('inputs') or not selectors.get('submit'):
+        return None
+    return selectors
+
+
+# ============================================================================
+# SINGLE CHECK
+# ============================================================================
+
+async def _resolves(page, selector: str) -> Dict:
+    """
+    {'selector', 'ok', 'visible', 'error'} - ok if at least one match is attached.
+
+    Visibility is reported separately and doesn't fail the check: inputs behind
+    a tab, an "advanced search" toggle or a cookie banner are hidden on load
+    but the selector is still right.
+    """
+    try:
+        locator = page.locator(selector).first
+        await locator.wait_for(state='attached', timeout=SELECTOR_TIMEOUT_MS)
+        return {'selector': selector, 'ok': True, 'visible': await locator.is_visible()}
+    except Exception as e:
+        message = str(e).splitlines()[0][:200]
+        # A syntax error means the stored value isn't a usable selector at all
+        invalid = 'is not a valid selector' in message or 'Unexpected token' in message
+        return {'selector': selector, 'ok': False, 'invalid': invalid, 'error': message}
+
+
+# Hidden elements can't be typed into or clicked, so set the value / fire the click from the page
+SET_VALUE_JS = """(el, value) => {
+    el.value = value;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}"""
+
+
+async def _fill(page, selector: str, value: str, visible: bool):
+    if visible:
+        await page.fill(selector, value, timeout=SELECTOR_TIMEOUT_MS)
+    else:
+        await page.locator(selector).first.evaluate(SET_VALUE_JS, value)
+
+
+async def _click(page, selector: str, visible: bool):
+    if visible:
+        await page.click(selector, timeout=SELECTOR_TIMEOUT_MS)
+    else:
+        await page.locator(selector).first.dispatch_event('click')
+
+
+async def _detect_captcha(page):
+    """
+    The page's CAPTCHA, or None. One without a site key (Cloudflare's "Just a
+    moment..." interstitial) is given CHALLENGE_WAIT_MS to clear by itself first.
+    """
+    captcha = await detect_captcha_async(page)
+    waited = 0
+    while captcha and not captcha.solvable and waited < CHALLENGE_WAIT_MS:
+        await page.wait_for_timeout(1000)
+        waited += 1000
+        try:
+            captcha = await detect_captcha_async(page)
+        except Exception:
+            pass  # Navigating away from the challenge - look again next second
+    return captcha
+
+
+async def check_search_page(page, url: str, selectors: Dict) -> Dict:
+    """
+    Run the health check on one page.
+
+    Returns:
+        {'status', 'selectors_ok', 'no_results_ok', 'checks', 'error', 'load_ms', 'search_ms', 'total_ms'}
+    """
+    start = time.perf_counter()
+    result = {'status': 'broken', 'selectors_ok': None, 'no_results_ok': None, 'checks': {},
+              'error': None, 'load_ms': None, 'search_ms': None, 'total_ms': None}
+
+    def finish(status, error=None):
+        result['status'] = status
+        result['error'] = error
+        result['total_ms'] = int((time.perf_counter() - start) * 1000)
+        return result
+
+    # 1. Load
+    try:
+        response = await page.goto(url, wait_until='domcontentloaded', timeout=LOAD_TIMEOUT_MS)
+        result['load_ms'] = int((time.perf_counter() - start) * 1000)
+    except Exception as e:
+        return finish('unreachable', f"Load failed: {str(e).splitlines()[0][:200]}")
+    if response is not None and response.status >= 400:
+        return finish('unreachable', f"HTTP {response.status}")
+    captcha = await _detect_captcha(page)
+    if captcha and not captcha.solvable:
+        return finish('captcha', "Challenge page instead of the search page")  # No form behind it to check
+
+    # 2. Stored form selectors resolve (the results container only exists after a search)
+    fields = [(f"input:{role}", sel) for role, sel in selectors['inputs'].items()] + [('submit', selectors['submit'])]
+    resolved = await asyncio.gather(*[_resolves(page, sel) for _, sel in fields])
+    result['checks']['selectors'] = {name: r for (name, _), r in zip(fields, resolved)}
+
+    if all(r.get('invalid') for r in resolved):
+        return finish('unchecked', "Stored selectors are not CSS/Playwright selectors")
+    result['selectors_ok'] = all(r['ok'] for r in resolved)
+    if not result['selectors_ok']:
+        missing = [name for (name, _), r in zip(fields, resolved) if not r['ok']]
+        return finish('broken', f"Selectors not found: {', '.join(missing)}")
+    if captcha:
+        # A widget on the form: the selectors are fine, but searching would need a solve
+        return finish('captcha', "CAPTCHA on the search page (selectors OK, search not run)")
+    visible = {sel: r['visible'] for (_, sel), r in zip(fields, resolved)}
+    hidden = [name for (name, _), r in zip(fields, resolved) if not r['visible']]
+    if hidden:
+        result['checks']['hidden_selectors'] = hidden  # Informational - the search below is the real test
+
+    # 3. No-results search (may navigate or update in place - watch main-frame document responses)
+    document_statuses = []
+    page.on('response', lambda r: document_statuses.append(r.status)
+            if r.request.resource_type == 'document' and r.frame == page.main_frame else None)
+    search_start = time.perf_counter()
+    try:
+        for role, sel in selectors['inputs'].items():
+            if role in ('last_name', 'name'):
+                await _fill(page, sel, NO_RESULTS_NAME['last_name'], visible[sel])
+            elif role == 'first_name':
+                await _fill(page, sel, NO_RESULTS_NAME['first_name'], visible[sel])
+        await _click(page, selectors['submit'], visible[selectors['submit']])
+        await page.wait_for_timeout(300)  # Let a navigation or XHR start
+        await page.wait_for_load_state('networkidle', timeout=SEARCH_TIMEOUT_MS)
+    except Exception as e:
+        if 'Timeout' not in str(e)[:100]:
+            return finish('broken', f"Search failed: {str(e).splitlines()[0][:200]}")
+    result['search_ms'] = int((time.perf_counter() - search_start) * 1000)
+
+    if document_statuses and document_statuses[-1] >= 400:
+        result['no_results_ok'] = False
+        return finish('broken', f"Search returned HTTP {document_statuses[-1]}")
+    if await _detect_captcha(page):
+        return finish('captcha', "CAPTCHA after submitting the search")
+
+    body = (await page.inner_text('body')).lower()
+    indicator = (selectors.get('no_results_text') or '').strip()
+    checks = result['checks']
+    if indicator:
+        checks['no_results_text'] = indicator
+        result['no_results_ok'] = indicator.lower() in body
+    elif selectors.get('results'):
+        rows = await page.locator(f"{selectors['results']} tr, {selectors['results']} li").count()
+        checks['result_rows'] = rows
+        result['no_results_ok'] = rows <= 1  # Header row at most
+    if re.search(r'server error|exception|stack trace|runtime error', body):
+        result['no_results_ok'] = False
+        checks['error_page'] = True
+
+    if result['no_results_ok'] is False:
+        return finish('broken', "No-results search did not show the expected state")
+    return finish('healthy')
+
+
+# ============================================================================
+# BATCH OF CHECKS
+# ============================================================================
+
+def select_checks(db, state=None, record_types=RECORD_TYPES, county_ids=None) -> List[Dict]:
+    """Every county/record type with a generated scraper and a search URL"""
+    query = db.query(County).filter(County.is_active == True)
+    if state:
+        query = query.filter(County.state == state.upper())
+    if county_ids:
+        query = query.filter(County.id.in_(county_ids))
+
+    targets = []
+    for county in query.order_by(County.name).all():
+        for record_type in record_types:
+            url = getattr(county, f"{record_type}_search_url")
+            if url and getattr(county, f"{record_type}_scraper_generated"):
+                targets.append({
+                    'key': f"{county.id}:{record_type}",
+                    'county_id': county.id,
+                    'county_name': county.name,
+                    'state': county.state,
+                    'record_type': record_type,
+                    'url': url,
+                    'selectors': getattr(county, f"{record_type}_search_selectors")
+                })
+    return targets
+
+
+async def run_checks(targets: List[Dict], concurrency: int = DEFAULT_CONCURRENCY, headless: bool = True) -> List[Dict]:
+    """Check all targets, `concurrency` pages at a time, each in a fresh context"""
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+
+        async def check(target):
+            async with semaphore:
+                selectors = normalize_selectors(target['selectors'])
+                if selectors is None:
+                    outcome = {'status': 'unchecked', 'error': "No stored selectors", 'selectors_ok': None,
+                               'no_results_ok': None, 'checks': {}, 'load_ms': None, 'search_ms': None,
+                               'total_ms': 0}
+                else:
+                    context = await browser.new_context()
+                    try:
+                        page = await context.new_page()
+                        outcome = await check_search_page(page, selectors.get('url') or target['url'], selectors)
+                    except Exception as e:
+                        outcome = {'status': 'broken', 'error': f"{type(e).__name__}: {e}", 'selectors_ok': None,
+                                   'no_results_ok': None, 'checks': {}, 'load_ms': None, 'search_ms': None,
+                                   'total_ms': None}
+                    finally:
+                        await context.close()
+
+                icon = {'healthy': '✅', 'broken': '❌', 'unreachable': '🔌', 'captcha': '🧩'}.get(outcome['status'], '⏭️')
+                print(f"  {icon} {target['county_name']}, {target['state']} - {target['record_type']}: "
+                      f"{outcome['status']}" + (f" ({outcome['error']})" if outcome['error'] else "") +
+                      (f" [{outcome['total_ms']}ms]" if outcome['total_ms'] else ""))
+                results.append({**target, **outcome})
+
+        await asyncio.gather(*[check(target) for target in targets])
+        await browser.close()
+
+    return results
+
+
+def record_results(db, results: List[Dict]):
+    """Store every check and stamp *_last_tested on counties whose selectors were actually exercised"""
+    now = datetime.utcnow()
+    for r in results:
+        db.add(ScraperHealthCheck(
+            county_id=r['county_id'], record_type=r['record_type'], status=r['status'],
+            url=r['url'], selectors_ok=r['selectors_ok'], no_results_ok=r['no_results_ok'],
+            checks=r['checks'], error=r['error'],
+            load_ms=r['load_ms'], search_ms=r['search_ms'], total_ms=r['total_ms'], checked_at=now
+        ))
+        if r['status'] in ('healthy', 'broken') or r['selectors_ok'] is not None:
+            county = db.query(County).filter(County.id == r['county_id']).first()
+            setattr(county, f"{r['record_type']}_last_tested", now)
+    db.commit()
+
+
+def print_report(results: List[Dict], elapsed: float):
+    by_status = {}
+    for r in results:
+        by_status.setdefault(r['status'], []).append(r)
+
+    print(f"\n{'='*80}")
+    print(f"📊 HEALTH CHECK: {len(results)} search pages in {elapsed:.0f}s")
+    print(f"{'='*80}")
+    for status in ('healthy', 'broken', 'unreachable', 'captcha', 'unchecked'):
+        if status in by_status:
+            print(f"   {status:<12} {len(by_status[status])}")
+
+    checked = [r for r in results if r['status'] in ('healthy', 'broken')]
+    for field in ('load_ms', 'search_ms', 'total_ms'):
+        values = [r[field] for r in checked if r[field] is not None]
+        if values:
+            print(f"   {field:<12} median {statistics.median(values):.0f}ms, max {max(values)}ms")
+
+    if by_status.get('broken'):
+        print(f"\n   Needs regeneration:")
+        for r in by_status['broken']:
+            print(f"     - {r['county_name']}, {r['state']} {r['record_type']}: {r['error']}")
+    print(f"{'='*80}")
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check stored county selectors before regenerating scrapers')
+    parser.add_argument('--state', type=str, help='Only counties in this state (e.g. TX)')
+    parser.add_argument('--record-type', type=str, choices=RECORD_TYPES, action='append',
+                        help='Record type(s) to check (default: all)')
+    parser.add_argument('--county-id', type=int, action='append', help='Only these county IDs')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Pages checked at once')
+    parser.add_argument('--headful', action='store_true', help='Show the browser')
+    parser.add_argument('--regenerate', action='store_true',
+                        help='Run the Scout batch for counties whose checks came back broken')
+    parser.add_argument('--regen-concurrency', type=int, default=4, help='Scout agents at once when regenerating')
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        targets = select_checks(db, args.state, tuple(args.record_type or RECORD_TYPES), args.county_id)
+        print(f"\n🩺 Checking {len(targets)} search pages ({args.concurrency} at a time)...\n")
+
+        start = time.time()
+        results = asyncio.run(run_checks(targets, args.concurrency, headless=not args.headful))
+        record_results(db, results)
+        print_report(results, time.time() - start)
+    finally:
+        db.close()
+
+    broken = [r for r in results if r['status'] in REGENERATE_STATUSES]
+    if args.regenerate and broken:
+        from services.scout.batch import BatchProgress, run_batch
+
+        progress = BatchProgress()
+        jobs = [{k: r[k] for k in ('key', 'county_id', 'county_name', 'state', 'record_type', 'url')} for r in broken]
+        for job in jobs:
+            progress.reset(job['key'])  # A previous 'done' must not skip the regeneration
+        run_batch(jobs, args.regen_concurrency, progress)
+    elif broken:
+        print(f"\n💡 Re-run with --regenerate to rebuild the {len(broken)} broken scraper(s)")
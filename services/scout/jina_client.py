@@ -0,0 +1,404 @@
+"""
+Cached async client for the Jina Reader API (https://r.jina.ai/<url>)
+
+Reader output is stored in a local SQLite file keyed by the page URL and the
+Reader options. Within the TTL a cached page is returned without touching the
+network. Past the TTL the entry is revalidated before paying for another Reader
+call: if the caller passes the HTML it already has (page.content()), or a
+conditional GET of the page (If-None-Match / If-Modified-Since) comes back 304
+or with the same content hash, the cached output is kept and its TTL restarted.
+Only pages that actually changed go back to Jina. If Jina fails, a stale copy
+is served rather than nothing.
+
+HTML passed by the caller is checked even within the TTL: if it no longer
+matches, the entry is treated as stale. Pages are compared by their visible
+text (page_fingerprint), not their markup - county portals put per-load values
+in the HTML (__VIEWSTATE, CSRF tokens, nonces) that would never hash the same
+twice. Rendered HTML (from a browser) and raw HTML (from the conditional GET)
+still differ in what text they contain, so every entry records which kind its
+hash is and only hashes of the same kind are compared.
+
+Repeated scouting of the same portal therefore costs nothing after the first
+fetch, and fetches never block the event loop (httpx.AsyncClient).
+
+Usage:
+    jina = JinaReader(api_key=os.getenv('JINA_API_KEY'))
+    text = await jina.read(url, headers={'X-Return-Format': 'text'})
+    text = await jina.read(url, page_html=await page.content())  # revalidate without a request
+    text = jina.read_sync(url)                                    # blocking callers
+    jina.print_report()
+
+Set SCOUT_JINA_CACHE=0 to always fetch.
+"""
+
+import os
+import re
+import html
+import time
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CACHE_PATH = PROJECT_ROOT / ".cache" / "jina_cache.sqlite"
+
+JINA_READER_URL = "https://r.jina.ai/"
+
+# What origin_hash was computed from (entries stored before fingerprints have
+# 'rendered'/'raw', which match neither and so are never compared)
+HASH_RENDERED = 'rendered-text'  # page.content() from the caller's browser
+HASH_RAW = 'raw-text'            # Body of a plain GET of the page
+
+# Markup whose content never reaches the Reader's text but changes on every load
+_INVISIBLE_BLOCKS = re.compile(r'<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+_TAGS = re.compile(r'<[^>]*>')
+
+
+def content_hash(text) -> str:
+    if isinstance(text, str):
+        text = text.encode('utf-8', errors='replace')
+    return hashlib.sha256(text).hexdigest()
+
+
+def page_fingerprint(page_html) -> str:
+    """
+    Hash of a page's visible text: scripts, styles, comments and every tag
+    (with its attributes - hidden inputs, tokens, nonces) are dropped and
+    whitespace collapsed, so two loads of an unchanged page hash the same.
+    """
+    if isinstance(page_html, bytes):
+        page_html = page_html.decode('utf-8', errors='replace')
+    text = _TAGS.sub(' ', _INVISIBLE_BLOCKS.sub(' ', page_html))
+    return content_hash(' '.join(html.unescape(text).split()))
+
+
+class JinaCache:
+    """
+    SQLite store of Reader output with the origin page's validators
+
+    Example:
+        cache = JinaCache(ttl=3 * 86400)
+        entry = cache.get(key)
+        cache.put(key, url, content, origin_hash, etag, last_modified, hash_kind=HASH_RAW)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl: float = 3 * 86400, max_age: float = 30 * 86400):
+        """
+        Args:
+            path: SQLite file (created with its directory if missing)
+            ttl: Seconds an entry is served without revalidation
+            max_age: Entries not refreshed for this long are deleted
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_age = max_age
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content TEXT NOT NULL,
+                origin_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched REAL NOT NULL,
+                validated REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                hash_kind TEXT
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        if 'hash_kind' not in columns:
+            # Files from before hash kinds were stored: their hashes count as unknown kind
+            self._conn.execute("ALTER TABLE pages ADD COLUMN hash_kind TEXT")
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE validated < ?", (time.time() - self.max_age,))
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Entry dict (with 'fresh': bool) or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, content, origin_hash, hash_kind, etag, last_modified, fetched, validated "
+                "FROM pages WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(('url', 'content', 'origin_hash', 'hash_kind', 'etag', 'last_modified', 'fetched',
+                          'validated'), row))
+        entry['fresh'] = time.time() - entry['validated'] <= self.ttl
+        return entry
+
+    def hit(self, key: str, revalidated: bool = False, origin_hash: str = None, etag: str = None,
+            last_modified: str = None, hash_kind: str = None):
+        """Count a hit; a revalidation also restarts the TTL and updates the validators"""
+        with self._lock:
+            if revalidated:
+                self._conn.execute(
+                    "UPDATE pages SET hits = hits + 1, validated = ?, "
+                    "origin_hash = COALESCE(?, origin_hash), hash_kind = COALESCE(?, hash_kind), "
+                    "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                    (time.time(), origin_hash, hash_kind, etag, last_modified, key)
+                )
+            else:
+                self._conn.execute("UPDATE pages SET hits = hits + 1 WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def put(self, key: str, url: str, content: str, origin_hash: str = None, etag: str = None,
+            last_modified: str = None, hash_kind: str = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, content, origin_hash, hash_kind, etag, last_modified, "
+                "fetched, validated, hits) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, url, content, origin_hash, hash_kind if origin_hash else None, etag, last_modified, now, now)
+            )
+            self._conn.commit()
+
+    def info(self) -> Dict:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM pages").fetchone()
+        return {'entries': count, 'mb': round(total / (1024 * 1024), 2), 'path': str(self.path)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JinaReader:
+    """
+    Async Reader client with a JinaCache in front of it
+
+    Example:
+        jina = JinaReader(api_key=os.getenv('JINA_API_KEY'))
+        markdown = await jina.read(url, headers={'X-Return-Format': 'markdown'})
+    """
+
+    def __init__(self, api_key: str = None, cache: JinaCache = None, enabled: bool = None,
+                 timeout: float = 30.0, max_connections: int = 8):
+        """
+        Args:
+            api_key: Jina API key (optional - the Reader works keyless at a lower rate limit)
+            cache: JinaCache (default file under PROJECT_ROOT/.cache)
+            enabled: False bypasses the cache; defaults to SCOUT_JINA_CACHE != '0'
+            timeout: Seconds per Reader call
+            max_connections: Size of the pooled HTTP connection limit
+        """
+        if enabled is None:
+            enabled = os.getenv('SCOUT_JINA_CACHE', '1') != '0'
+        self.api_key = api_key
+        self.enabled = enabled
+        self.cache = (cache or JinaCache()) if enabled else None
+        self.timeout = timeout
+        self.max_connections = max_connections
+
+        # One AsyncClient per event loop (httpx clients are bound to the loop that created them)
+        self._clients = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+
+        # Background loop backing read_sync(), created on first use
+        self._sync_loop = None
+        self._sync_pid = None
+        self._sync_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.stats = {'reads': 0, 'hits': 0, 'revalidated': 0, 'fetches': 0, 'stale_served': 0,
+                      'errors': 0, 'fetch_seconds': 0.0}
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for name, value in deltas.items():
+                self.stats[name] += value
+
+    # ------------------------------------------------------------------
+    # HTTP client
+    # ------------------------------------------------------------------
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            # The client references its loop, so weak keys alone never drop a finished asyncio.run() loop
+            for dead in [l for l in self._clients if l.is_closed()]:
+                del self._clients[dead]
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(self.timeout),
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections)
+                )
+                self._clients[loop] = client
+            return client
+
+    async def aclose(self):
+        """
+        Close the pooled client of every event loop that used this reader
+
+        Each client is closed on its own loop. Sync callers can use
+        asyncio.run(reader.aclose()).
+        """
+        with self._clients_lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+        current = asyncio.get_running_loop()
+        for loop, client in clients:
+            if client.is_closed or loop.is_closed():
+                continue  # A closed loop took its connections with it
+            try:
+                if loop is current:
+                    await client.aclose()
+                elif loop.is_running():
+                    closing = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                    await asyncio.wait_for(asyncio.wrap_future(closing), timeout=5)
+            except Exception as e:
+                print(f"⚠️ Could not close Jina client: {e}")
+
+    async def _origin_validators(self, url: str, entry: Dict = None) -> Optional[Dict]:
+        """
+        GET the page itself (cheap next to a Reader call) - conditional when a cached entry has validators.
+
+        Returns:
+            {'unchanged': bool, 'origin_hash', 'hash_kind', 'etag', 'last_modified'},
+            or None if the page couldn't be fetched
+        """
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            response = await self._get_client().get(url, headers=headers, timeout=min(self.timeout, 10.0))
+        except httpx.HTTPError:
+            return None
+        if response.status_code == 304 and entry:
+            return {'unchanged': True, 'origin_hash': None, 'hash_kind': None, 'etag': None, 'last_modified': None}
+        if response.status_code != 200:
+            return None
+        origin_hash = page_fingerprint(response.content)
+        unchanged = bool(entry) and entry['hash_kind'] == HASH_RAW and origin_hash == entry['origin_hash']
+        return {'unchanged': unchanged, 'origin_hash': origin_hash, 'hash_kind': HASH_RAW,
+                'etag': response.headers.get('etag'), 'last_modified': response.headers.get('last-modified')}
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def cache_key(self, url: str, headers: Dict) -> str:
+        options = json.dumps(sorted((k.lower(), v) for k, v in headers.items()), separators=(',', ':'))
+        return content_hash(f"{url}\n{options}")
+
+    async def read(self, url: str, headers: Dict = None, page_html: str = None, max_chars: int = None,
+                   refresh: bool = False) -> Optional[str]:
+        """
+        Reader output for url, from the cache when the page hasn't changed.
+
+        Args:
+            url: Page to read
+            headers: Reader options (X-Return-Format, X-Retain-Images, ...); part of the cache key
+            page_html: HTML the caller already loaded - used instead of a request to tell if the page
+                changed, and an entry it doesn't match is stale even within the TTL
+            max_chars: Truncate the returned text
+            refresh: Skip the cache lookup (the result is still stored)
+
+        Returns:
+            Text, or None if Jina failed and nothing was cached
+        """
+        headers = dict(headers or {})
+        self._count(reads=1)
+        key = self.cache_key(url, headers)
+        entry = self.cache.get(key) if self.cache and not refresh else None
+        page_hash = page_fingerprint(page_html) if page_html is not None else None
+        # The caller's HTML can only be compared with a hash of the same kind
+        comparable = bool(entry) and page_hash is not None and entry['hash_kind'] == HASH_RENDERED
+
+        if entry and entry['fresh'] and not (comparable and page_hash != entry['origin_hash']):
+            self.cache.hit(key)
+            self._count(hits=1)
+            return entry['content'][:max_chars] if max_chars else entry['content']
+
+        validators = None
+        if page_hash is not None and (comparable or not entry):
+            # Rendered HTML from the caller's browser - no request needed to tell if the page changed
+            validators = {'unchanged': comparable and page_hash == entry['origin_hash'], 'origin_hash': page_hash,
+                          'hash_kind': HASH_RENDERED}
+        elif entry:
+            validators = await self._origin_validators(url, entry)
+        if entry and validators and validators['unchanged']:
+            self.cache.hit(key, revalidated=True, **self._stored(validators))
+            self._count(hits=1, revalidated=1)
+            return entry['content'][:max_chars] if max_chars else entry['content']
+
+        request_headers = dict(headers)
+        if self.api_key:
+            request_headers['Authorization'] = f'Bearer {self.api_key}'
+        start = time.time()
+        try:
+            reader = self._get_client().get(JINA_READER_URL + url, headers=request_headers)
+            if validators is None and self.cache:
+                # Validators for the next revalidation, fetched alongside the Reader call
+                response, validators = await asyncio.gather(reader, self._origin_validators(url))
+            else:
+                response = await reader
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self._count(errors=1, fetch_seconds=time.time() - start)
+            error = f"HTTP {e.response.status_code}" if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+            if entry:
+                print(f"   ⚠️ Jina Reader failed ({error}) - using cached copy from "
+                      f"{(time.time() - entry['fetched']) / 3600:.0f}h ago")
+                self._count(stale_served=1)
+                return entry['content'][:max_chars] if max_chars else entry['content']
+            print(f"   ⚠️ Jina Reader failed: {error}")
+            return None
+
+        content = response.text
+        self._count(fetches=1, fetch_seconds=time.time() - start)
+        if page_hash is not None:
+            # Keep the hash this caller can compare next time (plus any etag/last-modified)
+            validators = {**(validators or {}), 'origin_hash': page_hash, 'hash_kind': HASH_RENDERED}
+        if self.cache:
+            self.cache.put(key, url, content, **self._stored(validators))
+        return content[:max_chars] if max_chars else content
+
+    @staticmethod
+    def _stored(validators: Optional[Dict]) -> Dict:
+        return {k: v for k, v in (validators or {}).items() if k != 'unchanged'}
+
+    def _sync_runner(self) -> asyncio.AbstractEventLoop:
+        with self._sync_lock:
+            if self._sync_loop is None or self._sync_pid != os.getpid():
+                self._sync_loop = asyncio.new_event_loop()
+                threading.Thread(target=self._sync_loop.run_forever, name="jina-reader", daemon=True).start()
+                self._sync_pid = os.getpid()
+            return self._sync_loop
+
+    def read_sync(self, url: str, **kwargs) -> Optional[str]:
+        """Blocking read() for sync callers (runs on a background event loop)"""
+        return asyncio.run_coroutine_threadsafe(self.read(url, **kwargs), self._sync_runner()).result()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def print_report(self, prefix: str = ""):
+        s = self.stats
+        if not s['reads']:
+            return
+        print(f"{prefix}📖 Jina Reader: {s['reads']} reads | {s['hits']} cached "
+              f"({s['revalidated']} revalidated) | {s['fetches']} fetched in {s['fetch_seconds']:.1f}s | "
+              f"{s['errors']} errors ({s['stale_served']} served stale)")
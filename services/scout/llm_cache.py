@@ -0,0 +1,284 @@
+"""
+Content-addressed cache for Anthropic Messages API calls
+Responses are stored in a local SQLite file keyed by a SHA-256 of the full
+request (model, system, messages, max_tokens, every other parameter), so
+re-running a county after a crash replays identical calls instantly and for
+free. Entries expire after a TTL and the file is kept under a size bound
+(least recently used entries go first).
+
+Usage:
+    client = CachedAnthropic(anthropic.Anthropic(api_key=...))
+    response = client.messages.create(model=..., max_tokens=..., messages=[...])  # same API
+    response = client.messages.create(..., cache=False)  # bypass for one call
+    response = client.messages.create(..., phase='codegen')  # tag for services/scout/llm_usage.py
+    client.print_report()
+
+Pass rate_limiter=LLMRateLimiter(...) to meter the calls that miss the cache
+(hits never count against the API limits). Every call, hit or miss, is
+recorded in an LLMUsageLog (tokens, cost, latency, retries) unless
+SCOUT_LLM_USAGE=0.
+
+Set SCOUT_LLM_CACHE=0 to bypass the cache for a whole run.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from anthropic.types import Message
+
+from services.scout.llm_usage import LLMUsageLog
+from services.scout.rate_limiter import estimate_request_tokens, response_tokens
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CACHE_PATH = PROJECT_ROOT / ".cache" / "llm_cache.sqlite"
+
+
+def cache_key(params: Dict) -> str:
+    """SHA-256 of the canonical JSON of every request parameter"""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite response store with TTL and size-bounded LRU eviction
+
+    Example:
+        cache = LLMCache(ttl=7 * 86400, max_bytes=200 * 1024 * 1024)
+        cached = cache.get(key)
+        if cached is None:
+            cache.put(key, model, response_json, latency)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl: float = 7 * 86400,
+                 max_bytes: int = 200 * 1024 * 1024, max_entries: int = 20000):
+        """
+        Args:
+            path: SQLite file (created with its directory if missing)
+            ttl: Seconds an entry stays valid
+            max_bytes: Evict least recently used entries above this many stored bytes
+            max_entries: ...or above this many entries
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """{'response': json str, 'latency': seconds the original call took} or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._conn.commit()
+        return {'response': row[0], 'latency': row[1]}
+
+    def put(self, key: str, model: str, response: str, latency: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, latency, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, model, response, len(response.encode('utf-8')), latency, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Oldest-used first until both bounds hold
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+
+    def info(self) -> Dict:
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {'entries': count, 'mb': round(total / (1024 * 1024), 2), 'path': str(self.path)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _CachedMessages:
+    def __init__(self, owner: 'CachedAnthropic'):
+        self._owner = owner
+
+    def create(self, cache: bool = True, phase: str = None, retry: int = 0, **params):
+        return self._owner._create(params, cache, phase, retry)
+
+
+class CachedAnthropic:
+    """
+    Drop-in wrapper around anthropic.Anthropic whose messages.create() goes
+    through an LLMCache. Everything else is passed through to the real client.
+    """
+
+    def __init__(self, client, cache: LLMCache = None, enabled: bool = None, rate_limiter=None,
+                 usage_log: LLMUsageLog = None):
+        """
+        Args:
+            client: anthropic.Anthropic instance
+            cache: LLMCache (default file under PROJECT_ROOT/.cache)
+            enabled: False bypasses the cache; defaults to SCOUT_LLM_CACHE != '0'
+            rate_limiter: Optional LLMRateLimiter shared by every thread making real API calls
+            usage_log: LLMUsageLog (default file under PROJECT_ROOT/.cache); off if SCOUT_LLM_USAGE=0
+        """
+        if enabled is None:
+            enabled = os.getenv('SCOUT_LLM_CACHE', '1') != '0'
+        self.client = client
+        self.enabled = enabled
+        self.cache = (cache or LLMCache()) if enabled else None
+        self.rate_limiter = rate_limiter
+        if usage_log is None and os.getenv('SCOUT_LLM_USAGE', '1') != '0':
+            usage_log = LLMUsageLog()
+        self.usage_log = usage_log
+        self.messages = _CachedMessages(self)
+        self._stats_lock = threading.Lock()
+        self.stats = {'calls': 0, 'hits': 0, 'misses': 0, 'bypassed': 0,
+                      'latency_saved_s': 0.0, 'api_seconds': 0.0, 'cost_usd': 0.0,
+                      'prompt_cache_read': 0, 'prompt_cache_write': 0}
+
+    def __getattr__(self, name):
+        if name == 'client':  # Not set yet (e.g. during unpickling)
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for name, value in deltas.items():
+                self.stats[name] += value
+
+    def _call_api(self, params: Dict):
+        """Real API call, metered by the rate limiter if one is set; returns (response, latency)"""
+        reserved = self.rate_limiter.acquire(estimate_request_tokens(params)) if self.rate_limiter else 0
+        start = time.time()
+        try:
+            response = self.client.messages.create(**params)
+        except Exception:
+            if self.rate_limiter:
+                self.rate_limiter.settle(reserved, reserved)
+            raise
+        latency = time.time() - start
+        if self.rate_limiter:
+            self.rate_limiter.settle(reserved, response_tokens(response) if not params.get('stream') else reserved)
+        self._count(api_seconds=latency)
+        return response, latency
+
+    def _record(self, params: Dict, phase: str, retry: int, response=None, latency: float = 0.0,
+                hit: bool = False, error: Exception = None):
+        if self.usage_log is None:
+            return
+        try:
+            row = self.usage_log.record(params.get('model'), phase, response, latency, response_cache_hit=hit,
+                                        retry=retry, error=f"{type(error).__name__}: {error}"[:500] if error else None)
+            self._count(cost_usd=row['cost_usd'])
+            if not hit:
+                self._count(prompt_cache_read=row['cache_read_tokens'], prompt_cache_write=row['cache_write_tokens'])
+        except Exception as e:
+            print(f"⚠️ Could not record LLM usage: {e}")  # Accounting must never fail a call
+
+    def _create(self, params: Dict, use_cache: bool, phase: str = None, retry: int = 0):
+        self._count(calls=1)
+        if not (self.enabled and use_cache and self.cache) or params.get('stream'):
+            self._count(bypassed=1)
+            return self._metered_call(params, phase, retry)[0]
+
+        key = cache_key(params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count(hits=1, latency_saved_s=cached['latency'])
+            response = Message.model_validate_json(cached['response'])
+            self._record(params, phase, retry, response, hit=True)
+            return response
+
+        self._count(misses=1)
+        response, latency = self._metered_call(params, phase, retry)
+        self.cache.put(key, params.get('model'), response.model_dump_json(), latency)
+        return response
+
+    def _metered_call(self, params: Dict, phase: str, retry: int):
+        """_call_api(), recorded in the usage log whether it succeeds or not"""
+        start = time.time()
+        try:
+            response, latency = self._call_api(params)
+        except Exception as e:
+            self._record(params, phase, retry, latency=time.time() - start, error=e)
+            raise
+        if not params.get('stream'):
+            self._record(params, phase, retry, response, latency)
+        return response, latency
+
+    def summary(self) -> Dict:
+        s = self.stats
+        looked_up = s['hits'] + s['misses']
+        return {
+            **s,
+            'hit_rate': round(s['hits'] / looked_up, 3) if looked_up else 0,
+            'latency_saved_s': round(s['latency_saved_s'], 1),
+            'api_seconds': round(s['api_seconds'], 1),
+            'cost_usd': round(s['cost_usd'], 4)
+        }
+
+    def print_report(self, prefix: str = ""):
+        s = self.summary()
+        if not (self.enabled and self.cache):
+            print(f"{prefix}🗃️ LLM cache: bypassed ({s['calls']} calls, {s['api_seconds']}s in API)")
+        else:
+            info = self.cache.info()
+            print(f"{prefix}🗃️ LLM cache: {s['hits']}/{s['hits'] + s['misses']} hits ({s['hit_rate']:.0%}) | "
+                  f"Saved {s['latency_saved_s']}s | {s['api_seconds']}s in API | "
+                  f"{info['entries']} entries, {info['mb']}MB")
+        if self.usage_log is not None:
+            print(f"{prefix}💸 LLM cost this run: ${s['cost_usd']:.2f} (python services/scout/llm_usage.py for the breakdown)")
+            print(f"{prefix}🧠 Prompt cache: {s['prompt_cache_read']:,} tokens read, {s['prompt_cache_write']:,} written")
+        if self.rate_limiter:
+            r = self.rate_limiter.summary()
+            print(f"{prefix}🚦 Rate limiter: {r['calls']} API calls | {r['used_tokens']:,} tokens | waited {r['waited_s']}s")
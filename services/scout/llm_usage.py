@@ -0,0 +1,271 @@
+"""
+Token, cost and latency accounting for every Claude call the Scout makes
+
+CachedAnthropic records each messages.create() here: input/output tokens,
+prompt-cache reads/writes, whether the local response cache answered it,
+latency, retry number and errors. Calls are tagged with the county and
+record type being onboarded (usage_tags(), a context variable, so it follows
+agent threads and asyncio tasks) and the phase passed to create():
+explore, summarize, codegen, fix, optimize, plan, url_select.
+
+Rows go to a local SQLite file; the report shows where time and money go per
+onboarded county.
+
+Usage:
+    with usage_tags(county='Harris', state='TX', record_type='probate', county_id=12):
+        client.messages.create(model=..., messages=[...], phase='codegen')
+
+    python services/scout/llm_usage.py                     # per county, last 30 days
+    python services/scout/llm_usage.py --county Harris --state TX
+    python services/scout/llm_usage.py --by phase --days 7
+
+Set SCOUT_LLM_USAGE=0 to stop recording.
+"""
+
+import sys
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_USAGE_PATH = PROJECT_ROOT / ".cache" / "llm_usage.sqlite"
+
+PHASES = ['explore', 'summarize', 'codegen', 'fix', 'optimize', 'plan', 'url_select']
+
+# USD per million tokens (input, output), matched by model-name prefix
+MODEL_PRICES = {
+    'claude-opus-4': (15.00, 75.00),
+    'claude-sonnet-4': (3.00, 15.00),
+    'claude-3-7-sonnet': (3.00, 15.00),
+    'claude-3-5-sonnet': (3.00, 15.00),
+    'claude-haiku-4': (1.00, 5.00),
+    'claude-3-5-haiku': (0.80, 4.00),
+}
+CACHE_WRITE_MULTIPLIER = 1.25  # Prompt-cache writes cost 1.25x input
+CACHE_READ_MULTIPLIER = 0.10   # ...reads 0.1x
+
+_tags: contextvars.ContextVar = contextvars.ContextVar('llm_usage_tags', default={})
+
+RUN_ID = uuid.uuid4().hex[:12]  # Groups the calls of one process
+
+
+@contextmanager
+def usage_tags(**tags):
+    """Tag every call made inside the block (county, state, record_type, county_id); nests"""
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+def set_usage_tags(**tags):
+    """Non-block form of usage_tags(); pass the returned token to reset_usage_tags()"""
+    return _tags.set({**_tags.get(), **tags})
+
+
+def reset_usage_tags(token):
+    _tags.reset(token)
+
+
+def model_prices(model: str):
+    for prefix, prices in MODEL_PRICES.items():
+        if (model or '').startswith(prefix):
+            return prices
+    return MODEL_PRICES['claude-sonnet-4']
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int, cache_read: int = 0, cache_write: int = 0) -> float:
+    """USD for one API call (input_tokens excludes prompt-cache reads/writes, as in the API's usage)"""
+    input_price, output_price = model_prices(model)
+    return (input_tokens * input_price + output_tokens * output_price +
+            cache_write * input_price * CACHE_WRITE_MULTIPLIER +
+            cache_read * input_price * CACHE_READ_MULTIPLIER) / 1_000_000
+
+
+def usage_of(response) -> Dict:
+    usage = getattr(response, 'usage', None)
+    return {
+        'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+        'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+        'cache_read_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+        'cache_write_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+    }
+
+
+class LLMUsageLog:
+    """
+    SQLite store of per-call usage
+
+    Example:
+        log = LLMUsageLog()
+        log.record(model, phase='fix', response=response, latency_s=4.2)
+        log.report(by='county')
+    """
+
+    def __init__(self, path=DEFAULT_USAGE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                run_id TEXT,
+                county TEXT,
+                state TEXT,
+                county_id INTEGER,
+                record_type TEXT,
+                phase TEXT,
+                model TEXT,
+                input_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+                response_cache_hit INTEGER NOT NULL DEFAULT 0,
+                latency_s REAL NOT NULL DEFAULT 0,
+                retry INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                cost_usd REAL NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_county ON llm_calls(state, county, record_type)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_ts ON llm_calls(ts)")
+        self._conn.commit()
+
+    def record(self, model: str, phase: str = None, response=None, latency_s: float = 0.0,
+               response_cache_hit: bool = False, retry: int = 0, error: str = None) -> Dict:
+        """
+        Store one call. Local response-cache hits keep their token counts (what
+        the call would have used) but cost nothing.
+        """
+        tags = _tags.get()
+        usage = usage_of(response) if response is not None else usage_of(None)
+        cost = 0.0 if response_cache_hit or response is None else call_cost(
+            model, usage['input_tokens'], usage['output_tokens'],
+            usage['cache_read_tokens'], usage['cache_write_tokens'])
+        row = {
+            'ts': time.time(), 'run_id': RUN_ID,
+            'county': tags.get('county'), 'state': tags.get('state'), 'county_id': tags.get('county_id'),
+            'record_type': tags.get('record_type'), 'phase': phase or tags.get('phase'), 'model': model,
+            **usage, 'response_cache_hit': int(response_cache_hit), 'latency_s': round(latency_s, 3),
+            'retry': retry, 'error': error, 'cost_usd': cost
+        }
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO llm_calls ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values())
+            )
+            self._conn.commit()
+        return row
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def rows(self, county: str = None, state: str = None, record_type: str = None, days: float = None,
+             run_id: str = None) -> List[Dict]:
+        clauses, args = [], []
+        for column, value in (('county', county), ('state', state), ('record_type', record_type),
+                              ('run_id', run_id)):
+            if value:
+                clauses.append(f"{column} = ? COLLATE NOCASE")
+                args.append(value)
+        if days:
+            clauses.append("ts >= ?")
+            args.append(time.time() - days * 86400)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT * FROM llm_calls {where} ORDER BY ts", args)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def aggregate(rows: List[Dict], key) -> Dict:
+        groups = {}
+        for r in rows:
+            g = groups.setdefault(key(r), {'calls': 0, 'errors': 0, 'retries': 0, 'cache_hits': 0,
+                                           'input_tokens': 0, 'output_tokens': 0, 'cache_read_tokens': 0,
+                                           'cache_write_tokens': 0, 'latency_s': 0.0, 'cost_usd': 0.0})
+            g['calls'] += 1
+            g['errors'] += 1 if r['error'] else 0
+            g['retries'] += 1 if r['retry'] else 0
+            g['cache_hits'] += r['response_cache_hit']
+            for field in ('input_tokens', 'output_tokens', 'latency_s', 'cost_usd'):
+                g[field] += r[field] or 0
+            if not r['response_cache_hit']:
+                # Prompt-cache tokens of calls that reached the API (a replayed hit didn't read anything)
+                g['cache_read_tokens'] += r['cache_read_tokens'] or 0
+                g['cache_write_tokens'] += r['cache_write_tokens'] or 0
+        return groups
+
+    def report(self, by: str = 'county', **filters):
+        rows = self.rows(**filters)
+        if not rows:
+            print("No LLM calls recorded for that filter")
+            return
+
+        def county_key(r):
+            if not r['county']:
+                return '(untagged)'
+            return f"{r['county']}, {r['state'] or '?'} {r['record_type'] or ''}".strip()
+
+        keys = {'county': county_key, 'phase': lambda r: r['phase'] or '(none)',
+                'model': lambda r: r['model'] or '?', 'run': lambda r: r['run_id']}
+        groups = self.aggregate(rows, keys[by])
+        total = self.aggregate(rows, lambda r: 'TOTAL')['TOTAL']
+
+        print(f"\n{'='*110}")
+        print(f"💸 LLM USAGE by {by}: {len(rows)} calls")
+        print(f"{'='*110}")
+        print(f"   {by:<34} {'calls':>6} {'err':>4} {'hits':>5} {'input':>9} {'output':>8} "
+              f"{'cache rd':>9} {'cache wr':>9} {'API time':>9} {'cost':>9}")
+        for name, g in sorted(groups.items(), key=lambda kv: -kv[1]['cost_usd']) + [('TOTAL', total)]:
+            if name == 'TOTAL':
+                print(f"   {'-'*107}")
+            print(f"   {str(name)[:34]:<34} {g['calls']:>6} {g['errors']:>4} {g['cache_hits']:>5} "
+                  f"{g['input_tokens']:>9,} {g['output_tokens']:>8,} {g['cache_read_tokens']:>9,} "
+                  f"{g['cache_write_tokens']:>9,} {g['latency_s']:>8.0f}s {'$' + format(g['cost_usd'], '.2f'):>9}")
+
+        if by == 'county':
+            # Where each county's time and money went
+            for name in sorted(groups, key=lambda n: -groups[n]['cost_usd'])[:10]:
+                phases = self.aggregate([r for r in rows if county_key(r) == name], lambda r: r['phase'] or '(none)')
+                parts = [f"{phase} {g['calls']}x ${g['cost_usd']:.2f}/{g['latency_s']:.0f}s"
+                         for phase, g in sorted(phases.items(), key=lambda kv: -kv[1]['cost_usd'])]
+                print(f"\n   {name}: {' | '.join(parts)}")
+        print(f"{'='*110}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Where Scout LLM time and money go')
+    parser.add_argument('--by', choices=['county', 'phase', 'model', 'run'], default='county')
+    parser.add_argument('--county', type=str, help='Only this county (name as onboarded)')
+    parser.add_argument('--state', type=str, help='Only this state (e.g. TX)')
+    parser.add_argument('--record-type', type=str, help='Only this record type')
+    parser.add_argument('--days', type=float, default=30, help='Look back this many days (0 = all)')
+    parser.add_argument('--path', type=str, default=str(DEFAULT_USAGE_PATH), help='Usage database')
+    args = parser.parse_args()
+
+    if not Path(args.path).exists():
+        print(f"No usage recorded yet ({args.path})")
+        sys.exit(0)
+
+    LLMUsageLog(args.path).report(by=args.by, county=args.county, state=args.state,
+                                  record_type=args.record_type, days=args.days or None)
@@ -0,0 +1,492 @@
+"""
+Compact page digest for the scout agent
+One page.evaluate() walks the DOM in the browser and returns a short,
+token-budgeted text description of what Claude can act on: each form's
+controls with a label and the best selector (unique #id, [name], test id,
+aria-label, placeholder, exact text, ... short nth-of-type path), visible
+submit/buttons, and the data tables with headers, a couple of sample rows and
+the link in the first row.
+
+The old locator-based extractor (extract_targeted_html) made a Playwright round
+trip per element and attribute - hundreds per step on large county pages. It
+is kept as the fallback and as the benchmark baseline.
+
+Usage:
+    digest = get_page_digest(page, max_chars=4000)
+    print(digest['text'], digest['ms'])
+
+    text = describe_page(page)   # digest text, or the legacy extractor if evaluate fails
+"""
+
+import time
+from typing import Dict
+
+DEFAULT_MAX_CHARS = 4000   # ~1k tokens per step
+MAX_OPTIONS = 8            # <select> options listed per dropdown
+MAX_TABLES = 3             # Data tables described (most rows first)
+SAMPLE_ROWS = 2            # Sample rows per table
+TABLE_BUDGET_SHARE = 0.4   # Fraction of max_chars reserved for tables (results matter after a search)
+
+DIGEST_JS = r"""
+(opts) => {
+    const clip = (s, n) => {
+        s = (s || '').replace(/\s+/g, ' ').trim();
+        return s.length > n ? s.slice(0, n - 1) + '…' : s;
+    };
+    const esc = s => (window.CSS && CSS.escape) ? CSS.escape(s) : s.replace(/([^\w-])/g, '\\$1');
+    const attr = s => s.replace(/\\/g, '\\\\').replace(/"/g, '\\"');
+    const tag = el => el.tagName.toLowerCase();
+    const count = sel => { try { return document.querySelectorAll(sel).length; } catch (e) { return 0; } };
+
+    const visible = el => {
+        if (el.type === 'hidden') return false;
+        const r = el.getBoundingClientRect();
+        if (r.width === 0 && r.height === 0) return false;
+        const st = getComputedStyle(el);
+        return st.visibility !== 'hidden' && st.display !== 'none';
+    };
+
+    const textOf = el => {
+        if (tag(el) === 'input') return el.value || el.getAttribute('aria-label') || '';
+        return el.innerText || el.textContent || '';
+    };
+
+    // Short structural path, anchored at the nearest element with a unique id
+    const path = el => {
+        const parts = [];
+        while (el && el.nodeType === 1 && el !== document.documentElement) {
+            if (el.id && count('#' + esc(el.id)) === 1) { parts.unshift('#' + esc(el.id)); break; }
+            let part = tag(el);
+            const parent = el.parentElement;
+            if (parent) {
+                const same = Array.from(parent.children).filter(c => c.tagName === el.tagName);
+                if (same.length > 1) part += ':nth-of-type(' + (same.indexOf(el) + 1) + ')';
+            }
+            parts.unshift(part);
+            el = parent;
+        }
+        return parts.join(' > ');
+    };
+
+    const selectorFor = el => {
+        const t = tag(el);
+        if (el.id && count('#' + esc(el.id)) === 1) return '#' + esc(el.id);
+        for (const a of ['name', 'data-testid', 'data-test', 'aria-label', 'placeholder']) {
+            const v = el.getAttribute(a);
+            if (v) {
+                const sel = t + '[' + a + '="' + attr(v) + '"]';
+                if (count(sel) === 1) return sel;
+            }
+        }
+        if (t === 'input' && el.value && (el.type === 'submit' || el.type === 'button')) {
+            const sel = 'input[value="' + attr(el.value) + '"]';
+            if (count(sel) === 1) return sel;
+        }
+        if (t === 'button' || t === 'a') {
+            const text = clip(textOf(el), 60);
+            if (text && Array.from(document.querySelectorAll(t)).filter(o => clip(textOf(o), 60) === text).length === 1) {
+                return t + ':text-is("' + attr(text) + '")';   // Playwright exact-text selector
+            }
+        }
+        const cls = Array.from(el.classList).find(c => count(t + '.' + esc(c)) === 1);
+        if (cls) return t + '.' + esc(cls);
+        return path(el);
+    };
+
+    const labelFor = el => {
+        if (el.labels && el.labels.length) return clip(el.labels[0].innerText, 40);
+        const aria = el.getAttribute('aria-label') || el.getAttribute('title');
+        if (aria) return clip(aria, 40);
+        if (el.type === 'checkbox' || el.type === 'radio') {   // "<input type=radio> Decedent"
+            const next = el.nextSibling;
+            const text = next && (next.nodeType === 3 ? next.textContent : next.innerText);
+            if (text && text.trim()) return clip(text, 40);
+        }
+        const cell = el.closest('td, th');
+        if (cell && cell.previousElementSibling) return clip(cell.previousElementSibling.innerText, 40);
+        const prev = el.previousElementSibling;
+        if (prev && ['label', 'span', 'b', 'strong'].includes(tag(prev))) return clip(prev.innerText, 40);
+        return '';
+    };
+
+    const TEXT_TYPES = ['', 'text', 'search', 'email', 'tel', 'number', 'date', 'password', 'checkbox', 'radio'];
+    const describeControl = el => {
+        const t = tag(el);
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        const label = labelFor(el);
+        let line;
+        if (t === 'select') {
+            const options = Array.from(el.options);
+            const shown = options.slice(0, opts.maxOptions)
+                .map(o => clip(o.text, 30) + (o.value && o.value !== o.text ? '=' + clip(o.value, 20) : ''));
+            const more = options.length > shown.length ? ' (+' + (options.length - shown.length) + ' more)' : '';
+            const current = el.selectedIndex >= 0 ? clip(el.options[el.selectedIndex].text, 30) : '';
+            line = 'select ' + selectorFor(el) + (label ? ' "' + label + '"' : '') +
+                   ' = ' + JSON.stringify(current) + ' | options: ' + shown.join(', ') + more;
+        } else if (t === 'textarea' || (t === 'input' && TEXT_TYPES.includes(type))) {
+            line = t + '[' + (type || 'text') + '] ' + selectorFor(el) + (label ? ' "' + label + '"' : '');
+            const ph = el.getAttribute('placeholder');
+            if (ph && ph !== label) line += ' placeholder="' + clip(ph, 30) + '"';
+            if (type === 'checkbox' || type === 'radio') line += el.checked ? ' (checked)' : '';
+            else if (el.value) line += ' value="' + clip(el.value, 30) + '"';
+        } else {
+            const text = clip(textOf(el), 40);
+            line = 'button ' + selectorFor(el) + (text ? ' "' + text + '"' : '') + (type ? ' [' + type + ']' : '');
+        }
+        return line;
+    };
+
+    const CONTROLS = 'input, select, textarea, button, [role="button"], a.btn, a.button';
+    const all = Array.from(document.querySelectorAll(CONTROLS));
+    let hidden = 0;
+    const groups = new Map();   // form element (or null) -> control lines
+    for (const el of all) {
+        const t = tag(el);
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        if (t === 'input' && !TEXT_TYPES.includes(type) && !['submit', 'button', 'image', 'reset'].includes(type)) {
+            if (type === 'hidden') hidden++;
+            continue;
+        }
+        if (!visible(el)) { hidden++; continue; }
+        const form = el.form || el.closest('form');
+        if (!groups.has(form)) groups.set(form, []);
+        groups.get(form).push(describeControl(el));
+    }
+
+    // Data tables: have rows of cells and no form controls inside (skip layout tables)
+    const tables = Array.from(document.querySelectorAll('table'))
+        .filter(t => visible(t) && !t.querySelector('input, select, textarea, table'))
+        .map(t => ({ el: t, rows: Array.from(t.rows).filter(r => r.cells.length > 1) }))
+        .filter(t => t.rows.length > 0)
+        .sort((a, b) => b.rows.length - a.rows.length)
+        .slice(0, opts.maxTables);
+
+    const tableLines = [];
+    for (const { el, rows } of tables) {
+        const headRow = el.tHead && el.tHead.rows.length ? el.tHead.rows[0]
+            : (rows[0].querySelector('th') ? rows[0] : null);
+        const body = rows.filter(r => r !== headRow);
+        const cols = headRow ? Array.from(headRow.cells).map(c => clip(c.innerText, 25)) : [];
+        tableLines.push('table ' + selectorFor(el) + ' - ' + body.length + ' rows' +
+                        (cols.length ? ' | cols: ' + cols.join(' | ') : ''));
+        body.slice(0, opts.sampleRows).forEach((r, i) => {
+            tableLines.push('  row ' + (i + 1) + ': ' + Array.from(r.cells).map(c => clip(c.innerText, 30)).join(' | '));
+        });
+        const link = body.length ? body[0].querySelector('a[href], [onclick]') : null;
+        if (link) tableLines.push('  row link: ' + selectorFor(link) + ' "' + clip(textOf(link), 30) + '"');
+    }
+
+    const controlLines = [];
+    for (const [form, lines] of groups) {
+        if (form) {
+            const action = form.getAttribute('action') || '';
+            controlLines.push('form ' + selectorFor(form) + ' (' + (form.getAttribute('method') || 'GET').toUpperCase() +
+                              (action ? ' ' + clip(action, 60) : '') + ')');
+        } else {
+            controlLines.push('controls outside any form');
+        }
+        lines.forEach(l => controlLines.push('  ' + l));
+    }
+
+    // Token budget: tables get a reserved share, controls the rest, then tables take what's left
+    const take = (lines, budget) => {
+        const out = [];
+        let used = 0;
+        for (const l of lines) {
+            if (used + l.length + 1 > budget) break;
+            out.push(l);
+            used += l.length + 1;
+        }
+        return [out, used];
+    };
+    const [ctrlOut, ctrlUsed] = take(controlLines, opts.maxChars - Math.min(
+        tableLines.join('\n').length, Math.floor(opts.maxChars * opts.tableShare)));
+    const [tableOut] = take(tableLines, opts.maxChars - ctrlUsed);
+    const omitted = (controlLines.length - ctrlOut.length) + (tableLines.length - tableOut.length);
+
+    const text = [...ctrlOut, ...tableOut].join('\n') +
+                 (omitted ? '\n… ' + omitted + ' more lines not shown' : '') || 'No forms, buttons or tables found';
+    return {
+        text: text,
+        forms: Array.from(groups.keys()).filter(f => f).length,
+        controls: all.length - hidden,
+        hidden: hidden,
+        tables: tables.length,
+        truncated: omitted > 0
+    };
+}
+"""
+
+
+def get_page_digest(page, max_chars: int = DEFAULT_MAX_CHARS, max_options: int = MAX_OPTIONS,
+                    max_tables: int = MAX_TABLES, sample_rows: int = SAMPLE_ROWS) -> Dict:
+    """
+    Describe the page's interactive elements in one round trip.
+
+    Returns:
+        {'text': str, 'forms': int, 'controls': int, 'hidden': int, 'tables': int,
+         'truncated': bool, 'ms': float}
+    """
+    start = time.perf_counter()
+    digest = page.evaluate(DIGEST_JS, {
+        'maxChars': max_chars, 'maxOptions': max_options, 'maxTables': max_tables,
+        'sampleRows': sample_rows, 'tableShare': TABLE_BUDGET_SHARE
+    })
+    digest['ms'] = (time.perf_counter() - start) * 1000
+    return digest
+
+
+def describe_page(page, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """Digest text for the prompt; falls back to the locator-based extractor if evaluate fails"""
+    try:
+        return get_page_digest(page, max_chars)['text']
+    except Exception as e:
+        print(f"   ⚠️ Page digest failed ({e}), using locator extraction")
+        return format_targeted_html_for_prompt(extract_targeted_html(page))
+
+
+# ============================================================================
+# LEGACY LOCATOR-BASED EXTRACTION (fallback + benchmark baseline)
+# ============================================================================
+
+def extract_targeted_html(page, element_types=['form', 'button', 'input', 'table']):
+    """
+    Extract ONLY specific HTML elements with their complete paths/selectors.
+    This gives Claude precise selector information without overwhelming with full HTML.
+    
+    Args:
+        page: Playwright page object
+        element_types: List of HTML tags to extract
+    
+    Returns:
+        Dict with extracted elements and their selectors
+    """
+    try:
+        targeted_html = {
+            'forms': [],
+            'buttons': [],
+            'inputs': [],
+            'tables': [],
+            'selects': []
+        }
+        
+        # Extract all forms with complete structure
+        forms = page.locator('form').all()
+        for i, form in enumerate(forms):
+            try:
+                form_html = form.evaluate('el => el.outerHTML')
+                form_id = form.get_attribute('id') or f'form_{i}'
+                form_action = form.get_attribute('action') or 'N/A'
+                form_method = form.get_attribute('method') or 'GET'
+                
+                targeted_html['forms'].append({
+                    'index': i,
+                    'id': form_id,
+                    'selector': f'form#{form_id}' if form.get_attribute('id') else f'form:nth-of-type({i+1})',
+                    'action': form_action,
+                    'method': form_method,
+                    'html': form_html[:2000]  # Limit each form to 2k chars
+                })
+            except:
+                continue
+        
+        # Extract all buttons with paths
+        buttons = page.locator('button, input[type="submit"], input[type="button"]').all()
+        for i, button in enumerate(buttons):
+            try:
+                btn_id = button.get_attribute('id')
+                btn_class = button.get_attribute('class')
+                btn_type = button.get_attribute('type')
+                btn_text = button.inner_text() if button.evaluate('el => el.tagName') == 'BUTTON' else button.get_attribute('value')
+                btn_name = button.get_attribute('name')
+                
+                # Build best selector
+                if btn_id:
+                    selector = f'#{btn_id}'
+                elif btn_name:
+                    selector = f'[name="{btn_name}"]'
+                elif btn_class:
+                    selector = f'button.{btn_class.split()[0]}' if 'button' in str(button.evaluate('el => el.tagName')).lower() else f'input.{btn_class.split()[0]}'
+                else:
+                    selector = f'button:nth-of-type({i+1})'
+                
+                targeted_html['buttons'].append({
+                    'index': i,
+                    'id': btn_id,
+                    'name': btn_name,
+                    'class': btn_class,
+                    'type': btn_type,
+                    'text': btn_text,
+                    'selector': selector,
+                    'full_selector': f'{selector}[type="{btn_type}"]' if btn_type else selector
+                })
+            except:
+                continue
+        
+        # Extract all input fields with paths
+        inputs = page.locator('input[type="text"], input[type="search"], input:not([type])').all()
+        for i, inp in enumerate(inputs):
+            try:
+                inp_id = inp.get_attribute('id')
+                inp_name = inp.get_attribute('name')
+                inp_class = inp.get_attribute('class')
+                inp_placeholder = inp.get_attribute('placeholder')
+                inp_type = inp.get_attribute('type') or 'text'
+                
+                # Build best selector
+                if inp_id:
+                    selector = f'#{inp_id}'
+                elif inp_name:
+                    selector = f'input[name="{inp_name}"]'
+                elif inp_placeholder:
+                    selector = f'input[placeholder="{inp_placeholder}"]'
+                else:
+                    selector = f'input:nth-of-type({i+1})'
+                
+                targeted_html['inputs'].append({
+                    'index': i,
+                    'id': inp_id,
+                    'name': inp_name,
+                    'class': inp_class,
+                    'type': inp_type,
+                    'placeholder': inp_placeholder,
+                    'selector': selector
+                })
+            except:
+                continue
+        
+        # Extract select dropdowns
+        selects = page.locator('select').all()
+        for i, select in enumerate(selects):
+            try:
+                sel_id = select.get_attribute('id')
+                sel_name = select.get_attribute('name')
+                
+                options = select.locator('option').all()
+                option_values = []
+                for opt in options[:10]:  # First 10 options
+                    try:
+                        option_values.append({
+                            'value': opt.get_attribute('value'),
+                            'text': opt.inner_text()
+                        })
+                    except:
+                        continue
+                
+                selector = f'#{sel_id}' if sel_id else f'select[name="{sel_name}"]' if sel_name else f'select:nth-of-type({i+1})'
+                
+                targeted_html['selects'].append({
+                    'index': i,
+                    'id': sel_id,
+                    'name': sel_name,
+                    'selector': selector,
+                    'options': option_values
+                })
+            except:
+                continue
+        
+        # Extract result tables (for data structure)
+        tables = page.locator('table').all()
+        for i, table in enumerate(tables[:3]):  # Only first 3 tables
+            try:
+                table_id = table.get_attribute('id')
+                table_class = table.get_attribute('class')
+                
+                # Get headers
+                headers = []
+                header_cells = table.locator('th').all()
+                for th in header_cells[:10]:  # First 10 headers
+                    try:
+                        headers.append(th.inner_text())
+                    except:
+                        continue
+                
+                # Get first row as sample
+                first_row = []
+                first_row_cells = table.locator('tbody tr:first-child td').all()
+                for td in first_row_cells[:10]:
+                    try:
+                        first_row.append(td.inner_text()[:50])  # First 50 chars
+                    except:
+                        continue
+                
+                selector = f'#{table_id}' if table_id else f'table.{table_class.split()[0]}' if table_class else f'table:nth-of-type({i+1})'
+                
+                targeted_html['tables'].append({
+                    'index': i,
+                    'id': table_id,
+                    'class': table_class,
+                    'selector': selector,
+                    'headers': headers,
+                    'sample_row': first_row
+                })
+            except:
+                continue
+        
+        return targeted_html
+        
+    except Exception as e:
+        print(f"   ⚠️ Targeted extraction failed: {e}")
+        return None
+
+
+def format_targeted_html_for_prompt(targeted_html):
+    """Format extracted HTML into a clean, developer-friendly string"""
+    if not targeted_html:
+        return "No targeted HTML extracted"
+    
+    output = []
+    
+    # Forms
+    if targeted_html['forms']:
+        output.append("=== FORMS ===")
+        for form in targeted_html['forms']:
+            output.append(f"\nForm #{form['index']}:")
+            output.append(f"  Selector: {form['selector']}")
+            output.append(f"  Action: {form['action']}")
+            output.append(f"  Method: {form['method']}")
+    
+    # Input fields
+    if targeted_html['inputs']:
+        output.append("\n=== INPUT FIELDS ===")
+        for inp in targeted_html['inputs']:
+            output.append(f"\nInput #{inp['index']}:")
+            output.append(f"  Selector: {inp['selector']}")
+            output.append(f"  ID: {inp['id']}")
+            output.append(f"  Name: {inp['name']}")
+            output.append(f"  Type: {inp['type']}")
+            output.append(f"  Placeholder: {inp['placeholder']}")
+    
+    # Buttons
+    if targeted_html['buttons']:
+        output.append("\n=== BUTTONS ===")
+        for btn in targeted_html['buttons']:
+            output.append(f"\nButton #{btn['index']}:")
+            output.append(f"  Selector: {btn['selector']}")
+            output.append(f"  Full Selector: {btn['full_selector']}")
+            output.append(f"  Text: {btn['text']}")
+            output.append(f"  ID: {btn['id']}")
+            output.append(f"  Name: {btn['name']}")
+            output.append(f"  Type: {btn['type']}")
+    
+    # Selects
+    if targeted_html['selects']:
+        output.append("\n=== SELECT DROPDOWNS ===")
+        for sel in targeted_html['selects']:
+            output.append(f"\nSelect #{sel['index']}:")
+            output.append(f"  Selector: {sel['selector']}")
+            output.append(f"  Options: {len(sel['options'])} total")
+            for opt in sel['options'][:5]:  # Show first 5
+                output.append(f"    - {opt['text']} (value={opt['value']})")
+    
+    # Tables
+    if targeted_html['tables']:
+        output.append("\n=== TABLES (Results) ===")
+        for tbl in targeted_html['tables']:
+            output.append(f"\nTable #{tbl['index']}:")
+            output.append(f"  Selector: {tbl['selector']}")
+            output.append(f"  Headers: {', '.join(tbl['headers'])}")
+            if tbl['sample_row']:
+                output.append(f"  Sample Row: {', '.join(tbl['sample_row'])}")
+    
+    return '\n'.join(output)
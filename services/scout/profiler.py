@@ -0,0 +1,337 @@
+"""
+Per-step profiler for generated scrapers
+
+A scraper that passes its tests can still spend most of its time in fixed
+waits, networkidle waits and navigations it didn't need. This runs one
+search() on a pooled page wrapped in a timing proxy: every Playwright call
+(page, locators, element handles, keyboard/mouse) is timed and attributed to
+the scraper source line that made it, and Python time between calls (sleeps,
+parsing) is recorded against the next line. A Playwright trace can be saved
+alongside for `playwright show-trace`.
+
+The profile lists the slowest steps and an estimate of avoidable time; the
+agent's optimize phase sends it back to Claude for a faster scraper.
+
+Usage:
+    runner = ScraperTestRunner(concurrency=1)
+    profile = profile_scraper(code, {'first_name': 'JOHN', 'last_name': 'SMITH'}, runner, record_type='tax')
+    print(format_profile(profile))
+
+    python services/scout/profiler.py scrapers/tx/harris/probate.py --first JOHN --last SMITH
+    python services/scout/profiler.py scrapers/tx/harris/tax.py --first JOHN --last SMITH --trace harris.zip
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import linecache
+import traceback
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path (go up 2 levels: scout -> services -> root)
+project_root = Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(project_root))
+
+PROFILE_DIR = project_root / ".cache" / "scout_profiles"
+
+NAVIGATION_CALLS = {'goto', 'reload', 'go_back', 'go_forward', 'wait_for_url', 'wait_for_navigation'}
+FIXED_WAIT_CALLS = {'wait_for_timeout'}
+WAIT_CALLS = {'wait_for_selector', 'wait_for_load_state', 'wait_for_function', 'wait_for', 'wait_for_event'}
+ACTION_CALLS = {'click', 'dblclick', 'fill', 'type', 'press', 'press_sequentially', 'select_option',
+                'check', 'uncheck', 'hover', 'set_input_files', 'tap'}
+
+# Playwright objects whose calls are timed too (returned by the page's own calls)
+PROXIED_TYPES = {'Locator', 'ElementHandle', 'FrameLocator', 'Frame', 'Keyboard', 'Mouse'}
+
+SCRIPT_GAP_MIN_S = 0.05  # Python time between calls shorter than this isn't worth a step
+SLOW_SCRIPT_GAP_S = 0.5  # ...longer than this is almost always a sleep
+
+
+# ============================================================================
+# TIMING PROXY
+# ============================================================================
+
+def _unwrap(value):
+    """Playwright can't serialize proxies - pass the real objects through"""
+    if isinstance(value, _Timed):
+        return value._target
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _unwrap(v) for k, v in value.items()}
+    return value
+
+
+class _Recorder:
+    """Collects timed calls made from one scraper file"""
+
+    def __init__(self, source_path: str):
+        self.source_path = source_path
+        self.steps: List[Dict] = []
+        self.depth = 0  # Calls made by Playwright itself (e.g. a locator inside expect) aren't steps
+        self.last_end = time.time()
+
+    def caller_line(self) -> int:
+        frame = sys._getframe(2)
+        while frame is not None:
+            if frame.f_code.co_filename == self.source_path:
+                return frame.f_lineno
+            frame = frame.f_back
+        return 0
+
+    def source(self, line: int) -> str:
+        return linecache.getline(self.source_path, line).strip() if line else '(after the last Playwright call)'
+
+    def gap(self, line: int, now: float):
+        """Python time since the last Playwright call, charged to `line`"""
+        gap = now - self.last_end
+        if gap >= SCRIPT_GAP_MIN_S:
+            self.steps.append({'line': line, 'code': self.source(line), 'call': '(python)', 'kind': 'script',
+                               'duration_s': gap, 'detail': 'sleep?' if gap >= SLOW_SCRIPT_GAP_S else ''})
+
+    def call(self, owner: str, name: str, fn, args, kwargs):
+        if self.depth:
+            return fn(*args, **kwargs)
+
+        line = self.caller_line()
+        start = time.time()
+        self.gap(line, start)
+        self.depth += 1
+        error = None
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.depth -= 1
+            end = time.time()
+            self.last_end = end
+            self.steps.append({'line': line, 'code': self.source(line), 'call': f"{owner}.{name}",
+                               'kind': _kind(name, args, kwargs), 'duration_s': end - start,
+                               'detail': error or _detail(name, args, kwargs)})
+
+
+def _kind(name: str, args, kwargs) -> str:
+    if name in NAVIGATION_CALLS:
+        return 'navigation'
+    if name in FIXED_WAIT_CALLS:
+        return 'fixed_wait'
+    if name in WAIT_CALLS:
+        if 'networkidle' in (list(args) + list(kwargs.values())):
+            return 'networkidle'
+        return 'wait'
+    if name in ACTION_CALLS:
+        return 'action'
+    return 'read'
+
+
+def _detail(name: str, args, kwargs) -> str:
+    parts = []
+    if name in NAVIGATION_CALLS | FIXED_WAIT_CALLS | WAIT_CALLS and args:
+        parts.append(str(args[0])[:120])
+    if kwargs.get('wait_until'):
+        parts.append(f"wait_until={kwargs['wait_until']}")
+    return ' '.join(parts)
+
+
+class _Timed:
+    """Proxy timing every method call on a Playwright object"""
+
+    def __init__(self, target, recorder: _Recorder, owner: str):
+        self._target = target
+        self._recorder = recorder
+        self._owner = owner
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if type(value).__name__ in PROXIED_TYPES:
+            return _Timed(value, self._recorder, name)  # page.keyboard, page.main_frame
+        if not callable(value):
+            return value
+
+        def timed(*args, **kwargs):
+            result = self._recorder.call(self._owner, name, value, _unwrap(args), _unwrap(kwargs))
+            return self._wrap(result)
+        return timed
+
+    def _wrap(self, result):
+        if type(result).__name__ in PROXIED_TYPES:
+            return _Timed(result, self._recorder, type(result).__name__.lower())
+        if isinstance(result, list) and result and type(result[0]).__name__ in PROXIED_TYPES:
+            return [_Timed(r, self._recorder, type(r).__name__.lower()) for r in result]
+        return result
+
+    def __iter__(self):
+        return iter(self._target)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __bool__(self):
+        return bool(self._target)
+
+
+# ============================================================================
+# PROFILING
+# ============================================================================
+
+def summarize_steps(steps: List[Dict], navigations: List[str], total_s: float) -> Dict:
+    """Time by kind, the slowest lines and what looks avoidable"""
+    by_kind = {}
+    for step in steps:
+        by_kind[step['kind']] = by_kind.get(step['kind'], 0.0) + step['duration_s']
+
+    by_line = {}
+    for step in steps:
+        entry = by_line.setdefault(step['line'], {'line': step['line'], 'code': step['code'], 'calls': 0,
+                                                   'duration_s': 0.0, 'kinds': set()})
+        entry['calls'] += 1
+        entry['duration_s'] += step['duration_s']
+        entry['kinds'].add(step['kind'])
+    slowest = sorted(by_line.values(), key=lambda e: -e['duration_s'])
+    for entry in slowest:
+        entry['kinds'] = sorted(entry['kinds'])
+
+    seen, redundant = set(), []
+    for url in navigations:
+        if url in seen:
+            redundant.append(url)
+        seen.add(url)
+    reloads = [s for s in steps if s['call'].endswith('.reload')]
+    nav_steps = [s for s in steps if s['kind'] == 'navigation']
+    avg_nav = sum(s['duration_s'] for s in nav_steps) / len(nav_steps) if nav_steps else 0.0
+
+    avoidable = {
+        'fixed_waits_s': by_kind.get('fixed_wait', 0.0),
+        'sleeps_s': sum(s['duration_s'] for s in steps if s['kind'] == 'script' and s['detail'] == 'sleep?'),
+        'networkidle_s': by_kind.get('networkidle', 0.0),
+        'redundant_navigation_s': avg_nav * len(redundant) + sum(s['duration_s'] for s in reloads),
+    }
+    return {
+        'total_s': total_s,
+        'by_kind': by_kind,
+        'slowest': slowest,
+        'navigations': navigations,
+        'redundant_navigations': redundant,
+        'avoidable': avoidable,
+        'avoidable_s': sum(avoidable.values()),
+    }
+
+
+def _profile_job(page, slot: int, path: str, name: Dict, death_date: str, trace_path: str) -> Dict:
+    """Runs in a test-runner worker: one timed search() on the pooled page"""
+    from services.scout.test_runner import load_candidate, json_safe
+    from services.scrapers.registry import ScraperRegistry
+
+    navigations, requests = [], []
+    page.on('framenavigated', lambda frame: frame == page.main_frame and navigations.append(frame.url))
+    page.on('requestfinished', lambda request: requests.append(request.url))
+    if trace_path:
+        page.context.tracing.start(screenshots=True, snapshots=True)
+
+    recorder = _Recorder(path)
+    records, error, module_name = None, None, None
+    start = recorder.last_end = time.time()
+    try:
+        module, module_name = load_candidate(path)
+        start = recorder.last_end = time.time()  # Import time isn't the scraper's
+        records = ScraperRegistry().invoke(module, _Timed(page, recorder, 'page'), name['first_name'],
+                                           name['last_name'], death_date=death_date)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        sys.modules.pop(module_name, None)
+    recorder.gap(0, time.time())  # Python time after the last call
+    total = time.time() - start
+
+    if trace_path:
+        Path(trace_path).parent.mkdir(parents=True, exist_ok=True)
+        page.context.tracing.stop(path=str(trace_path))
+    success = error is None and isinstance(records, list)
+    return {'success': success, 'records': json_safe(records) if success else None, 'error': error,
+            'steps': recorder.steps, 'requests': len(requests), 'trace': str(trace_path) if trace_path else None,
+            **summarize_steps(recorder.steps, navigations, total)}
+
+
+def profile_scraper(scraper_code: str, name: Dict, runner, record_type: str = 'property',
+                    death_date: str = None, trace_path=None, timeout_s: float = None) -> Dict:
+    """
+    Profile one search() on a pooled page.
+
+    Args:
+        scraper_code: Scraper source
+        name: {'first_name', 'last_name'}
+        runner: ScraperTestRunner whose worker processes run the search
+        record_type: For probate a death date two years back is passed unless given
+        trace_path: Save a Playwright trace (zip) here
+        timeout_s: Wall-clock limit (default: the runner's per-name timeout)
+
+    Returns:
+        {'success', 'records', 'error', 'steps': [{'line', 'code', 'call', 'kind', 'duration_s', 'detail'}],
+         'requests', 'trace', + summarize_steps() fields}
+    """
+    if record_type == 'probate' and death_date is None:
+        death_date = (datetime.now() - timedelta(days=730)).strftime('%Y-%m-%d')
+
+    path, temp_dir = runner.write_candidate(scraper_code, prefix="scout_profile_")
+    try:
+        return runner.call(_profile_job, str(path), {'first_name': name['first_name'], 'last_name': name['last_name']},
+                           death_date, str(Path(trace_path).resolve()) if trace_path else None, timeout_s=timeout_s)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def format_profile(profile: Dict, top: int = 8) -> str:
+    """Plain-text profile for the console and for the optimize prompt"""
+    kinds = ", ".join(f"{kind} {seconds:.1f}s" for kind, seconds in
+                      sorted(profile['by_kind'].items(), key=lambda kv: -kv[1]))
+    lines = [f"Total {profile['total_s']:.1f}s for one search ({len(profile['navigations'])} navigations, "
+             f"{profile['requests']} requests) - {kinds}",
+             "Slowest lines:"]
+    for entry in profile['slowest'][:top]:
+        lines.append(f"  {entry['duration_s']:5.1f}s  line {entry['line']:<4} {'/'.join(entry['kinds']):<20} "
+                     f"{entry['calls']}x  {entry['code'][:100]}")
+
+    avoidable = {k: v for k, v in profile['avoidable'].items() if v >= 0.1}
+    if avoidable:
+        lines.append("Likely avoidable: " + ", ".join(f"{k.replace('_s', '').replace('_', ' ')} {v:.1f}s"
+                                                      for k, v in avoidable.items()))
+    if profile['redundant_navigations']:
+        lines.append("Loaded more than once: " + ", ".join(sorted(set(profile['redundant_navigations'])))[:300])
+    return "\n".join(lines)
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+if __name__ == "__main__":
+    from services.scout.test_runner import ScraperTestRunner
+
+    parser = argparse.ArgumentParser(description='Profile one search() of a generated scraper')
+    parser.add_argument('scraper', type=str, help='Scraper file (e.g. scrapers/tx/harris/probate.py)')
+    parser.add_argument('--first', type=str, required=True, help='First name to search')
+    parser.add_argument('--last', type=str, required=True, help='Last name to search')
+    parser.add_argument('--record-type', type=str, default=None, help='Record type (default: file name)')
+    parser.add_argument('--trace', type=str, help='Save a Playwright trace zip here (view: playwright show-trace)')
+    parser.add_argument('--headful', action='store_true', help='Show the browser')
+    args = parser.parse_args()
+
+    scraper = Path(args.scraper)
+    record_type = args.record_type or scraper.stem
+    with ScraperTestRunner(concurrency=1, headless=not args.headful) as runner:
+        profile = profile_scraper(scraper.read_text(encoding='utf-8'),
+                                  {'first_name': args.first, 'last_name': args.last},
+                                  runner, record_type=record_type, trace_path=args.trace)
+
+    status = f"✓ {len(profile['records'])} records" if profile['success'] else "✗ failed"
+    print(f"\n⏱️ {scraper} - {status}")
+    print(format_profile(profile, top=15))
+    if profile['error']:
+        print(f"\n{profile['error'].strip().splitlines()[-1]}")
+    if profile['trace']:
+        print(f"\n🎞️ Trace: {profile['trace']} (playwright show-trace {profile['trace']})")
@@ -0,0 +1,113 @@
+"""
+Shared rate limiter for Anthropic API calls
+Token buckets for requests/minute and tokens/minute, shared by every thread
+in the process. A call reserves its estimated tokens up front (prompt size +
+max_tokens), blocks until both buckets have room, and is reconciled with the
+real usage from the response, so a batch of concurrent scout agents stays
+under the organisation's limits instead of tripping 429s.
+
+Usage:
+    limiter = LLMRateLimiter(requests_per_minute=50, tokens_per_minute=80000)
+    reservation = limiter.acquire(estimate_request_tokens(params))
+    response = anthropic_client.messages.create(**params)
+    limiter.settle(reservation, response_tokens(response))
+"""
+
+import re
+import json
+import time
+import threading
+from typing import Dict
+
+_BASE64_DATA = re.compile(r'(?<="data": )"[A-Za-z0-9+/=]{200,}"')
+
+
+def estimate_request_tokens(params: Dict) -> int:
+    """Rough upper bound for a Messages request: ~4 chars/token for the prompt + max_tokens"""
+    prompt = {k: params.get(k) for k in ('system', 'messages', 'tools') if params.get(k) is not None}
+    text = json.dumps(prompt, default=str)
+    # Images are billed by size, not by base64 length - count them as a flat ~1.6k tokens
+    text, images = _BASE64_DATA.subn('""', text)
+    return len(text) // 4 + images * 1600 + int(params.get('max_tokens') or 0)
+
+
+def response_tokens(response) -> int:
+    """Tokens a response counted against the limit (input + cache writes + output)"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return 0
+    return ((usage.input_tokens or 0)
+            + (getattr(usage, 'cache_creation_input_tokens', 0) or 0)
+            + (usage.output_tokens or 0))
+
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (amount is capped at capacity)"""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+
+class LLMRateLimiter:
+    """
+    Thread-safe requests/minute + tokens/minute limiter
+
+    Example:
+        limiter = LLMRateLimiter(requests_per_minute=50, tokens_per_minute=80000)
+        client = CachedAnthropic(anthropic.Anthropic(), rate_limiter=limiter)
+    """
+
+    def __init__(self, requests_per_minute: int = 50, tokens_per_minute: int = 80000):
+        """
+        Args:
+            requests_per_minute: Messages API calls allowed per minute (0 = unlimited)
+            tokens_per_minute: Input + output tokens allowed per minute (0 = unlimited)
+        """
+        self.requests = _Bucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = _Bucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'waited_s': 0.0, 'reserved_tokens': 0, 'used_tokens': 0}
+
+    def acquire(self, tokens: int) -> int:
+        """Block until one request and `tokens` tokens are available; returns the reservation"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = 0.0
+                for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                    if bucket:
+                        bucket.refill(now)
+                        wait = max(wait, bucket.wait_for(amount))
+                if wait <= 0:
+                    if self.requests:
+                        self.requests.level -= 1
+                    if self.tokens:
+                        self.tokens.level -= tokens  # May go negative for oversized requests
+                    self.stats['calls'] += 1
+                    self.stats['waited_s'] += waited
+                    self.stats['reserved_tokens'] += tokens
+                    return tokens
+            time.sleep(min(wait, 5.0))
+            waited += min(wait, 5.0)
+
+    def settle(self, reserved: int, actual: int):
+        """Return over-reserved tokens (or charge the shortfall) once real usage is known"""
+        with self._lock:
+            if self.tokens:
+                self.tokens.refill(time.monotonic())
+                self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved - actual)
+            self.stats['used_tokens'] += actual
+
+    def summary(self) -> Dict:
+        return {**self.stats, 'waited_s': round(self.stats['waited_s'], 1)}
@@ -0,0 +1,205 @@
+"""
+Screenshot preparation for Claude vision calls
+Playwright's viewport screenshot is a 1920x1080 PNG (~0.3-1MB, ~1.5k image
+tokens). Before it is sent it is cropped to the page content (uniform margins
+around centred layouts are trimmed), downscaled and re-encoded as JPEG/WebP.
+A perceptual hash of every screenshot is kept (a difference hash per tile of a
+16x9 grid, so a one-line "No records found" still counts as a change), and a
+shot that looks the same as the last one sent is skipped instead of paying
+for it again.
+
+Usage:
+    preparer = ScreenshotPreparer(max_width=1024, max_pixels=600_000, image_format='jpeg', quality=70)
+    block = preparer.image_block(page.screenshot())   # None = unchanged, don't send
+    preparer.print_report()
+
+Needs Pillow; without it screenshots are sent as PNG and only byte-identical
+repeats are skipped.
+"""
+
+import io
+import math
+import base64
+import hashlib
+from typing import Dict, Optional
+
+try:
+    from PIL import Image, ImageChops  # Optional: resize/re-encode/perceptual hash
+except ImportError:
+    Image = None
+
+# Claude downsizes anything larger than this before counting tokens
+CLAUDE_MAX_EDGE = 1568
+CLAUDE_MAX_PIXELS = 1_150_000
+
+MEDIA_TYPES = {'jpeg': 'image/jpeg', 'webp': 'image/webp', 'png': 'image/png'}
+
+
+def image_tokens(width: int, height: int) -> int:
+    """Approximate image tokens Claude bills for a width x height image (~w*h/750)"""
+    scale = min(1.0, CLAUDE_MAX_EDGE / max(width, height), math.sqrt(CLAUDE_MAX_PIXELS / (width * height)))
+    return math.ceil((width * scale) * (height * scale) / 750)
+
+
+def tile_dhash(image, cols: int = 16, rows: int = 9, size: int = 8) -> tuple:
+    """
+    64-bit difference hash (brightness gradient of a (size+1) x size thumbnail)
+    for each tile of a cols x rows grid. A single whole-image dHash misses small
+    but important changes on form pages, e.g. an error line under the form.
+    """
+    width = cols * (size + 1)
+    pixels = image.convert('L').resize((width, rows * size), Image.BILINEAR).tobytes()
+    hashes = []
+    for tile_row in range(rows):
+        for tile_col in range(cols):
+            bits = 0
+            for y in range(tile_row * size, (tile_row + 1) * size):
+                start = y * width + tile_col * (size + 1)
+                for x in range(start, start + size):
+                    bits = (bits << 1) | (pixels[x] > pixels[x + 1])
+            hashes.append(bits)
+    return tuple(hashes)
+
+
+def crop_to_content(image, tolerance: int = 8):
+    """Trim uniform margins (the colour of the top-left pixel) around the page content"""
+    rgb = image.convert('RGB')
+    background = Image.new('RGB', rgb.size, rgb.getpixel((0, 0)))
+    diff = ImageChops.difference(rgb, background).convert('L').point(lambda v: 255 if v > tolerance else 0)
+    box = diff.getbbox()
+    if not box:
+        return rgb  # Blank page - nothing to crop to
+    return rgb.crop(box)
+
+
+class ScreenshotPreparer:
+    """
+    Crops, downscales, re-encodes and de-duplicates screenshots; keeps byte/token stats
+
+    Example:
+        preparer = ScreenshotPreparer()
+        block = preparer.image_block(page.screenshot())
+        if block:
+            message_content.append(block)
+    """
+
+    def __init__(self, max_width: int = 1024, max_pixels: int = 600_000, image_format: str = 'jpeg',
+                 quality: int = 70, crop: bool = True, dedupe_distance: int = 4):
+        """
+        Args:
+            max_width: Downscale wider screenshots to this width (aspect kept)
+            max_pixels: ...and larger ones to this area (~800 image tokens)
+            image_format: 'jpeg', 'webp' or 'png'
+            quality: JPEG/WebP quality (1-100)
+            crop: Trim uniform margins around the content first
+            dedupe_distance: Max dHash bits (of 64) that may differ in any one tile for "unchanged"; -1 disables
+        """
+        if image_format not in MEDIA_TYPES:
+            raise ValueError(f"image_format must be one of {list(MEDIA_TYPES)}")
+        self.max_width = max_width
+        self.max_pixels = max_pixels
+        self.image_format = image_format
+        self.quality = quality
+        self.crop = crop
+        self.dedupe_distance = dedupe_distance
+
+        self._last_hash = None
+        self.stats = {'screenshots': 0, 'sent': 0, 'skipped_unchanged': 0,
+                      'original_bytes': 0, 'sent_bytes': 0, 'original_tokens': 0, 'sent_tokens': 0}
+
+    def _is_unchanged(self, fingerprint) -> bool:
+        if self.dedupe_distance < 0 or self._last_hash is None:
+            return False
+        if isinstance(fingerprint, tuple):
+            return all(bin(a ^ b).count('1') <= self.dedupe_distance for a, b in zip(fingerprint, self._last_hash))
+        return fingerprint == self._last_hash
+
+    def prepare(self, png_bytes: bytes) -> Optional[Dict]:
+        """
+        Returns:
+            {'data': base64 str, 'media_type', 'bytes', 'tokens', 'width', 'height'},
+            or None when the page looks the same as the last screenshot sent
+        """
+        self.stats['screenshots'] += 1
+        self.stats['original_bytes'] += len(png_bytes)
+
+        if Image is None:
+            width, height = _png_size(png_bytes)
+            fingerprint = hashlib.sha256(png_bytes).hexdigest()
+            original_tokens = image_tokens(width, height)
+            self.stats['original_tokens'] += original_tokens
+            if self._is_unchanged(fingerprint):
+                self.stats['skipped_unchanged'] += 1
+                return None
+            self._last_hash = fingerprint
+            return self._sent(png_bytes, 'png', width, height, original_tokens)
+
+        image = Image.open(io.BytesIO(png_bytes))
+        self.stats['original_tokens'] += image_tokens(*image.size)
+
+        fingerprint = tile_dhash(image)
+        if self._is_unchanged(fingerprint):
+            self.stats['skipped_unchanged'] += 1
+            return None
+        self._last_hash = fingerprint
+
+        if self.crop:
+            image = crop_to_content(image)
+        scale = min(1.0, self.max_width / image.width, math.sqrt(self.max_pixels / (image.width * image.height)))
+        if scale < 1.0:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.LANCZOS)
+
+        data, image_format = self._encode(image, self.image_format)
+        if image_format != 'png':
+            # Flat, mostly-text pages often compress better losslessly - send whichever is smaller
+            png, _ = self._encode(image, 'png')
+            if len(png) < len(data):
+                data, image_format = png, 'png'
+        return self._sent(data, image_format, image.width, image.height, image_tokens(image.width, image.height))
+
+    def _encode(self, image, image_format: str):
+        out = io.BytesIO()
+        if image_format == 'png':
+            image.save(out, format='PNG', optimize=True)
+        else:
+            image.convert('RGB').save(out, format=image_format.upper(), quality=self.quality)
+        return out.getvalue(), image_format
+
+    def _sent(self, data: bytes, image_format: str, width: int, height: int, tokens: int) -> Dict:
+        self.stats['sent'] += 1
+        self.stats['sent_bytes'] += len(data)
+        self.stats['sent_tokens'] += tokens
+        return {'data': base64.b64encode(data).decode('utf-8'), 'media_type': MEDIA_TYPES[image_format],
+                'bytes': len(data), 'tokens': tokens, 'width': width, 'height': height}
+
+    def image_block(self, png_bytes: bytes) -> Optional[Dict]:
+        """Messages API image content block, or None if unchanged"""
+        prepared = self.prepare(png_bytes)
+        if prepared is None:
+            return None
+        return {"type": "image", "source": {"type": "base64", "media_type": prepared['media_type'],
+                                            "data": prepared['data']}}
+
+    def summary(self) -> Dict:
+        s = self.stats
+        return {
+            **s,
+            'bytes_saved': s['original_bytes'] - s['sent_bytes'],
+            'tokens_saved': s['original_tokens'] - s['sent_tokens']
+        }
+
+    def print_report(self, prefix: str = ""):
+        s = self.summary()
+        if not s['screenshots']:
+            return
+        print(f"{prefix}🖼️ Screenshots: {s['sent']}/{s['screenshots']} sent "
+              f"({s['skipped_unchanged']} unchanged skipped) | "
+              f"{s['original_bytes'] / 1024:.0f}KB -> {s['sent_bytes'] / 1024:.0f}KB | "
+              f"~{s['original_tokens']} -> ~{s['sent_tokens']} image tokens "
+              f"(saved {s['bytes_saved'] / 1024:.0f}KB, ~{s['tokens_saved']} tokens)")
+
+
+def _png_size(png_bytes: bytes):
+    """Width/height from the PNG IHDR chunk (no Pillow needed)"""
+    return int.from_bytes(png_bytes[16:20], 'big'), int.from_bytes(png_bytes[20:24], 'big')
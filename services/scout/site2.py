@@ -26,10 +26,13 @@ from decimal import Decimal
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright, Page, Browser
 import agentql
-import requests
 from services.captcha.solver import CaptchaSolver
+from services.captcha.detection import detect_captcha_async, inject_token
 from services.scout.google_search_api import GoogleSearchAPI
 from anthropic import Anthropic
+from services.scout.llm_cache import CachedAnthropic
+from services.scout.llm_usage import usage_tags
+from services.scout.jina_client import JinaReader
 from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, Text, DECIMAL, Date, JSON, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
@@ -151,7 +154,10 @@ engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Initialize Claude client
-claude_client = Anthropic(api_key=CLAUDE_API_KEY)
+claude_client = CachedAnthropic(Anthropic(api_key=CLAUDE_API_KEY))
+
+# Jina Reader, cached on disk and revalidated against the loaded page (SCOUT_JINA_CACHE=0 to bypass)
+jina_reader = JinaReader(api_key=os.getenv('JINA_API_KEY'))
 
 # Initialize Google Search API
 google_api = GoogleSearchAPI()
@@ -245,7 +251,8 @@ Respond with ONLY the complete URL, nothing else."""
         response = claude_client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=200,
-            messages=[{"role": "user", "content": claude_prompt}]
+            messages=[{"role": "user", "content": claude_prompt}],
+            phase='url_select'
         )
         
         selected_url = response.content[0].text.strip()
@@ -376,15 +383,15 @@ async def analyze_page_comprehensively(page: Page, page_url: str) -> Dict:
     try:
         # PART 1: Jina AI - Semantic understanding
         print(f"      → Jina AI: Analyzing page semantics...")
-        jina_url = f"https://r.jina.ai/{page_url}"
         headers = {
             'Accept': 'text/plain',
             'X-Return-Format': 'text'
         }
         
-        jina_response = requests.get(jina_url, headers=headers, timeout=30)
-        jina_response.raise_for_status()
-        jina_content = jina_response.text
+        # Async + cached: doesn't stall the event loop, and an unchanged page costs no Reader call
+        jina_content = await jina_reader.read(page_url, headers=headers, page_html=await page.content())
+        if jina_content is None:
+            raise RuntimeError("no Reader output")
         
         # Extract semantic info from Jina
         analysis['semantic_summary'] = jina_content[:800]  # First 800 chars
@@ -721,7 +728,8 @@ Now analyze the above data and provide your action plan:"""
         response = claude_client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            phase='plan'
         )
         
         response_text = response.content[0].text.strip()
@@ -1047,18 +1055,14 @@ async def scout_county_search_type(
                 
                 # Try to solve with CapSolver
                 if captcha_solver:
-                    page_content = await page.content()
-                    captcha_type, site_key = captcha_solver.detect_captcha_type(page_content, page)
-                    if captcha_type:
-                        token = captcha_solver.solve(captcha_type, site_key, page.url)
+                    captcha = await detect_captcha_async(page)
+                    if captcha and not captcha.solvable:
+                        print(f"  ⚠️ No site key on the page (Cloudflare challenge?) - not solving")
+                    elif captcha:
+                        token = await captcha_solver.solve_async(captcha.task_type, captcha.site_key, page.url,
+                                                                 page_action=captcha.action)
                         if token:
-                            await page.evaluate(f'''() => {{
-                                const textarea = document.getElementById('g-recaptcha-response');
-                                if (textarea) {{
-                                    textarea.innerHTML = "{token}";
-                                    textarea.value = "{token}";
-                                }}
-                            }}''')
+                            await inject_token(page, captcha, token)
                             print(f"  ✅ CAPTCHA solved with CapSolver")
                             await asyncio.sleep(2)
             
@@ -1231,7 +1235,9 @@ async def scout_all_counties():
                         print(f"  ⏭️  {search_type.upper()} already scouted, skipping")
                         continue
                     
-                    await scout_county_search_type(page, county, search_type, session)
+                    with usage_tags(county=county.name, state=county.state, county_id=county.id,
+                                    record_type=search_type):
+                        await scout_county_search_type(page, county, search_type, session)
                     await asyncio.sleep(3)
             
             await browser.close()
@@ -1246,6 +1252,8 @@ async def scout_all_counties():
         traceback.print_exc()
     
     finally:
+        claude_client.print_report()
+        jina_reader.print_report()
         session.close()
 
 
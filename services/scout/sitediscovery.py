@@ -26,8 +26,11 @@ from dotenv import load_dotenv
 from playwright.async_api import async_playwright, Page, Browser
 import agentql
 from services.captcha.solver import CaptchaSolver
+from services.captcha.detection import detect_captcha_async, inject_token
 from services.scout.google_search_api import GoogleSearchAPI
 from anthropic import Anthropic
+from services.scout.llm_cache import CachedAnthropic
+from services.scout.llm_usage import usage_tags
 from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, Text, DECIMAL, Date, JSON, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
@@ -149,7 +152,7 @@ engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Initialize Claude client
-claude_client = Anthropic(api_key=CLAUDE_API_KEY)
+claude_client = CachedAnthropic(Anthropic(api_key=CLAUDE_API_KEY))
 
 # Initialize Google Search API
 google_api = GoogleSearchAPI()
@@ -269,7 +272,8 @@ Respond with ONLY the complete URL, nothing else."""
         response = claude_client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=200,
-            messages=[{"role": "user", "content": claude_prompt}]
+            messages=[{"role": "user", "content": claude_prompt}],
+            phase='url_select'
         )
         
         selected_url = response.content[0].text.strip()
@@ -393,7 +397,8 @@ def plan_navigation_with_claude(links: List[Dict[str, str]], search_goal: str) -
         response = claude_client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            phase='plan'
         )
         
         # Parse response
@@ -618,18 +623,14 @@ async def scout_county_search_type(
                 
                 # Try to solve with CapSolver
                 if captcha_solver:
-                    page_content = await page.content()
-                    captcha_type, site_key = captcha_solver.detect_captcha_type(page_content, page)
-                    if captcha_type:
-                        token = captcha_solver.solve(captcha_type, site_key, page.url)
+                    captcha = await detect_captcha_async(page)
+                    if captcha and not captcha.solvable:
+                        print(f"  ⚠️ No site key on the page (Cloudflare challenge?) - not solving")
+                    elif captcha:
+                        token = await captcha_solver.solve_async(captcha.task_type, captcha.site_key, page.url,
+                                                                 page_action=captcha.action)
                         if token:
-                            await page.evaluate(f'''() => {{
-                                const textarea = document.getElementById('g-recaptcha-response');
-                                if (textarea) {{
-                                    textarea.innerHTML = "{token}";
-                                    textarea.value = "{token}";
-                                }}
-                            }}''')
+                            await inject_token(page, captcha, token)
                             print(f"  ✅ CAPTCHA solved with CapSolver")
                             await asyncio.sleep(2)
             
@@ -761,7 +762,9 @@ async def scout_all_counties():
                         print(f"  ⏭️  {search_type.upper()} already scouted, skipping")
                         continue
                     
-                    await scout_county_search_type(page, county, search_type, session)
+                    with usage_tags(county=county.name, state=county.state, county_id=county.id,
+                                    record_type=search_type):
+                        await scout_county_search_type(page, county, search_type, session)
                     await asyncio.sleep(3)
             
             await browser.close()
@@ -776,6 +779,7 @@ async def scout_all_counties():
         traceback.print_exc()
     
     finally:
+        claude_client.print_report()
         session.close()
 
 
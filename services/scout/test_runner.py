@@ -0,0 +1,420 @@
+"""
+Parallel, isolated test runner for generated scrapers
+Each candidate is written to its own temp directory and imported under a
+unique module name, so concurrent agents (and successive fix attempts) never
+share a temp_scraper.py. Test names run concurrently on a small pool of
+worker processes, each owning one sync Playwright + browser for the runner's
+lifetime; every test gets a fresh context in one of them.
+
+Generated code never runs in the agent's process. A search() that hangs past
+name_timeout_s gets its worker (and that worker's browser) killed and replaced,
+and one that calls sys.exit()/os._exit() or crashes the interpreter only takes
+down its own worker.
+
+run() may be called from several threads at once (parallel candidates in
+agent.py); their tests share the pool's workers.
+
+Usage:
+    runner = ScraperTestRunner(concurrency=4)
+    report = runner.run(scraper_code, test_names, record_type='probate')
+    print(report['success_rate'], [r['elapsed'] for r in report['results']])
+    runner.close()
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import signal
+import uuid
+import tempfile
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from services.scrapers.registry import ScraperRegistry
+
+WORKER_START_TIMEOUT_S = 60  # Python + Playwright + Chromium launch in a fresh process
+WORKER_STOP_TIMEOUT_S = 10
+
+
+class TestWorkerError(Exception):
+    """A job died with its worker, or raised something search() isn't allowed to (e.g. SystemExit)"""
+    pass
+
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+def load_candidate(path: str):
+    """Import a candidate file in the current process under its own module name (the file's stem)"""
+    module_name = Path(path).stem
+    return ScraperRegistry.load_path(path, module_name), module_name
+
+
+def json_safe(records):
+    """Records as plain JSON types, so they can cross the process boundary"""
+    return json.loads(json.dumps(records, default=str))
+
+
+def _search_job(page, slot: int, path: str, name: Dict, death_date: str) -> Dict:
+    started = time.time()
+    module_name = None
+    try:
+        module, module_name = load_candidate(path)
+        records = ScraperRegistry().invoke(module, page, name['first_name'], name['last_name'], death_date=death_date)
+        if not isinstance(records, list):
+            raise TypeError(f"search() returned {type(records).__name__}, expected list")
+        records = json_safe(records)
+        return {'name': name, 'success': True, 'records': records,
+                'output': json.dumps(records, indent=2), 'error': None,
+                'elapsed': time.time() - started, 'slot': slot}
+    except Exception:
+        return {'name': name, 'success': False, 'records': None, 'output': None,
+                'error': traceback.format_exc(), 'elapsed': time.time() - started, 'slot': slot}
+    finally:
+        sys.modules.pop(module_name, None)
+
+
+def _worker_main(conn, index: int, launch_kwargs: Dict, action_timeout_ms: int):
+    """
+    Worker process: start a browser, then run (fn, args) jobs from conn until None.
+    Every reply is (status, payload, healthy) - healthy False means the browser is gone.
+    """
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()  # Own process group, so a kill takes the Playwright driver and Chromium with it
+
+    from playwright.sync_api import sync_playwright
+    try:
+        playwright = sync_playwright().start()
+        browser = playwright.chromium.launch(**launch_kwargs)
+    except BaseException:
+        conn.send(('error', traceback.format_exc(), False))
+        return
+    conn.send(('ready', None, True))
+
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                return  # Runner went away
+            if job is None:
+                return
+            fn, args = job
+
+            context = None
+            try:
+                context = browser.new_context()
+                page = context.new_page()
+                page.set_default_timeout(action_timeout_ms)
+                reply = ('ok', fn(page, index, *args))
+            except BaseException:  # Including SystemExit from generated code
+                reply = ('error', traceback.format_exc())
+            finally:
+                try:
+                    if context:
+                        context.close()
+                except Exception:
+                    pass
+
+            healthy = browser.is_connected()
+            try:
+                conn.send((*reply, healthy))
+            except Exception:  # Result that doesn't pickle
+                conn.send(('error', traceback.format_exc(), healthy))
+            if not healthy:
+                return
+    finally:
+        try:
+            browser.close()
+            playwright.stop()
+        except Exception:
+            pass
+
+
+class _Worker:
+    """Runner-side handle for one worker process"""
+
+    def __init__(self, mp_context, index: int, launch_kwargs: Dict, action_timeout_ms: int):
+        self.index = index
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(target=_worker_main, name=f"scraper-test-{index}", daemon=True,
+                                          args=(child_conn, index, launch_kwargs, action_timeout_ms))
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self):
+        try:
+            if not self.conn.poll(WORKER_START_TIMEOUT_S):
+                raise TestWorkerError(f"Test browser {self.index} did not start within {WORKER_START_TIMEOUT_S}s")
+            status, detail, _ = self.conn.recv()
+        except (EOFError, OSError):
+            raise TestWorkerError(f"Test browser {self.index} exited while starting (exit code {self.exitcode()})")
+        except TestWorkerError:
+            self.kill()
+            raise
+        if status != 'ready':
+            self.kill()
+            raise TestWorkerError(f"Test browser {self.index} failed to start: {detail}")
+
+    def execute(self, fn, args, timeout_s: float):
+        """
+        (status, payload, healthy) for one job
+
+        Raises:
+            TimeoutError if there's no reply within timeout_s
+            EOFError / OSError if the worker died
+        """
+        self.conn.send((fn, args))
+        if not self.conn.poll(timeout_s):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def exitcode(self):
+        self.process.join(1)
+        return self.process.exitcode
+
+    def kill(self):
+        if self.process.pid and hasattr(os, 'killpg'):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(WORKER_STOP_TIMEOUT_S)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(WORKER_STOP_TIMEOUT_S)
+        self.kill()  # Reaps the driver/browser group even after a clean exit
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+class ScraperTestRunner:
+    """
+    Runs a candidate scraper's search() for every test name at once.
+
+    Workers are started once and reused across run() calls, so each fix
+    attempt only pays for new contexts, not for launching Chromium. A worker
+    is only replaced when a job times out or kills it.
+    """
+
+    def __init__(self, concurrency: int = 4, headless: bool = True,
+                 action_timeout_ms: int = 30000, name_timeout_s: float = 120,
+                 pass_threshold: float = 0.5):
+        """
+        Args:
+            concurrency: Worker browsers (and therefore test names) running at once
+            headless: Passed to chromium.launch()
+            action_timeout_ms: Default Playwright timeout per action
+            name_timeout_s: Wall-clock limit for one search() call; its worker is killed after this
+            pass_threshold: Fraction of test names that must succeed
+        """
+        self.concurrency = max(1, concurrency)
+        self.launch_kwargs = {'headless': headless}
+        self.action_timeout_ms = action_timeout_ms
+        self.name_timeout_s = name_timeout_s
+        self.pass_threshold = pass_threshold
+
+        # spawn: workers must not inherit the agent's threads, Playwright instance or locks
+        self._mp = multiprocessing.get_context('spawn')
+        self._workers: List[_Worker] = []
+        self._idle: queue.Queue = queue.Queue()
+        self._pool_lock = threading.Lock()
+        self._in_flight = 0  # Test names submitted by every thread's run() and not yet collected
+        self.replaced = 0    # Workers killed and replaced (timeouts, crashes)
+
+    # ------------------------------------------------------------------
+    # Pool
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self, needed: int):
+        target = min(self.concurrency, max(1, needed))
+        with self._pool_lock:
+            used = {w.index for w in self._workers}
+            free = (i for i in range(self.concurrency) if i not in used)
+            new_workers = [_Worker(self._mp, next(free), self.launch_kwargs, self.action_timeout_ms)
+                           for _ in range(target - len(self._workers))]
+            # Workers start in parallel; raise if one failed
+            failed = None
+            for worker in new_workers:
+                try:
+                    worker.wait_ready()
+                    self._workers.append(worker)
+                    self._idle.put(worker)
+                except TestWorkerError as e:
+                    print(f"   ⚠️ {e}")
+                    failed = failed or e
+            if failed and not self._workers:
+                raise failed
+
+    def _replace(self, worker: _Worker, reason: str):
+        """Kill a worker and start a fresh one in its slot"""
+        print(f"   ♻️ Test browser {worker.index} {reason} - replacing it")
+        worker.kill()
+        with self._pool_lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self.replaced += 1
+        try:
+            fresh = _Worker(self._mp, worker.index, self.launch_kwargs, self.action_timeout_ms)
+            fresh.wait_ready()
+        except TestWorkerError as e:
+            print(f"   ⚠️ Could not replace test browser {worker.index}: {e}")
+            return
+        with self._pool_lock:
+            self._workers.append(fresh)
+        self._idle.put(fresh)
+
+    def _checkout(self) -> _Worker:
+        while True:
+            try:
+                return self._idle.get(timeout=5)
+            except queue.Empty:
+                if not self._workers:  # Every replacement failed - try to start one again
+                    self._ensure_started(1)
+
+    def _execute(self, fn, args, timeout_s: float):
+        """Run fn(page, slot, *args) on an idle worker; the worker is killed if it overruns timeout_s"""
+        worker = self._checkout()
+        try:
+            status, payload, healthy = worker.execute(fn, args, timeout_s)
+        except TimeoutError:
+            self._replace(worker, f"timed out after {timeout_s:.0f}s")
+            raise TimeoutError(f"no result within {timeout_s:.0f}s")
+        except (EOFError, OSError):
+            code = worker.exitcode()
+            self._replace(worker, f"died (exit code {code})")
+            raise TestWorkerError(f"Test worker died (exit code {code}) - the scraper may have called "
+                                  f"os._exit() or crashed the interpreter")
+
+        if healthy:
+            self._idle.put(worker)
+        else:
+            self._replace(worker, "lost its browser")
+        if status != 'ok':
+            raise TestWorkerError(payload)
+        return payload
+
+    def close(self):
+        with self._pool_lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+        self._idle = queue.Queue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------
+    # Running candidates
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def write_candidate(scraper_code: str, prefix: str = "scout_candidate_"):
+        """Write the code to a private temp dir under a unique module name; returns (path, temp_dir)"""
+        module_name = f"{prefix}{uuid.uuid4().hex[:12]}"
+        temp_dir = Path(tempfile.mkdtemp(prefix=prefix))
+        path = temp_dir / f"{module_name}.py"
+        path.write_text(scraper_code, encoding='utf-8')
+        return path, temp_dir
+
+    def run(self, scraper_code: str, test_names: List[Dict], record_type: str = 'property',
+            death_date: str = None) -> Dict:
+        """
+        Test one candidate against all names concurrently.
+
+        Args:
+            scraper_code: Generated scraper source
+            test_names: [{'first_name', 'last_name', 'full_name'}, ...]
+            record_type: For probate a death date two years back is passed unless given
+            death_date: Death date (YYYY-MM-DD) passed to probate scrapers
+
+        Returns:
+            {
+                'passed': bool, 'success_rate': float,
+                'results': [{'name', 'success', 'records', 'output', 'error', 'elapsed', 'slot'}, ...],
+                'errors': [{'name', 'error'}, ...],
+                'wall_s': float, 'serial_s': float   # serial_s = sum of per-name times
+            }
+        """
+        start = time.time()
+        if record_type == 'probate' and death_date is None:
+            death_date = (datetime.now() - timedelta(days=730)).strftime('%Y-%m-%d')
+
+        try:
+            compile(scraper_code, '<candidate>', 'exec')  # Syntax errors without running anything here
+        except SyntaxError:
+            error_msg = traceback.format_exc()
+            print(f"   ✗ Scraper failed to import: {error_msg[-300:]}")
+            results = [{'name': name, 'success': False, 'records': None, 'output': None,
+                        'error': error_msg, 'elapsed': 0.0, 'slot': None} for name in test_names]
+            return self._report(results, start)
+
+        path, temp_dir = self.write_candidate(scraper_code)
+        with self._pool_lock:
+            self._in_flight += len(test_names)
+            in_flight = self._in_flight  # Includes other threads' tests sharing these workers
+        try:
+            self._ensure_started(in_flight)
+
+            def run_name(name):
+                started = time.time()
+                try:
+                    return self._execute(_search_job, (str(path), name, death_date), self.name_timeout_s)
+                except (TimeoutError, TestWorkerError) as e:
+                    return {'name': name, 'success': False, 'records': None, 'output': None,
+                            'error': f"{type(e).__name__}: {e}", 'elapsed': time.time() - started, 'slot': None}
+
+            with ThreadPoolExecutor(max_workers=max(1, len(test_names)), thread_name_prefix="scraper-test") as pool:
+                results = list(pool.map(run_name, test_names))
+        finally:
+            with self._pool_lock:
+                self._in_flight -= len(test_names)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        return self._report(results, start)
+
+    def call(self, fn, *args, timeout_s: float = None):
+        """
+        Run fn(page, slot, *args) on a fresh context in a worker and return its result (e.g. the profiler).
+        fn must be a module-level function and args/result picklable - it runs in the worker process.
+
+        Raises:
+            TimeoutError after timeout_s (default name_timeout_s); the worker is replaced
+            TestWorkerError if fn raised or the worker died
+        """
+        self._ensure_started(1)
+        return self._execute(fn, args, timeout_s or self.name_timeout_s)
+
+    def _report(self, results: List[Dict], start: float) -> Dict:
+        passed_count = len([r for r in results if r['success']])
+        success_rate = passed_count / len(results) if results else 0
+        return {
+            'passed': bool(results) and success_rate >= self.pass_threshold,
+            'success_rate': success_rate,
+            'results': results,
+            'errors': [{'name': r['name'], 'error': r['error']} for r in results if not r['success']],
+            'wall_s': time.time() - start,
+            'serial_s': sum(r['elapsed'] for r in results)
+        }
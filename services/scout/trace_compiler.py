@@ -0,0 +1,498 @@
+"""
+Trace compiler - exploration trace -> deterministic scraper, no LLM codegen
+
+interactive_exploration() records every fill/click/extract action it executed
+(with the selector and whether it worked) in exploration_log. The first
+successful search in that trace is a complete recipe: go to the start URL,
+fill the name fields, click search, read the results table. This module
+turns it into a parameterized scraper that follows the page contract
+(search(page, first_name, last_name[, death_date])):
+    - fill values equal to the test name become {first_name}/{last_name}
+    - steps stop at the first click after the last name fill (the submit)
+    - the results table is found at run time by the headers exploration saw,
+      and its columns are mapped onto the record type's output schema
+    - "no results" is the text exploration recorded, plus common phrasings
+
+The agent replays the compiled scraper on the test names and only falls back
+to LLM code generation (and its fix loop) when the replay fails.
+
+Usage:
+    compiled = compile_trace(site_analysis, 'probate', test_names, website_url)
+    if compiled:
+        passed, results, errors = test_scraper(compiled['code'], test_names, county_name, 'probate')
+        if passed and trace_replayed(compiled, results):
+            save_scraper(compiled['code'], ...)
+"""
+
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+# Results-table header keywords -> output schema field, per record type (first match wins, most specific first)
+FIELD_KEYWORDS = {
+    'probate': [
+        ('case_number', ['case number', 'case no', 'case #', 'cause number', 'cause no', 'case']),
+        ('case_status', ['status', 'disposition']),
+        ('filing_date', ['file date', 'filed', 'filing date', 'date filed', 'date']),
+        ('case_type', ['case type', 'type']),
+        ('decedent_name', ['decedent', 'style', 'party name', 'name', 'caption']),
+        ('executor_name', ['executor', 'administrator', 'representative', 'applicant']),
+        ('attorney_name', ['attorney']),
+    ],
+    'property': [
+        ('account_number', ['account', 'acct']),
+        ('parcel_id', ['parcel', 'pin', 'apn', 'property id', 'prop id']),
+        ('owner_name', ['owner', 'name']),
+        ('address', ['situs', 'property address', 'address', 'location']),
+        ('market_value', ['market value', 'appraised', 'total value', 'value']),
+        ('assessed_value', ['assessed', 'taxable']),
+        ('property_type', ['property type', 'class', 'type', 'use']),
+        ('year_built', ['year built', 'built']),
+    ],
+    'tax': [
+        ('account_number', ['account', 'acct', 'parcel']),
+        ('owner_name', ['owner', 'name']),
+        ('address', ['situs', 'property address', 'address', 'location']),
+        ('market_value', ['market value', 'appraised', 'value']),
+        ('total_owed', ['total due', 'amount due', 'balance', 'owed', 'due']),
+    ],
+    'judgment': [
+        ('case_number', ['case number', 'case no', 'cause', 'case']),
+        ('case_status', ['status']),
+        ('filing_date', ['filed', 'file date', 'date']),
+        ('debtor_name', ['defendant', 'debtor', 'name', 'style']),
+        ('amount', ['amount', 'judgment']),
+    ],
+}
+
+NUMERIC_FIELDS = {'market_value', 'assessed_value', 'total_owed', 'estate_value', 'amount'}
+
+
+# ============================================================================
+# TRACE EXTRACTION
+# ============================================================================
+
+def executed_actions(exploration_log: List[Dict]) -> List[Dict]:
+    """
+    Actions in the order they ran. Uses the per-action 'executed' records
+    (with 'ok'); older logs without them fall back to the planned actions.
+    """
+    actions = []
+    for entry in exploration_log:
+        if 'executed' in entry:
+            actions.extend(entry['executed'])
+            continue
+        plan = entry.get('action_plan') or {}
+        planned = plan['actions'] if isinstance(plan.get('actions'), list) else [plan]
+        actions.extend({**a, 'ok': True, 'url': entry.get('url')} for a in planned if isinstance(a, dict))
+    return actions
+
+
+def _parameterize(value: str, names: List[Dict]) -> Optional[str]:
+    """'SMITH' -> '{last_name}', 'SMITH, JOHN' -> '{last_name}, {first_name}'; None if no name in it"""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    for name in names:
+        first, last = name.get('first_name', ''), name.get('last_name', '')
+        templated = value
+        for part, token in ((last, '{last_name}'), (first, '{first_name}')):
+            if part:
+                templated = re.sub(rf'(?<![A-Za-z]){re.escape(part)}(?![A-Za-z])', token, templated, flags=re.I)
+        if templated != value:
+            return templated
+    return None
+
+
+def search_steps(actions: List[Dict], names: List[Dict]) -> Optional[Dict]:
+    """
+    Steps of the first successful search: everything before the first
+    extract_data, cut at the first click after the last name fill.
+
+    Returns:
+        {'start_url', 'steps': [{'action', 'selector', 'value'?}], 'name': test name used} or None
+    """
+    segment = []
+    for action in actions:
+        kind = action.get('action')
+        if kind == 'extract_data':
+            break
+        if kind == 'navigate_back':
+            return None  # Not a straight-line search
+        if kind in ('fill_form', 'click') and action.get('ok', True) and action.get('selector'):
+            segment.append(action)
+    else:
+        return None  # Exploration never reached results
+
+    fills = [i for i, a in enumerate(segment) if a['action'] == 'fill_form' and _parameterize(a.get('value'), names)]
+    if not fills:
+        return None
+
+    steps = []
+    used_name = None
+    submitted = False
+    for i, action in enumerate(segment):
+        if action['action'] == 'fill_form':
+            templated = _parameterize(action.get('value'), names)
+            steps.append({'action': 'fill', 'selector': action['selector'],
+                          'value': templated if templated is not None else str(action.get('value') or '')})
+            if templated is not None and used_name is None:
+                used_name = next(n for n in names if _parameterize(action.get('value'), [n]) is not None)
+        else:
+            steps.append({'action': 'click', 'selector': action['selector']})
+            if i > fills[-1]:
+                submitted = True
+                break
+    if not submitted:
+        last_fill = segment[fills[-1]]['selector']
+        steps.append({'action': 'press', 'selector': last_fill, 'key': 'Enter'})
+
+    start_url = next((a.get('url') for a in actions if a.get('url')), None)
+    return {'start_url': start_url, 'steps': steps, 'name': used_name}
+
+
+class _HeaderParser(HTMLParser):
+    """<th> texts of every table in a results HTML snippet"""
+
+    def __init__(self):
+        super().__init__()
+        self.tables, self._cell = [], None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self.tables.append([])
+        elif tag == 'th' and self.tables:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == 'th' and self._cell is not None:
+            self.tables[-1].append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def result_headers(exploration_log: List[Dict]) -> List[str]:
+    """Headers of the results table exploration saw (probate table structure, else the results HTML)"""
+    for entry in exploration_log:
+        structure = entry.get('probate_table_structure')
+        if structure and structure.get('headers'):
+            return [h for h in structure['headers'] if h]
+    for entry in exploration_log:
+        html = entry.get('results_html')
+        if html and html != "Could not capture":
+            parser = _HeaderParser()
+            try:
+                parser.feed(html)
+            except Exception:
+                continue
+            tables = [t for t in parser.tables if len([h for h in t if h]) >= 2]
+            if tables:
+                return [h for h in max(tables, key=len) if h]
+    return []
+
+
+def map_columns(headers: List[str], record_type: str) -> Dict[str, int]:
+    """Output schema field -> column index, by header keywords"""
+    columns = {}
+    lowered = [h.lower() for h in headers]
+    for field, keywords in FIELD_KEYWORDS.get(record_type, []):
+        for keyword in keywords:
+            index = next((i for i, h in enumerate(lowered) if keyword in h and i not in columns.values()), None)
+            if index is not None:
+                columns[field] = index
+                break
+    return columns
+
+
+# ============================================================================
+# CODE GENERATION
+# ============================================================================
+
+SCRAPER_TEMPLATE = '''"""
+Compiled from the Scout exploration trace (services/scout/trace_compiler.py)
+Replays the search exploration performed and reads the results table by its headers.
+"""
+
+import re
+import time
+from datetime import datetime
+
+SEARCH_URL = {start_url!r}
+STEPS = {steps!r}
+RESULT_HEADERS = {headers!r}
+FIELD_COLUMNS = {columns!r}
+NUMERIC_FIELDS = {numeric!r}
+NO_RESULTS_TEXT = {no_results!r}
+# Generic fallback, only tried once the page has settled - help text ("If no records
+# are found...") is on the page before the results are
+NO_RESULTS_PATTERN = re.compile(r"(?<!if )\\bno (matching )?(records|results|cases|matches)\\b|\\b0 (records|results) found", re.I)
+# An error page is an error, not an empty result
+ERROR_TITLE_PATTERN = re.compile(r"not found|\\b(400|403|404|500|502|503)\\b|\\berror\\b|unavailable|access denied", re.I)
+ERROR_BODY_PATTERN = re.compile(r"server error in|runtime error|stack trace|service unavailable|an error (has )?occurred", re.I)
+
+STEP_TIMEOUT_MS = 15000
+RESULTS_TIMEOUT_S = 20
+SETTLE_S = 2  # No-results text must hold this long, with the network idle, before the generic pattern counts
+
+PAGE_STATE_JS = r"""
+() => {{
+    const nav = performance.getEntriesByType('navigation')[0];
+    const heading = document.querySelector('h1, h2');
+    return {{
+        status: nav && nav.responseStatus ? nav.responseStatus : null,
+        title: [document.title, heading ? heading.innerText : ''].join(' | '),
+        text: document.body ? document.body.innerText : ''
+    }};
+}}
+"""
+
+FIND_TABLE_JS = r"""
+(expected) => {{
+    const norm = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const want = expected.map(norm);
+    let best = null, bestScore = -1;
+    for (const table of document.querySelectorAll('table')) {{
+        if (table.querySelector('table, input[type=text], select')) continue;
+        const rows = Array.from(table.rows).filter(r => r.cells.length > 1);
+        if (!rows.length) continue;
+        const headRow = table.tHead && table.tHead.rows.length ? table.tHead.rows[0]
+            : (rows[0].querySelector('th') ? rows[0] : null);
+        const headers = headRow ? Array.from(headRow.cells).map(c => c.innerText.replace(/\\s+/g, ' ').trim()) : [];
+        const body = rows.filter(r => r !== headRow);
+        const score = want.length ? headers.filter(h => want.includes(norm(h))).length : body.length;
+        if (want.length && score < Math.max(1, Math.ceil(want.length / 2))) continue;
+        if (score > bestScore) {{
+            bestScore = score;
+            best = {{
+                headers: headers,
+                rows: body.map(r => Array.from(r.cells).map(c => c.innerText.replace(/\\s+/g, ' ').trim())),
+                links: body.map(r => {{ const a = r.querySelector('a[href]'); return a ? a.href : null; }})
+            }};
+        }}
+    }}
+    return best;
+}}
+"""
+
+
+def _fill_value(template, first_name, last_name):
+    return template.replace('{{first_name}}', first_name).replace('{{last_name}}', last_name)
+
+
+def _run_steps(page, first_name, last_name):
+    page.goto(SEARCH_URL, wait_until='domcontentloaded', timeout=30000)
+    for step in STEPS:
+        if step['action'] == 'fill':
+            page.fill(step['selector'], _fill_value(step['value'], first_name, last_name), timeout=STEP_TIMEOUT_MS)
+        elif step['action'] == 'press':
+            page.press(step['selector'], step['key'], timeout=STEP_TIMEOUT_MS)
+        else:
+            page.click(step['selector'], timeout=STEP_TIMEOUT_MS)
+        if step['action'] != 'fill':
+            try:
+                page.wait_for_load_state('networkidle', timeout=10000)
+            except Exception:
+                pass  # Long-polling pages never go idle - the results wait below decides
+
+
+def _network_idle(page):
+    try:
+        page.wait_for_load_state('networkidle', timeout=500)
+        return True
+    except Exception:
+        return False
+
+
+def _wait_for_results(page):
+    """
+    Results table, or None for "no results"; raises on an error page or if the page shows neither.
+    The recorded no-results text counts as soon as it appears, the generic pattern only
+    after the page has settled.
+    """
+    deadline = time.time() + RESULTS_TIMEOUT_S
+    settled_text, settled_since = None, None
+    while True:
+        table = page.evaluate(FIND_TABLE_JS, RESULT_HEADERS)
+        if table and table['rows']:
+            return table
+
+        state = page.evaluate(PAGE_STATE_JS)
+        text = state['text']
+        if NO_RESULTS_TEXT and NO_RESULTS_TEXT.lower() in text.lower():
+            return None
+        if (state['status'] or 0) >= 400 or ERROR_TITLE_PATTERN.search(state['title']) or \
+                ERROR_BODY_PATTERN.search(text):
+            raise RuntimeError(f"Error page instead of results on {{page.url}} "
+                               f"(HTTP {{state['status']}}, {{state['title'].strip(' |')[:100]!r}})")
+
+        if NO_RESULTS_PATTERN.search(text):
+            if text != settled_text:
+                settled_text, settled_since = text, time.time()
+            elif time.time() - settled_since >= SETTLE_S and _network_idle(page):
+                return None
+        else:
+            settled_text = settled_since = None
+
+        if time.time() > deadline:
+            raise RuntimeError(f"Neither the results table nor a no-results message appeared on {{page.url}}")
+        time.sleep(0.5)
+
+
+def _parse_date(value):
+    for fmt in ('%m/%d/%Y', '%Y-%m-%d', '%m-%d-%Y', '%m/%d/%y', '%b %d, %Y', '%B %d, %Y', '%d-%b-%Y'):
+        try:
+            return datetime.strptime(value.strip(), fmt).strftime('%Y-%m-%d')
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+
+def _parse_number(value):
+    cleaned = re.sub(r'[^0-9.\\-]', '', value or '')
+    try:
+        return float(cleaned) if cleaned else None
+    except ValueError:
+        return None
+
+
+def _records(table):
+    records = []
+    for cells, link in zip(table['rows'], table['links']):
+        raw = {{(table['headers'][i] if i < len(table['headers']) and table['headers'][i] else f"col_{{i}}"): cell
+               for i, cell in enumerate(cells)}}
+        if link:
+            raw['detail_url'] = link
+        record = {{field: (cells[i] if i < len(cells) else None) for field, i in FIELD_COLUMNS.items()}}
+        for field in NUMERIC_FIELDS:
+            if field in record:
+                record[field] = _parse_number(record[field])
+        if 'filing_date' in record:
+            record['filing_date'] = _parse_date(record['filing_date'] or '') or record['filing_date']
+        record['raw_data'] = raw
+        records.append(record)
+    return records
+'''
+
+SEARCH_TEMPLATE = '''
+
+def search(page, first_name, last_name):
+    """
+    Search for records by name on a caller-supplied page.
+    Returns: List of dicts (schema fields found in the results table + raw_data)
+    """
+    _run_steps(page, first_name, last_name)
+    table = _wait_for_results(page)
+    return _records(table) if table else []
+'''
+
+PROBATE_SEARCH_TEMPLATE = '''
+
+def _months_between(start, end):
+    start, end = datetime.strptime(start, '%Y-%m-%d'), datetime.strptime(end, '%Y-%m-%d')
+    return (end.year - start.year) * 12 + (end.month - start.month)
+
+
+def search(page, first_name, last_name, death_date=None):
+    """
+    Search for probate cases.
+
+    Returns:
+        The case filed closest to death_date, or [{'has_probate': False, 'decedent_name': ...}]
+    """
+    if isinstance(death_date, datetime):
+        death_date = death_date.strftime('%Y-%m-%d')
+
+    _run_steps(page, first_name, last_name)
+    table = _wait_for_results(page)
+    cases = _records(table) if table else []
+    if not cases:
+        return [{'has_probate': False, 'decedent_name': f'{first_name} {last_name}'}]
+
+    for case in cases:
+        status = (case.get('case_status') or '').upper()
+        case['case_status'] = status or None
+        case['is_closed'] = 'CLOSED' in status
+        case['has_probate'] = True
+        case['decedent_name'] = case.get('decedent_name') or f'{first_name} {last_name}'
+        case['death_date'] = death_date
+        filing = case.get('filing_date')
+        valid = bool(death_date and filing and re.match(r'\\d{4}-\\d{2}-\\d{2}$', filing))
+        case['months_after_death'] = _months_between(death_date, filing) if valid else None
+
+    if death_date:
+        # Closest filing to the death date; undated cases last
+        cases.sort(key=lambda c: abs(c['months_after_death']) if c['months_after_death'] is not None else 10 ** 6)
+    return cases[:1]
+'''
+
+MAIN_TEMPLATE = '''
+
+if __name__ == "__main__":
+    # Standalone test: this is the ONLY place a browser is launched
+    import sys
+    from playwright.sync_api import sync_playwright
+    if len(sys.argv) >= 3:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_page()
+            results = search(page, *sys.argv[1:])
+            browser.close()
+        print(f"Found {len(results)} results")
+        for r in results:
+            print(r)
+'''
+
+
+def compile_trace(site_analysis: Dict, record_type: str, test_names: List[Dict], website_url: str) -> Optional[Dict]:
+    """
+    Args:
+        site_analysis: interactive_exploration() result (with exploration_log)
+        record_type: 'property', 'tax', 'probate' or 'judgment'
+        test_names: [{'first_name', 'last_name', 'full_name'}, ...] searched during exploration
+        website_url: Fallback start URL
+
+    Returns:
+        {'code', 'steps', 'headers', 'columns', 'name'} or None if the trace has no complete search
+    """
+    log = (site_analysis or {}).get('exploration_log') or []
+    trace = search_steps(executed_actions(log), test_names)
+    if trace is None:
+        return None
+
+    headers = result_headers(log)
+    columns = map_columns(headers, record_type)
+    results_handling = site_analysis.get('results_handling') or {}
+    no_results = results_handling.get('no_results_indicator')
+    if not isinstance(no_results, str) or len(no_results) > 100:
+        no_results = None  # A description rather than the literal text
+
+    code = SCRAPER_TEMPLATE.format(
+        start_url=trace['start_url'] or website_url,
+        steps=trace['steps'],
+        headers=headers,
+        columns=columns,
+        numeric=sorted(NUMERIC_FIELDS & set(columns)),
+        no_results=no_results
+    )
+    code += PROBATE_SEARCH_TEMPLATE if record_type == 'probate' else SEARCH_TEMPLATE
+    code += MAIN_TEMPLATE
+    return {'code': code, 'steps': trace['steps'], 'headers': headers, 'columns': columns, 'name': trace['name'],
+            'compiled_at': datetime.utcnow().isoformat(timespec='seconds')}
+
+
+def trace_replayed(compiled: Dict, results: List[Dict]) -> bool:
+    """
+    The test run must reproduce exploration: the name whose search reached the
+    results table returns records again (an empty list passes the test runner
+    but would mean the compiled steps never found the table).
+    """
+    name = compiled.get('name') or {}
+    for result in results:
+        if (result['name'].get('first_name'), result['name'].get('last_name')) == \
+                (name.get('first_name'), name.get('last_name')):
+            records = result.get('records') or []
+            return bool(records) and records[0].get('has_probate', True) is not False
+    return False
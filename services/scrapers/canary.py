@@ -0,0 +1,369 @@
+"""
+Scraper canary - run every generated scraper on a known-good name
+
+Invokes each scraper registered under scrapers/<state>/<county>/ through the
+production ScraperWorker with a fixed name that is known to return records,
+and stores success, result count and latency in canary_runs. Each run is
+compared with that scraper's recent successful runs and flagged as a
+regression when it:
+    - fails (exception or timeout)                        -> 'failure'
+    - returns nothing where the baseline returned records -> 'empty'
+    - is much slower than its baseline median             -> 'latency'
+
+A county site that got slow throttles the whole search pipeline, so latency
+regressions are reported alongside failures, before the production queue
+backs up.
+
+Known-good names per scraper live in scrapers/canary_names.json, e.g.
+    {"tx/harris/probate": {"first_name": "JOHN", "last_name": "SMITH"}}
+Scrapers without an entry use DEFAULT_CANARY_NAME.
+
+Probate scrapers always return one record - [{'has_probate': False, ...}] when
+nothing was found - so a has_probate False record counts as zero results.
+
+Usage:
+    python services/scrapers/canary.py                      # one pass, exit 1 on regressions (cron)
+    python services/scrapers/canary.py --state TX --record-type probate
+    python services/scrapers/canary.py --every 30           # run every 30 minutes
+    python services/scrapers/canary.py --history 20         # latency series per scraper, no runs
+"""
+
+import sys
+import json
+import time
+import queue
+import argparse
+import statistics
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+# Add project root to path (go up 2 levels: scrapers -> services -> root)
+project_root = Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(project_root))
+
+from playwright.sync_api import sync_playwright
+
+from database.models import SessionLocal, County, CanaryRun
+from services.scrapers.registry import ScraperRegistry, ScraperWorker, RECORD_TYPES, SCRAPERS_DIR, county_slug
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CANARY_NAMES_PATH = SCRAPERS_DIR / "canary_names.json"
+DEFAULT_CANARY_NAME = {'first_name': 'JOHN', 'last_name': 'SMITH'}
+
+DEFAULT_CONCURRENCY = 2        # Browsers at once (each worker thread owns its own Playwright)
+
+BASELINE_RUNS = 20             # Recent successful runs the baseline is taken from
+MIN_BASELINE_RUNS = 5          # Fewer than this and only failures are flagged
+LATENCY_FACTOR = 2.0           # Slower than baseline median x this...
+LATENCY_MIN_INCREASE_MS = 3000 # ...and by at least this much (ignores noise on fast scrapers)
+
+
+# ============================================================================
+# TARGETS
+# ============================================================================
+
+def load_canary_names(path: Path = CANARY_NAMES_PATH) -> Dict[str, Dict]:
+    """Known-good names keyed "state/county_slug/record_type" (missing file = defaults only)"""
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def select_targets(db, registry: ScraperRegistry, state=None, record_types=RECORD_TYPES,
+                   names: Dict[str, Dict] = None) -> List[Dict]:
+    """
+    Every scraper on disk, matched to its County row where one exists.
+
+    Returns:
+        [{'key', 'state', 'county_slug', 'record_type', 'county', 'county_id',
+          'first_name', 'last_name', 'death_date'}, ...]
+    """
+    names = names or {}
+    counties = {}
+    for county in db.query(County).all():
+        counties[(county.state.lower(), county_slug(county.name))] = county
+
+    targets = []
+    for scraper_state, slug, record_type in registry.discover():
+        if state and scraper_state != state.lower():
+            continue
+        if record_type not in record_types:
+            continue
+
+        county = counties.get((scraper_state, slug))
+        if county is None:
+            # Scraper without a County row - the worker only needs a name and state
+            county = SimpleNamespace(name=slug.replace('_', ' ').title(), state=scraper_state.upper())
+
+        key = f"{scraper_state}/{slug}/{record_type}"
+        name = {**DEFAULT_CANARY_NAME, **names.get(key, {})}
+        targets.append({
+            'key': key,
+            'state': scraper_state.upper(),
+            'county_slug': slug,
+            'record_type': record_type,
+            'county': county,
+            'county_id': getattr(county, 'id', None),
+            'first_name': name['first_name'],
+            'last_name': name['last_name'],
+            'death_date': name.get('death_date')
+        })
+    return targets
+
+
+# ============================================================================
+# RUNNING
+# ============================================================================
+
+def count_results(records) -> int:
+    """Records that are real matches (a probate scraper's has_probate False placeholder isn't one)"""
+    return sum(1 for r in records or [] if not (isinstance(r, dict) and r.get('has_probate') is False))
+
+
+def _canary_worker(jobs: 'queue.Queue', results: List[Dict], lock: threading.Lock,
+                   registry: ScraperRegistry, proxy_pool=None, headless: bool = True):
+    """Worker thread: its own Playwright + ScraperWorker, drains the job queue"""
+    with sync_playwright() as p:
+        # max_counties=1: every canary is a different county, keeping old contexts around only costs memory
+        worker = ScraperWorker(p, registry=registry, proxy_pool=proxy_pool, launch_kwargs={'headless': headless},
+                               max_counties=1, label="CANARY")
+        try:
+            while True:
+                try:
+                    target = jobs.get_nowait()
+                except queue.Empty:
+                    break
+
+                outcome = {'success': False, 'result_count': None, 'error': None}
+                start = time.perf_counter()
+                try:
+                    # Open the county's context before timing: production workers search on a warm
+                    # runtime, so setup cost would only add noise to the latency series
+                    worker._runtime_for(target['county'], target['record_type'])
+                    start = time.perf_counter()
+                    records = worker.search(target['county'], target['record_type'],
+                                            target['first_name'], target['last_name'], target['death_date'])
+                    outcome['success'] = True
+                    outcome['result_count'] = count_results(records)
+                except Exception as e:
+                    outcome['error'] = f"{type(e).__name__}: {e}"[:1000]
+                outcome['latency_ms'] = int((time.perf_counter() - start) * 1000)
+
+                with lock:
+                    results.append({**target, **outcome})
+        finally:
+            worker.close()
+
+
+def run_canaries(targets: List[Dict], concurrency: int = DEFAULT_CONCURRENCY, registry: ScraperRegistry = None,
+                 proxy_pool=None, headless: bool = True) -> List[Dict]:
+    """Run every target once; latency includes the scraper's own page loads, as in production"""
+    jobs = queue.Queue()
+    for target in targets:
+        jobs.put(target)
+
+    registry = registry or ScraperRegistry()
+    results, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(target=_canary_worker, args=(jobs, results, lock, registry, proxy_pool, headless),
+                         daemon=True)
+        for _ in range(max(1, min(concurrency, len(targets))))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    order = {t['key']: i for i, t in enumerate(targets)}
+    return sorted(results, key=lambda r: order[r['key']])
+
+
+# ============================================================================
+# REGRESSIONS
+# ============================================================================
+
+def _scraper_runs(db, state: str, slug: str, record_type: str):
+    return db.query(CanaryRun).filter(
+        CanaryRun.state == state,
+        CanaryRun.county_slug == slug,
+        CanaryRun.record_type == record_type
+    )
+
+
+def load_baseline(db, state: str, slug: str, record_type: str, runs: int = BASELINE_RUNS) -> Optional[Dict]:
+    """Median latency/result count of the last `runs` successful runs, or None if too few"""
+    history = _scraper_runs(db, state, slug, record_type).filter(
+        CanaryRun.success == True
+    ).order_by(CanaryRun.run_at.desc()).limit(runs).all()
+
+    if len(history) < MIN_BASELINE_RUNS:
+        return None
+    return {
+        'runs': len(history),
+        'latency_ms': statistics.median(r.latency_ms for r in history),
+        'result_count': statistics.median(r.result_count or 0 for r in history)
+    }
+
+
+def consecutive_failures(db, state: str, slug: str, record_type: str) -> int:
+    """Failed runs in a row before this one"""
+    count = 0
+    for run in _scraper_runs(db, state, slug, record_type).order_by(CanaryRun.run_at.desc()).limit(50):
+        if run.success:
+            break
+        count += 1
+    return count
+
+
+def classify(result: Dict, baseline: Optional[Dict]) -> Optional[str]:
+    """
+    Returns:
+        None, 'failure', 'empty' or 'latency'
+    """
+    if not result['success']:
+        return 'failure'
+    if baseline is None:
+        return None
+    if result['result_count'] == 0 and baseline['result_count'] > 0:
+        return 'empty'
+    if (result['latency_ms'] > baseline['latency_ms'] * LATENCY_FACTOR and
+            result['latency_ms'] - baseline['latency_ms'] >= LATENCY_MIN_INCREASE_MS):
+        return 'latency'
+    return None
+
+
+def record_results(db, results: List[Dict]):
+    """Classify each run against the stored series (before adding it), then store it"""
+    now = datetime.utcnow()
+    for r in results:
+        baseline = load_baseline(db, r['state'], r['county_slug'], r['record_type'])
+        r['baseline'] = baseline
+        r['regression'] = classify(r, baseline)
+        r['failures_in_row'] = (consecutive_failures(db, r['state'], r['county_slug'], r['record_type']) + 1
+                                if not r['success'] else 0)
+
+        db.add(CanaryRun(
+            county_id=r['county_id'], state=r['state'], county_slug=r['county_slug'],
+            record_type=r['record_type'], search_name=f"{r['first_name']} {r['last_name']}",
+            success=r['success'], result_count=r['result_count'], latency_ms=r['latency_ms'],
+            error=r['error'], regression=r['regression'],
+            baseline_latency_ms=int(baseline['latency_ms']) if baseline else None,
+            run_at=now
+        ))
+    db.commit()
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def print_report(results: List[Dict], elapsed: float):
+    print(f"\n{'='*80}")
+    print(f"🐤 CANARY: {len(results)} scrapers in {elapsed:.0f}s")
+    print(f"{'='*80}")
+
+    for r in results:
+        icon = {'failure': '❌', 'empty': '🕳️', 'latency': '🐢'}.get(r['regression'], '✅')
+        baseline = r.get('baseline')
+        vs = f" (baseline {baseline['latency_ms']:.0f}ms)" if baseline else " (no baseline yet)"
+        line = f"   {icon} {r['key']:<35} {r['latency_ms']:>7}ms{vs}"
+        if r['success']:
+            line += f" - {r['result_count']} results"
+        else:
+            line += f" - {r['error']}"
+            if r['failures_in_row'] > 1:
+                line += f" [{r['failures_in_row']} failures in a row]"
+        print(line)
+
+    regressions = [r for r in results if r['regression']]
+    ok_latencies = [r['latency_ms'] for r in results if r['success']]
+    if ok_latencies:
+        print(f"\n   Latency: median {statistics.median(ok_latencies):.0f}ms, max {max(ok_latencies)}ms")
+    print(f"   Regressions: {len(regressions)} "
+          f"({sum(r['regression'] == 'failure' for r in regressions)} failing, "
+          f"{sum(r['regression'] == 'latency' for r in regressions)} slow, "
+          f"{sum(r['regression'] == 'empty' for r in regressions)} empty)")
+    print(f"{'='*80}")
+
+
+def print_history(db, targets: List[Dict], limit: int):
+    """Latency series per scraper, oldest first"""
+    for target in targets:
+        runs = _scraper_runs(db, target['state'], target['county_slug'], target['record_type']).order_by(
+            CanaryRun.run_at.desc()).limit(limit).all()
+        print(f"\n📈 {target['key']} - last {len(runs)} runs")
+        for run in reversed(runs):
+            status = f"{run.result_count} results" if run.success else f"FAILED {run.error or ''}"[:60]
+            flag = f"  <- {run.regression}" if run.regression else ""
+            print(f"   {run.run_at:%Y-%m-%d %H:%M}  {run.latency_ms or 0:>7}ms  {status}{flag}")
+
+
+def canary_pass(args, proxy_pool=None) -> List[Dict]:
+    db = SessionLocal()
+    try:
+        registry = ScraperRegistry()
+        targets = select_targets(db, registry, args.state, tuple(args.record_type or RECORD_TYPES),
+                                 load_canary_names())
+        print(f"\n🐤 Running {len(targets)} canaries ({args.concurrency} at a time)...")
+
+        start = time.time()
+        results = run_canaries(targets, args.concurrency, registry, proxy_pool, headless=not args.headful)
+        record_results(db, results)
+        print_report(results, time.time() - start)
+        return results
+    finally:
+        db.close()
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run every generated scraper on a known-good name')
+    parser.add_argument('--state', type=str, help='Only scrapers in this state (e.g. TX)')
+    parser.add_argument('--record-type', type=str, choices=RECORD_TYPES, action='append',
+                        help='Record type(s) to run (default: all)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Browsers at once')
+    parser.add_argument('--proxies', action='store_true', help='Route through ProxyPool.from_env(), as production does')
+    parser.add_argument('--headful', action='store_true', help='Show the browser')
+    parser.add_argument('--every', type=float, help='Repeat every N minutes instead of exiting')
+    parser.add_argument('--history', type=int, metavar='N', help='Print the last N runs per scraper and exit')
+    args = parser.parse_args()
+
+    if args.history:
+        db = SessionLocal()
+        try:
+            targets = select_targets(db, ScraperRegistry(), args.state, tuple(args.record_type or RECORD_TYPES))
+            print_history(db, targets, args.history)
+        finally:
+            db.close()
+        sys.exit(0)
+
+    proxy_pool = None
+    if args.proxies:
+        from services.proxy.pool import ProxyPool
+        proxy_pool = ProxyPool.from_env()
+
+    if not args.every:
+        results = canary_pass(args, proxy_pool)
+        sys.exit(1 if any(r['regression'] for r in results) else 0)  # Non-zero so cron/CI alerts
+
+    while True:
+        pass_start = time.time()
+        try:
+            canary_pass(args, proxy_pool)
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            print(f"❌ Canary pass failed: {e}")
+        wait = max(0, args.every * 60 - (time.time() - pass_start))
+        print(f"\n⏰ Next canary pass in {wait / 60:.1f} minutes")
+        time.sleep(wait)
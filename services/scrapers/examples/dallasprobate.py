@@ -9,6 +9,18 @@ import multiprocessing
 from multiprocessing import Manager, Queue, Lock
 from datetime import datetime
 from queue import Empty
+import sys
+
+# Add project root to Python path (examples -> scrapers -> services -> root)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from services.address.normalizer import normalize_address
+from services.scrapers.runtime import ManagedBrowser, RecyclePolicy
+from services.captcha.broker import broker_process, BrokerClient
+from services.captcha.detection import detect_captcha, inject_token
+from services.captcha.solver import CaptchaSolver
+from services.captcha.telemetry import CaptchaTelemetry, SessionReusePolicy, load_events, summarize_events, print_summary
 
 # ==============================================================================
 # 🛠️ CONFIGURATION
@@ -29,10 +41,34 @@ NUM_PARALLEL_INSTANCES = 10  # Number of parallel browser instances
 HEADLESS_MODE = True  # Set to False to see browsers (useful for debugging)
 SLOW_MO = 0  # Milliseconds delay between actions
 
+# BROWSER RECYCLING (long runs grow Chromium memory until the host swaps)
+RECYCLE_POLICY = RecyclePolicy(
+    max_tasks_per_page=100,      # New tab every 100 owners
+    max_tasks_per_context=300,   # Fresh cookies/renderer every 300 owners
+    max_tasks_per_verified_context=900,  # ...but keep a session that passed a CAPTCHA longer
+    max_tasks_per_browser=1000,  # Relaunch Chromium every 1000 owners
+    max_js_heap_mb=256,          # ...or sooner if memory grows past these
+    max_browser_rss_mb=1500
+)
+WRITE_MEMORY_LOG = True  # Per-worker memory curve CSV in OUTPUT_FOLDER
+
 # API KEYS AND URLS
 CAPSOLVER_API_KEY = "CAP-351E10005140E7F03927FDE897DF2F84C88C3683C8ACE13EC31CF71AB63647B9"
+CAPSOLVER_BASE_URL = os.getenv('CAPSOLVER_BASE_URL', "https://api.capsolver.com")  # Point at mock_capsolver for load tests
 URL = "https://courtsportal.dallascounty.org/DALLASPROD/Home/Dashboard/29"
 
+# CAPTCHA BROKER (one process polls CapSolver for every worker)
+USE_CAPTCHA_BROKER = True
+USE_TOKEN_POOL = True  # Broker pre-solves tokens so searches don't wait 10-60s on CapSolver
+
+# CAPTCHA SESSION REUSE (a context that passed a CAPTCHA is tried without a new solve first)
+CAPTCHA_SESSION_POLICY = SessionReusePolicy(
+    enabled=True,              # False = solve on every detection (old behaviour)
+    min_reuse_success=0.8,     # Stop skipping solves if the portal rejects more than 20%
+    min_reuse_attempts=10
+)
+WRITE_CAPTCHA_LOG = True  # Per-worker captcha_worker_<id>.jsonl in OUTPUT_FOLDER (appends across runs)
+
 # SELECTORS
 SEARCH_INPUT_SELECTOR = '#caseCriteria_SearchCriteria'
 SUBMIT_BUTTON_SELECTOR = '#btnSSSubmit'
@@ -43,36 +79,15 @@ SMART_SEARCH_TAB_SELECTOR = '#tcControllerLink_0'
 # ⚙️ HELPER FUNCTIONS (CAPTCHA & LOGIC)
 # ==============================================================================
 
-def detect_captcha_type(page):
-    """Detect which type of CAPTCHA is present on the page"""
-    if page.locator('.g-recaptcha').count() > 0:
-        site_key = page.locator('.g-recaptcha').get_attribute('data-sitekey')
-        return "ReCaptchaV2TaskProxyLess", site_key
-    
-    if page.locator('[data-action]').count() > 0 or 'grecaptcha.execute' in page.content():
-        match = re.search(r'grecaptcha\.execute\(["\']([^"\']+)["\']', page.content())
-        site_key = match.group(1) if match else None
-        return "ReCaptchaV3TaskProxyLess", site_key
-    
-    if page.locator('.h-captcha').count() > 0:
-        site_key = page.locator('.h-captcha').get_attribute('data-sitekey')
-        return "HCaptchaTaskProxyLess", site_key
-    
-    return None, None
-
-def solve_captcha(api_key, captcha_type, site_key, url):
+def solve_captcha(api_key, captcha_type, site_key, url, page_action=None):
     """Solve CAPTCHA using CapSolver API"""
     create_payload = {
         "clientKey": api_key,
-        "task": {
-            "type": captcha_type,
-            "websiteURL": url,
-            "websiteKey": site_key
-        }
+        "task": CaptchaSolver.build_task(captcha_type, site_key, url, page_action)
     }
     
     headers = {"Content-Type": "application/json"}
-    response = requests.post("https://api.capsolver.com/createTask", json=create_payload, headers=headers)
+    response = requests.post(f"{CAPSOLVER_BASE_URL}/createTask", json=create_payload, headers=headers)
     result = response.json()
     
     if result.get("errorId") != 0:
@@ -84,14 +99,26 @@ def solve_captcha(api_key, captcha_type, site_key, url):
     
     for attempt in range(60):
         time.sleep(3)
-        result = requests.post("https://api.capsolver.com/getTaskResult", json=get_payload, headers=headers)
+        result = requests.post(f"{CAPSOLVER_BASE_URL}/getTaskResult", json=get_payload, headers=headers)
         data = result.json()
         
         if data.get("status") == "ready":
-            return data["solution"]["gRecaptchaResponse"]
+            solution = data["solution"]
+            return solution.get("gRecaptchaResponse") or solution.get("token")
     
     raise Exception("CAPTCHA solving timeout")
 
+def get_captcha_token(captcha, captcha_client=None):
+    """Token for a detected CAPTCHA - through the broker when the worker has one"""
+    if not captcha.solvable:
+        raise Exception(f"{captcha.vendor} CAPTCHA has no site key - can't be solved with a token")
+    if captcha_client:
+        token = captcha_client.solve(captcha.task_type, captcha.site_key, URL, page_action=captcha.action)
+        if not token:
+            raise Exception("CAPTCHA broker returned no token")
+        return token
+    return solve_captcha(CAPSOLVER_API_KEY, captcha.task_type, captcha.site_key, URL, captcha.action)
+
 def parse_owner_name(raw_owner_string):
     """Parse owner name according to specific court search requirements"""
     cleanup_phrases = ['EST OF', 'ET AL', 'ESTATE OF', 'ESTATE', 'EST']
@@ -229,6 +256,57 @@ def go_back_to_search(page):
     except Exception as e:
         return False
 
+def setup_search_page(page, worker_id):
+    """
+    Open the portal and set the probate filters (Location + Case Type).
+    Runs once per fresh page, including after ManagedBrowser recycles it.
+    """
+    print(f"[WORKER {worker_id}] ⚙️ Initial setup...")
+    page.goto(URL)
+    page.wait_for_load_state('networkidle')
+
+    page.locator(ADVANCED_OPTIONS_BUTTON).click()
+    time.sleep(1)
+
+    # Location dropdown
+    location_input_selector = '#AdvOptionsMask > div:nth-child(1) > div > div > div:nth-child(2) > div > span > span > input'
+    location_input = page.locator(location_input_selector)
+    location_input.click()
+    location_input.clear()
+    location_input.type("County Courts - Probate", delay=50)
+    time.sleep(0.5)
+
+    try:
+        filtered_option = page.locator('.k-list-container.k-popup .k-item:has-text("County Courts - Probate")').first
+        if filtered_option.is_visible():
+            filtered_option.click()
+        else:
+            location_input.press('Enter')
+    except:
+        location_input.press('Enter')
+
+    time.sleep(1)
+
+    # Case Type dropdown
+    case_type_input_selector = '#caseCriteria_SearchCases_Section > fieldset:nth-child(2) > span > span > input'
+    case_type_input = page.locator(case_type_input_selector)
+    case_type_input.click()
+    case_type_input.clear()
+    case_type_input.type("All Available Probate Case Types", delay=50)
+    time.sleep(0.5)
+
+    try:
+        filtered_option = page.locator('.k-list-container.k-popup .k-item:has-text("All Available Probate Case Types")').first
+        if filtered_option.is_visible():
+            filtered_option.click()
+        else:
+            case_type_input.press('Enter')
+    except:
+        case_type_input.press('Enter')
+
+    time.sleep(1)
+    print(f"[WORKER {worker_id}] ✓ Setup complete\n")
+
 def parse_property_data(content):
     """Parse property data from the input file."""
     properties = {}
@@ -391,9 +469,11 @@ def process_search_results(page, first_name, middle_name, last_name):
 
 def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock, 
                    txt_file_lock, csv_file_lock, txt_output_file, csv_output_file, 
-                   property_data_dict, headless, slow_mo, total_tasks):
+                   property_data_dict, headless, slow_mo, total_tasks,
+                   captcha_requests=None, captcha_responses=None):
     """
     Worker process that continuously pulls tasks from shared queue.
+    CAPTCHAs go through the broker process when captcha_requests is given.
     """
     
     local_processed = 0
@@ -402,61 +482,27 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
     
     print(f"\n[WORKER {worker_id}] Starting up...")
     
+    captcha_client = None
+    if captcha_requests is not None:
+        captcha_client = BrokerClient(captcha_requests, captcha_responses[worker_id], worker_id)
+    
+    telemetry = CaptchaTelemetry(
+        "Dallas", worker_id,
+        log_path=os.path.join(OUTPUT_FOLDER, f"captcha_worker_{worker_id}.jsonl") if WRITE_CAPTCHA_LOG else None,
+        policy=CAPTCHA_SESSION_POLICY
+    )
+    
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless, slow_mo=slow_mo)
-        page = browser.new_page()
-        
-        # INITIAL SETUP (only once per worker)
+        # Setup is re-applied automatically whenever the page/context/browser is recycled
         try:
-            print(f"[WORKER {worker_id}] ⚙️ Initial setup...")
-            page.goto(URL)
-            page.wait_for_load_state('networkidle')
-            
-            page.locator(ADVANCED_OPTIONS_BUTTON).click()
-            time.sleep(1)
-            
-            # Location dropdown
-            location_input_selector = '#AdvOptionsMask > div:nth-child(1) > div > div > div:nth-child(2) > div > span > span > input'
-            location_input = page.locator(location_input_selector)
-            location_input.click()
-            location_input.clear()
-            location_input.type("County Courts - Probate", delay=50)
-            time.sleep(0.5)
-            
-            try:
-                filtered_option = page.locator('.k-list-container.k-popup .k-item:has-text("County Courts - Probate")').first
-                if filtered_option.is_visible():
-                    filtered_option.click()
-                else:
-                    location_input.press('Enter')
-            except:
-                location_input.press('Enter')
-            
-            time.sleep(1)
-            
-            # Case Type dropdown
-            case_type_input_selector = '#caseCriteria_SearchCases_Section > fieldset:nth-child(2) > span > span > input'
-            case_type_input = page.locator(case_type_input_selector)
-            case_type_input.click()
-            case_type_input.clear()
-            case_type_input.type("All Available Probate Case Types", delay=50)
-            time.sleep(0.5)
-            
-            try:
-                filtered_option = page.locator('.k-list-container.k-popup .k-item:has-text("All Available Probate Case Types")').first
-                if filtered_option.is_visible():
-                    filtered_option.click()
-                else:
-                    case_type_input.press('Enter')
-            except:
-                case_type_input.press('Enter')
-            
-            time.sleep(1)
-            print(f"[WORKER {worker_id}] ✓ Setup complete\n")
-            
+            runtime = ManagedBrowser(
+                p, RECYCLE_POLICY,
+                launch_kwargs={'headless': headless, 'slow_mo': slow_mo},
+                setup=lambda page: setup_search_page(page, worker_id),
+                label=f"WORKER {worker_id}"
+            )
         except Exception as e:
             print(f"[WORKER {worker_id}] ✗ Setup failed: {str(e)}")
-            browser.close()
             return
         
         # Process tasks from queue
@@ -469,6 +515,7 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
                     break
                 
                 original_row, raw_owner, parsed_owners = owner_task
+                page = runtime.page  # May be a fresh page after recycling
                 
                 with stats_lock:
                     stats_dict['in_progress'] += 1
@@ -483,119 +530,145 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
                 owners_failed_filter = False
                 prop_data = property_data_dict.get(raw_owner, {})
                 
-                for owner_idx, (first, middle, last, search_term) in enumerate(parsed_owners):
-                    owner_label = f"{original_row}" if len(parsed_owners) == 1 else f"{original_row}.{owner_idx+1}"
-                    
-                    print(f"[WORKER {worker_id}] [{owner_label}] {search_term}")
-                    
-                    log_entry = {
-                        'row': owner_label,
-                        'raw_owner': raw_owner,
-                        'first_name': first,
-                        'middle_name': middle,
-                        'last_name': last,
-                        'search_term': search_term,
-                        'account_number': prop_data.get('account_number', 'N/A'),
-                        'address': prop_data.get('address', 'N/A'),
-                        'market_value': prop_data.get('market_value', 'N/A'),
-                        'total_tax_owed': prop_data.get('total_tax_owed', 'N/A'),
-                        'tax_to_value_ratio': prop_data.get('tax_to_value_ratio', 'N/A'),
-                        'prior_year_due': prop_data.get('prior_year_due', 'N/A'),
-                        'current_levy': prop_data.get('current_levy', 'N/A'),
-                        'unpaid_years': prop_data.get('unpaid_years', 'N/A')
-                    }
-                    
-                    try:
-                        # Clear and fill search
-                        search_input = page.locator(SEARCH_INPUT_SELECTOR)
-                        search_input.clear()
-                        search_input.fill(search_term)
-                        
-                        # Solve CAPTCHA
-                        print(f"[WORKER {worker_id}]   Solving CAPTCHA...")
-                        captcha_type, site_key = detect_captcha_type(page)
-                        
-                        if captcha_type:
-                            token = solve_captcha(CAPSOLVER_API_KEY, captcha_type, site_key, URL)
-                            
-                            page.evaluate(f'''() => {{
-                                const textarea = document.getElementById('g-recaptcha-response');
-                                if (textarea) {{
-                                    textarea.innerHTML = "{token}";
-                                    textarea.value = "{token}";
-                                }}
-                            }}''')
+                try:
+                    for owner_idx, (first, middle, last, search_term) in enumerate(parsed_owners):
+                        owner_label = f"{original_row}" if len(parsed_owners) == 1 else f"{original_row}.{owner_idx+1}"
                         
-                        # Submit
-                        page.locator(SUBMIT_BUTTON_SELECTOR).first.click()
+                        print(f"[WORKER {worker_id}] [{owner_label}] {search_term}")
                         
-                        # Wait for results
-                        success, row_count = wait_for_results(page)
+                        log_entry = {
+                            'row': owner_label,
+                            'raw_owner': raw_owner,
+                            'first_name': first,
+                            'middle_name': middle,
+                            'last_name': last,
+                            'search_term': search_term,
+                            'account_number': prop_data.get('account_number', 'N/A'),
+                            'address': prop_data.get('address', 'N/A'),
+                            'market_value': prop_data.get('market_value', 'N/A'),
+                            'total_tax_owed': prop_data.get('total_tax_owed', 'N/A'),
+                            'tax_to_value_ratio': prop_data.get('tax_to_value_ratio', 'N/A'),
+                            'prior_year_due': prop_data.get('prior_year_due', 'N/A'),
+                            'current_levy': prop_data.get('current_levy', 'N/A'),
+                            'unpaid_years': prop_data.get('unpaid_years', 'N/A')
+                        }
                         
-                        if not success:
-                            print(f"[WORKER {worker_id}]   ⚠️ Timeout")
-                            log_entry.update({
-                                'status': 'TIMEOUT',
-                                'count': 0,
-                                'disqualifying_probate_found': False,
-                                'overall_property_failed': owners_failed_filter
-                            })
-                            results_queue.put(log_entry)
-                            go_back_to_search(page)
-                            continue
-                        
-                        if row_count > 0:
-                            print(f"[WORKER {worker_id}]   ✓ Found {row_count} result(s)")
+                        try:
+                            # Clear and fill search
+                            search_input = page.locator(SEARCH_INPUT_SELECTOR)
+                            search_input.clear()
+                            search_input.fill(search_term)
                             
-                            owner_disqualified = process_search_results(page, first, middle, last)
+                            # Solve CAPTCHA - unless this context already passed one and reuse is paying off
+                            captcha = detect_captcha(page)
+                            context_id = runtime.context_id
+                            solved = reuse_rejected = False
+                            token_wait = 0.0
                             
-                            if owner_disqualified:
-                                owners_failed_filter = True
+                            if captcha and not captcha.solvable:
+                                print(f"[WORKER {worker_id}]   CAPTCHA without a site key (Cloudflare challenge?) - not solving")
+                            elif telemetry.should_solve(context_id, captcha):
+                                print(f"[WORKER {worker_id}]   Solving CAPTCHA...")
+                                solve_start = time.time()
+                                inject_token(page, captcha, get_captcha_token(captcha, captcha_client))
+                                token_wait += time.time() - solve_start
+                                solved = True
+                            elif captcha:
+                                print(f"[WORKER {worker_id}]   Reusing verified session (no solve)")
                             
-                            log_entry.update({
-                                'status': 'DISQUALIFIED' if owner_disqualified else 'FOUND_CLEAN',
-                                'count': row_count,
-                                'disqualifying_probate_found': owner_disqualified,
-                                'overall_property_failed': owners_failed_filter
-                            })
+                            # Submit
+                            page.locator(SUBMIT_BUTTON_SELECTOR).first.click()
+                            
+                            # Wait for results
+                            success, row_count = wait_for_results(page)
+                            
+                            if not success and captcha and captcha.solvable and not solved:
+                                # Portal wanted a fresh CAPTCHA after all - solve and resubmit once
+                                print(f"[WORKER {worker_id}]   Session reuse rejected, solving CAPTCHA...")
+                                reuse_rejected = True
+                                go_back_to_search(page)
+                                search_input.clear()
+                                search_input.fill(search_term)
+                                captcha = detect_captcha(page) or captcha
+                                solve_start = time.time()
+                                inject_token(page, captcha, get_captcha_token(captcha, captcha_client))
+                                token_wait += time.time() - solve_start
+                                solved = True
+                                page.locator(SUBMIT_BUTTON_SELECTOR).first.click()
+                                success, row_count = wait_for_results(page)
+                            
+                            telemetry.record_search(context_id, captcha, solved, success, reuse_rejected, token_wait)
+                            if solved and success:
+                                runtime.mark_verified()
                             
-                            if owner_disqualified:
-                                print(f"[WORKER {worker_id}]   ⚠️ DISQUALIFIED")
+                            if not success:
+                                print(f"[WORKER {worker_id}]   ⚠️ Timeout")
+                                log_entry.update({
+                                    'status': 'TIMEOUT',
+                                    'count': 0,
+                                    'disqualifying_probate_found': False,
+                                    'overall_property_failed': owners_failed_filter
+                                })
+                                results_queue.put(log_entry)
+                                go_back_to_search(page)
+                                continue
+                            
+                            if row_count > 0:
+                                print(f"[WORKER {worker_id}]   ✓ Found {row_count} result(s)")
+                                
+                                owner_disqualified = process_search_results(page, first, middle, last)
+                                
+                                if owner_disqualified:
+                                    owners_failed_filter = True
+                                
+                                log_entry.update({
+                                    'status': 'DISQUALIFIED' if owner_disqualified else 'FOUND_CLEAN',
+                                    'count': row_count,
+                                    'disqualifying_probate_found': owner_disqualified,
+                                    'overall_property_failed': owners_failed_filter
+                                })
+                                
+                                if owner_disqualified:
+                                    print(f"[WORKER {worker_id}]   ⚠️ DISQUALIFIED")
+                                else:
+                                    print(f"[WORKER {worker_id}]   ✓ CLEAN")
                             else:
-                                print(f"[WORKER {worker_id}]   ✓ CLEAN")
-                        else:
-                            print(f"[WORKER {worker_id}]   ✓ No results")
+                                print(f"[WORKER {worker_id}]   ✓ No results")
+                                log_entry.update({
+                                    'status': 'NOT_FOUND',
+                                    'count': 0,
+                                    'disqualifying_probate_found': False,
+                                    'overall_property_failed': owners_failed_filter
+                                })
+                            
+                            go_back_to_search(page)
+                        
+                        except Exception as e:
+                            print(f"[WORKER {worker_id}]   ✗ Error: {str(e)[:100]}")
                             log_entry.update({
-                                'status': 'NOT_FOUND',
+                                'status': 'ERROR',
                                 'count': 0,
+                                'error': str(e),
                                 'disqualifying_probate_found': False,
                                 'overall_property_failed': owners_failed_filter
                             })
+                            try:
+                                go_back_to_search(page)
+                            except:
+                                pass
                         
-                        go_back_to_search(page)
-                    
-                    except Exception as e:
-                        print(f"[WORKER {worker_id}]   ✗ Error: {str(e)[:100]}")
-                        log_entry.update({
-                            'status': 'ERROR',
-                            'count': 0,
-                            'error': str(e),
-                            'disqualifying_probate_found': False,
-                            'overall_property_failed': owners_failed_filter
-                        })
-                        try:
-                            go_back_to_search(page)
-                        except:
-                            pass
-                    
-                    results_queue.put(log_entry)
-                
-                local_processed += 1
+                        results_queue.put(log_entry)
                 
-                # Update global stats
-                with stats_lock:
-                    stats_dict['completed'] += 1
-                    stats_dict['in_progress'] -= 1
+                finally:
+                    # Exactly once per row, whatever happened above
+                    local_processed += 1
+                    with stats_lock:
+                        stats_dict['completed'] += 1
+                        stats_dict['in_progress'] -= 1
+                    try:
+                        runtime.task_done()
+                    except Exception as e:
+                        print(f"[WORKER {worker_id}] ✗ Browser recycle failed: {e}")
                 
                 # Progress update
                 elapsed = time.time() - start_time
@@ -624,13 +697,19 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
                 print(f"[WORKER {worker_id}] ✗ Unexpected error: {str(e)}")
                 continue
         
-        browser.close()
+        memory = runtime.summary()
+        telemetry.print_report(f"[WORKER {worker_id}] ")
+        telemetry.close()
+        if WRITE_MEMORY_LOG:
+            runtime.write_memory_log(os.path.join(OUTPUT_FOLDER, f"memory_worker_{worker_id}.csv"))
+        runtime.close()
     
     elapsed_total = time.time() - start_time
     
     print(f"\n[WORKER {worker_id}] {'='*80}")
     print(f"[WORKER {worker_id}] SHUTDOWN COMPLETE")
     print(f"[WORKER {worker_id}] Processed: {local_processed}")
+    print(f"[WORKER {worker_id}] Recycles: {memory['recycles']} | Peak RSS: {memory['peak_rss_mb']}MB | Peak JS heap: {memory['peak_js_heap_mb']}MB")
     print(f"[WORKER {worker_id}] Time: {elapsed_total/60:.1f} minutes")
     print(f"[WORKER {worker_id}] {'='*80}\n")
 
@@ -638,80 +717,6 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
 # RESULT WRITING FUNCTION
 # ==============================================================================
 
-def parse_address(address_string):
-    """
-    Parse address into components: street, city, state, zip
-    Handles formats like: "123 MAIN ST, DALLAS, TX 75001"
-    """
-    if not address_string or address_string == 'N/A':
-        return '', '', '', ''
-    
-    # Clean up the address
-    address = address_string.strip()
-    
-    # Try to split by commas
-    parts = [p.strip() for p in address.split(',')]
-    
-    if len(parts) >= 3:
-        # Format: STREET, CITY, STATE ZIP
-        street = parts[0]
-        city = parts[1]
-        
-        # Parse state and zip from last part
-        state_zip = parts[2].split()
-        state = state_zip[0] if len(state_zip) > 0 else ''
-        zip_code = state_zip[1] if len(state_zip) > 1 else ''
-        
-        return street, city, state, zip_code
-    
-    elif len(parts) == 2:
-        # Format: STREET, CITY STATE ZIP
-        street = parts[0]
-        rest = parts[1].split()
-        
-        # Last item is likely zip, second to last is state
-        if len(rest) >= 3:
-            city = ' '.join(rest[:-2])
-            state = rest[-2]
-            zip_code = rest[-1]
-        elif len(rest) == 2:
-            city = ''
-            state = rest[0]
-            zip_code = rest[1]
-        else:
-            city = parts[1]
-            state = ''
-            zip_code = ''
-        
-        return street, city, state, zip_code
-    
-    else:
-        # Can't parse properly, return full address as street
-        return address, '', '', ''
-
-def extract_property_address(full_address_string):
-    """
-    Extract property address from strings like:
-    - "ALEXANDER OLLIE MAE EST OF 3147 MCDERMOTT AVE DALLAS, TX 75215-0000"
-    - "CANTU MARK 1909 LEROY RD DALLAS, TX 75217-0000"
-    
-    Returns everything starting from the first sequence of digits (house number).
-    """
-    if not full_address_string or full_address_string == 'N/A':
-        return 'N/A'
-    
-    # Find the first occurrence of a sequence of digits (house number)
-    # This regex finds the position of the first digit sequence
-    match = re.search(r'\d+', full_address_string)
-    
-    if match:
-        # Extract everything from the start of the house number onward
-        property_address = full_address_string[match.start():].strip()
-        return property_address
-    
-    # If no digits found, return the original string
-    return full_address_string
-
 def result_writer_process(results_queue, txt_output_file, csv_output_file, stats_dict, stats_lock, total_tasks):
     """
     Dedicated process for writing results to files.
@@ -773,11 +778,8 @@ def result_writer_process(results_queue, txt_output_file, csv_output_file, stats
                     txt_file.flush()
                 
                 # Write to CSV file - new format
-                # First extract the property address (everything from house number onward)
-                property_address = extract_property_address(entry['address'])
-                
-                # Then parse the property address into components
-                street, city, state, zip_code = parse_address(property_address)
+                # Tax roll addresses start with the owner name, so strip it off
+                address = normalize_address(entry['address'], owner_prefix=True)
                 
                 with open(csv_output_file, 'a', newline='', encoding='utf-8') as csvfile:
                     writer = csv.DictWriter(csvfile, fieldnames=csv_headers)
@@ -785,10 +787,10 @@ def result_writer_process(results_queue, txt_output_file, csv_output_file, stats
                         'First Name': entry['first_name'],
                         'Last Name': entry['last_name'],
                         'Middle Name': entry['middle_name'],
-                        'Property Address': street,
-                        'Property City': city,
-                        'Property State': state,
-                        'Property Zip': zip_code
+                        'Property Address': address.address_line if address else '',
+                        'Property City': address.city if address else '',
+                        'Property State': address.state if address else '',
+                        'Property Zip': address.zip_code if address else ''
                     })
                     csvfile.flush()
                 
@@ -915,6 +917,22 @@ def main():
     writer_process.start()
     print(f"Started Writer Process (PID: {writer_process.pid})")
     
+    # Start CAPTCHA broker process
+    captcha_requests = None
+    captcha_responses = None
+    broker = None
+    if USE_CAPTCHA_BROKER:
+        captcha_requests = manager.Queue()
+        captcha_responses = {i+1: manager.Queue() for i in range(NUM_PARALLEL_INSTANCES)}
+        broker = multiprocessing.Process(
+            target=broker_process,
+            args=(captcha_requests, captcha_responses, CAPSOLVER_API_KEY, CAPSOLVER_BASE_URL),
+            # Queue depth (owners left, plus poison pills) caps how far ahead the pool solves
+            kwargs={'use_token_pool': USE_TOKEN_POOL, 'work_queue': work_queue}
+        )
+        broker.start()
+        print(f"Started CAPTCHA Broker (PID: {broker.pid})")
+    
     # Start worker processes
     processes = []
     for i in range(NUM_PARALLEL_INSTANCES):
@@ -922,7 +940,8 @@ def main():
             target=worker_process,
             args=(i+1, work_queue, results_queue, stats_dict, stats_lock,
                   txt_file_lock, csv_file_lock, txt_output_file, csv_output_file,
-                  property_data_dict, HEADLESS_MODE, SLOW_MO, total_tasks)
+                  property_data_dict, HEADLESS_MODE, SLOW_MO, total_tasks,
+                  captcha_requests, captcha_responses)
         )
         p.start()
         processes.append(p)
@@ -940,6 +959,18 @@ def main():
     writer_process.join()
     print(f"Writer process has finished")
     
+    if broker:
+        captcha_requests.put(None)
+        broker.join()
+        print(f"CAPTCHA broker has finished")
+    
+    if WRITE_CAPTCHA_LOG:
+        # Encounter history across every run so far - solves per 100 searches before/after reuse
+        captcha_logs = [os.path.join(OUTPUT_FOLDER, f"captcha_worker_{i+1}.jsonl") for i in range(NUM_PARALLEL_INSTANCES)]
+        captcha_logs = [path for path in captcha_logs if os.path.exists(path)]
+        if captcha_logs:
+            print_summary(summarize_events(load_events(captcha_logs)))
+    
     overall_elapsed = time.time() - overall_start
     
     # Write final summary to TXT file
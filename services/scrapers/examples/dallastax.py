@@ -7,6 +7,12 @@ from multiprocessing import Manager, Queue, Lock
 from datetime import datetime
 import sys
 
+# Add project root to Python path (examples -> scrapers -> services -> root)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from services.scrapers.runtime import ManagedBrowser, RecyclePolicy
+
 # ============================================================================
 # CONFIGURATION SECTION
 # ============================================================================
@@ -30,6 +36,16 @@ OUTPUT_FOLDER = r"C:\Users\KISFECO\Documents\Real Estate Automations\tax"
 HEADLESS_MODE = True  # Set to False to see browsers (useful for debugging)
 SLOW_MO = 0  # Milliseconds delay between actions (0 = fastest, 500 = slower for debugging)
 
+# BROWSER RECYCLING (long runs grow Chromium memory until the host swaps)
+RECYCLE_POLICY = RecyclePolicy(
+    max_tasks_per_page=100,      # New tab every 100 owners
+    max_tasks_per_context=300,   # Fresh cookies/renderer every 300 owners
+    max_tasks_per_browser=1000,  # Relaunch Chromium every 1000 owners
+    max_js_heap_mb=256,          # ...or sooner if memory grows past these
+    max_browser_rss_mb=1500
+)
+WRITE_MEMORY_LOG = True  # Per-worker memory curve CSV in OUTPUT_FOLDER
+
 # ============================================================================
 # CORE SCRAPING FUNCTIONS (unchanged from original)
 # ============================================================================
@@ -304,8 +320,11 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
     print(f"[WORKER {worker_id}] Writing to shared file: {output_file}")
     
     with sync_playwright() as pw:
-        browser = pw.chromium.launch(headless=headless, slow_mo=slow_mo)
-        page = browser.new_page()
+        runtime = ManagedBrowser(
+            pw, RECYCLE_POLICY,
+            launch_kwargs={'headless': headless, 'slow_mo': slow_mo},
+            label=f"WORKER {worker_id}"
+        )
         
         # Continuously pull from queue until empty
         while True:
@@ -318,6 +337,7 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
                     break
                 
                 original_row, last_name, first_name = owner_data
+                page = runtime.page  # May be a fresh page after recycling
                 
                 # Update global stats
                 with stats_lock:
@@ -330,11 +350,10 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
                 print(f"[WORKER {worker_id}] Queue remaining: ~{work_queue.qsize()}")
                 print(f"[WORKER {worker_id}] {'='*80}")
                 
+                property_data = None
                 try:
                     property_data = search_and_extract(page, last_name, first_name)
                     
-                    local_processed += 1
-                    
                     if property_data:
                         local_qualified += 1
                         
@@ -367,45 +386,42 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
                             'row': original_row,
                             'data': property_data
                         })
-                    
-                    # Update global stats
-                    with stats_lock:
-                        stats_dict['completed'] += 1
-                        stats_dict['qualified'] += (1 if property_data else 0)
-                        stats_dict['in_progress'] -= 1
-                    
-                    # Progress update
-                    elapsed = time.time() - start_time
-                    rate = (local_processed / elapsed * 60) if elapsed > 0 else 0
-                    
-                    with stats_lock:
-                        global_completed = stats_dict['completed']
-                        global_qualified = stats_dict['qualified']
-                        qualification_rate = (global_qualified/global_completed*100) if global_completed > 0 else 0
-                    
-                    remaining = total_tasks - global_completed
-                    global_rate = (global_completed / elapsed * 60) if elapsed > 0 else 0
-                    eta_seconds = (remaining / global_rate * 60) if global_rate > 0 else 0
-                    
-                    print(f"\n[WORKER {worker_id}] Local: {local_processed} processed, {local_qualified} qualified")
-                    print(f"[WORKER {worker_id}] Local Rate: {rate:.2f} owners/min")
-                    print(f"[WORKER {worker_id}] GLOBAL: {global_completed}/{total_tasks} | "
-                          f"Qualified: {global_qualified} ({qualification_rate:.1f}%) | "
-                          f"Rate: {global_rate:.2f}/min | ETA: {eta_seconds/60:.1f}min\n")
                 
                 except Exception as e:
                     print(f"[WORKER {worker_id}] ✗ Error processing row {original_row}: {e}")
                     import traceback
                     traceback.print_exc()
-                    
+                
+                finally:
+                    # Exactly once per row, whether it succeeded or not
                     local_processed += 1
-                    
-                    # Update global stats
                     with stats_lock:
                         stats_dict['completed'] += 1
+                        stats_dict['qualified'] += (1 if property_data else 0)
                         stats_dict['in_progress'] -= 1
-                    
-                    continue
+                    try:
+                        runtime.task_done()
+                    except Exception as e:
+                        print(f"[WORKER {worker_id}] ✗ Browser recycle failed: {e}")
+                
+                # Progress update
+                elapsed = time.time() - start_time
+                rate = (local_processed / elapsed * 60) if elapsed > 0 else 0
+                
+                with stats_lock:
+                    global_completed = stats_dict['completed']
+                    global_qualified = stats_dict['qualified']
+                    qualification_rate = (global_qualified/global_completed*100) if global_completed > 0 else 0
+                
+                remaining = total_tasks - global_completed
+                global_rate = (global_completed / elapsed * 60) if elapsed > 0 else 0
+                eta_seconds = (remaining / global_rate * 60) if global_rate > 0 else 0
+                
+                print(f"\n[WORKER {worker_id}] Local: {local_processed} processed, {local_qualified} qualified")
+                print(f"[WORKER {worker_id}] Local Rate: {rate:.2f} owners/min")
+                print(f"[WORKER {worker_id}] GLOBAL: {global_completed}/{total_tasks} | "
+                      f"Qualified: {global_qualified} ({qualification_rate:.1f}%) | "
+                      f"Rate: {global_rate:.2f}/min | ETA: {eta_seconds/60:.1f}min\n")
             
             except multiprocessing.queues.Empty:
                 # Queue is empty, check if we're really done
@@ -418,13 +434,17 @@ def worker_process(worker_id, work_queue, results_queue, stats_dict, stats_lock,
                 print(f"[WORKER {worker_id}] Queue empty but work in progress elsewhere, waiting...")
                 continue
         
-        browser.close()
+        memory = runtime.summary()
+        if WRITE_MEMORY_LOG:
+            runtime.write_memory_log(os.path.join(OUTPUT_FOLDER, f"memory_worker_{worker_id}.csv"))
+        runtime.close()
     
     elapsed_total = time.time() - start_time
     
     print(f"\n[WORKER {worker_id}] {'='*80}")
     print(f"[WORKER {worker_id}] SHUTDOWN COMPLETE")
     print(f"[WORKER {worker_id}] Processed: {local_processed} | Qualified: {local_qualified}")
+    print(f"[WORKER {worker_id}] Recycles: {memory['recycles']} | Peak RSS: {memory['peak_rss_mb']}MB | Peak JS heap: {memory['peak_js_heap_mb']}MB")
     print(f"[WORKER {worker_id}] Time: {elapsed_total/60:.1f} minutes")
     print(f"[WORKER {worker_id}] {'='*80}\n")
     
@@ -0,0 +1,420 @@
+"""
+Scraper registry and shared worker runtime for generated scrapers
+
+Resolves (state, county, record_type) to scrapers/<state>/<county>/<record_type>.py,
+imports the module lazily, caches it, and invokes its search() on a pooled
+page so one worker process can serve any county without a subprocess per search.
+"""
+
+import sys
+import time
+import inspect
+import threading
+import importlib.util
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from services.scrapers.runtime import ManagedBrowser, RecyclePolicy
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent.resolve()
+SCRAPERS_DIR = PROJECT_ROOT / "scrapers"
+
+RECORD_TYPES = ['property', 'tax', 'probate', 'judgment']
+
+
+class ScraperNotFound(Exception):
+    """No generated scraper exists for the requested county/record type"""
+    pass
+
+
+def county_slug(county_name: str) -> str:
+    """Directory name used by agent.save_scraper()"""
+    return county_name.lower().replace(' ', '_')
+
+
+def scraper_key(state: str, county_name: str, record_type: str) -> Tuple[str, str, str]:
+    return state.lower(), county_slug(county_name), record_type
+
+
+class ScraperRegistry:
+    """
+    Lazy, cached loader for generated scrapers
+
+    Example:
+        registry = ScraperRegistry()
+        module = registry.load('TX', 'Harris', 'probate')
+        results = registry.invoke(module, page, 'John', 'Smith', death_date='2022-01-05')
+    """
+
+    def __init__(self, scrapers_dir: Path = SCRAPERS_DIR):
+        self.scrapers_dir = Path(scrapers_dir)
+        self._modules: Dict[Tuple, Tuple[object, float]] = {}  # key -> (module, mtime)
+        self._paths: Dict[Tuple, Path] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def register_path(self, state: str, county_name: str, record_type: str, path: str):
+        """Override the conventional location (e.g. from County.*_scraper_path)"""
+        self._paths[scraper_key(state, county_name, record_type)] = Path(path)
+
+    def register_county(self, county):
+        """Register every *_scraper_path recorded on a County row"""
+        for record_type in RECORD_TYPES:
+            path = getattr(county, f'{record_type}_scraper_path', None)
+            if path:
+                self.register_path(county.state, county.name, record_type, path)
+
+    def resolve(self, state: str, county_name: str, record_type: str) -> Path:
+        key = scraper_key(state, county_name, record_type)
+        path = self._paths.get(key)
+        if path is None or not path.exists():
+            path = self.scrapers_dir / key[0] / key[1] / f"{record_type}.py"
+        if not path.exists():
+            raise ScraperNotFound(f"No {record_type} scraper for {county_name}, {state} ({path})")
+        return path
+
+    def discover(self) -> List[Tuple[str, str, str]]:
+        """All (state, county_slug, record_type) scrapers present on disk"""
+        found = []
+        for path in sorted(self.scrapers_dir.glob('*/*/*.py')):
+            if path.stem in RECORD_TYPES:
+                found.append((path.parent.parent.name, path.parent.name, path.stem))
+        return found
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, state: str, county_name: str, record_type: str):
+        """Import the scraper module on first use; re-import if the file was regenerated"""
+        key = scraper_key(state, county_name, record_type)
+        path = self.resolve(state, county_name, record_type)
+        mtime = path.stat().st_mtime
+
+        with self._lock:
+            cached = self._modules.get(key)
+            if cached and cached[1] == mtime:
+                return cached[0]
+
+            module = self.load_path(path, f"scrapers.{key[0]}.{key[1]}.{record_type}")
+            self._modules[key] = (module, mtime)
+            if cached:
+                print(f"🔄 Reloaded regenerated scraper: {path}")
+            return module
+
+    @staticmethod
+    def load_path(path, module_name: str):
+        """Import a scraper file directly, uncached (used by the Scout test harness)"""
+        path = Path(path)
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            sys.modules.pop(module_name, None)
+            raise
+
+        if not hasattr(module, 'search'):
+            raise ScraperNotFound(f"{path} has no search() function")
+        return module
+
+    # ------------------------------------------------------------------
+    # Invocation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def accepts_page(module) -> bool:
+        """True if search() takes an injected page (current generation contract)"""
+        try:
+            params = inspect.signature(module.search).parameters
+        except (TypeError, ValueError):
+            return False
+        return 'page' in params
+
+    def invoke(self, module, page, first_name: str, last_name: str, death_date=None) -> List[Dict]:
+        """
+        Common calling convention for every generated scraper.
+        death_date is only passed to scrapers whose search() accepts it.
+
+        Scrapers generated before the page contract (search(first_name, last_name)
+        launching their own browser) run through LegacyPlaywrightAdapter, which
+        hands them the pooled page instead of a fresh Chromium.
+        """
+        params = inspect.signature(module.search).parameters
+        kwargs = {}
+        if 'death_date' in params and death_date is not None:
+            kwargs['death_date'] = death_date
+
+        if self.accepts_page(module):
+            return module.search(page=page, first_name=first_name, last_name=last_name, **kwargs)
+
+        with LegacyPlaywrightAdapter(module, page):
+            return module.search(first_name, last_name, **kwargs)
+
+
+# ============================================================================
+# LEGACY ADAPTER
+# ============================================================================
+
+class _BorrowedPage:
+    """Pooled page whose close() is a no-op - the runtime owns its lifetime"""
+
+    def __init__(self, page):
+        self._page = page
+
+    def close(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._page, name)
+
+
+class _BorrowedContext:
+    def __init__(self, page):
+        self._page = _BorrowedPage(page)
+
+    def new_page(self, *args, **kwargs):
+        return self._page
+
+    @property
+    def pages(self):
+        return [self._page]
+
+    def close(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._page._page.context, name)
+
+
+class _BorrowedBrowser:
+    def __init__(self, page):
+        self._context = _BorrowedContext(page)
+
+    def new_context(self, *args, **kwargs):
+        return self._context
+
+    def new_page(self, *args, **kwargs):
+        return self._context.new_page()
+
+    @property
+    def contexts(self):
+        return [self._context]
+
+    def close(self, *args, **kwargs):
+        pass
+
+    def is_connected(self):
+        return True
+
+
+class _BorrowedBrowserType:
+    def __init__(self, page):
+        self._browser = _BorrowedBrowser(page)
+
+    def launch(self, *args, **kwargs):
+        return self._browser
+
+    def launch_persistent_context(self, *args, **kwargs):
+        return self._browser.new_context()
+
+
+class _BorrowedPlaywright:
+    """Stands in for sync_playwright(): supports `with` and .start()/.stop()"""
+
+    def __init__(self, page):
+        browser_type = _BorrowedBrowserType(page)
+        self.chromium = self.firefox = self.webkit = browser_type
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+
+class LegacyPlaywrightAdapter:
+    """
+    Makes a legacy scraper module's sync_playwright "launch" the pooled page,
+    so old scrapers skip browser startup and don't nest a second Playwright
+    instance inside the worker's.
+
+    The module's sync_playwright is replaced once by a dispatcher that looks up
+    the calling thread's borrowed page (and falls back to the real one outside
+    an adapter), so the same legacy scraper can run in several threads at once.
+    """
+
+    _install_lock = threading.Lock()  # Only held while swapping the module global
+    _borrowed = threading.local()     # This thread's pages, innermost adapter last
+
+    def __init__(self, module, page):
+        self.module = module
+        self.page = page
+
+    @classmethod
+    def _dispatcher(cls, original):
+        def sync_playwright():
+            pages = getattr(cls._borrowed, 'pages', None)
+            if pages:
+                return _BorrowedPlaywright(pages[-1])
+            if original is None:
+                raise RuntimeError("sync_playwright() called outside a worker with no original to fall back to")
+            return original()
+
+        sync_playwright.borrowed_dispatcher = True
+        return sync_playwright
+
+    def __enter__(self):
+        with self._install_lock:
+            current = getattr(self.module, 'sync_playwright', None)
+            if not getattr(current, 'borrowed_dispatcher', False):
+                self.module.sync_playwright = self._dispatcher(current)
+        self._borrowed.pages = getattr(self._borrowed, 'pages', []) + [self.page]
+        return self
+
+    def __exit__(self, *exc):
+        self._borrowed.pages = self._borrowed.pages[:-1]
+        return False
+
+
+class ScraperWorker:
+    """
+    One worker that can serve any county. Launches one browser and keeps a
+    ManagedBrowser context per county in it (so cookies, session setup and
+    proxy requirements stay isolated), evicting the least recently used county
+    past max_counties. Counties that need a proxy get their contexts in a
+    second browser launched with the per-context proxy placeholder, so direct
+    contexts never inherit it.
+
+    The worker owns browser-level recycling: past policy.max_tasks_per_browser
+    searches, or when a runtime asks for it (RSS), it closes every county
+    context in that browser and relaunches it.
+
+    Example:
+        with sync_playwright() as p:
+            worker = ScraperWorker(p, proxy_pool=ProxyPool.from_env())
+            results = worker.search(county, 'probate', 'John', 'Smith', death_date='2022-01-05')
+            worker.close()
+    """
+
+    def __init__(self, playwright, registry: ScraperRegistry = None, policy: RecyclePolicy = None,
+                 launch_kwargs: Dict = None, proxy_pool=None, max_counties: int = 3,
+                 label: str = "WORKER"):
+        self.playwright = playwright
+        self.registry = registry or ScraperRegistry()
+        self.policy = policy or RecyclePolicy()
+        self.launch_kwargs = launch_kwargs or {'headless': True}
+        self.proxy_pool = proxy_pool
+        self.max_counties = max_counties
+        self.label = label
+        self._runtimes: 'OrderedDict[Tuple, ManagedBrowser]' = OrderedDict()
+        self._browsers = {}       # proxied (bool) -> Browser
+        self._browser_tasks = {}  # proxied (bool) -> searches since launch
+
+    def _browser_for(self, proxied: bool):
+        browser = self._browsers.get(proxied)
+        if browser is None or not browser.is_connected():
+            launch_kwargs = dict(self.launch_kwargs)
+            if proxied:
+                launch_kwargs.setdefault('proxy', {'server': 'per-context'})
+            browser = self._browsers[proxied] = self.playwright.chromium.launch(**launch_kwargs)
+            self._browser_tasks[proxied] = 0
+        return browser
+
+    def _relaunch_browser(self, proxied: bool, reason: str):
+        """Close every county context in the browser and the browser itself; the next search relaunches it"""
+        browser = self._browsers.pop(proxied, None)
+        print(f"[{self.label}] ♻️ Relaunching {'proxied ' if proxied else ''}browser ({reason})")
+        for key, runtime in list(self._runtimes.items()):
+            if runtime.shared_browser is browser:
+                runtime.close()
+                del self._runtimes[key]
+        try:
+            if browser:
+                browser.close()
+        except Exception:
+            pass
+
+    def _runtime_for(self, county, record_type: str) -> ManagedBrowser:
+        key = scraper_key(county.state, county.name, record_type)
+        runtime = self._runtimes.get(key)
+        if runtime and not runtime.shared_browser.is_connected():
+            runtime.close()  # Browser crashed - reopen the county in a fresh one
+            del self._runtimes[key]
+            runtime = None
+        if runtime:
+            self._runtimes.move_to_end(key)
+            return runtime
+
+        while len(self._runtimes) >= self.max_counties:
+            _, evicted = self._runtimes.popitem(last=False)
+            evicted.close()
+
+        requirements = None
+        if self.proxy_pool:
+            from services.proxy.pool import ProxyRequirements
+            requirements = ProxyRequirements.from_county(county, record_type)
+        proxied = bool(self.proxy_pool and requirements and requirements.requires_proxy)
+
+        runtime = ManagedBrowser(
+            self.playwright, self.policy,
+            launch_kwargs=self.launch_kwargs,
+            label=f"{self.label} {county.name} {record_type}",
+            proxy_pool=self.proxy_pool,
+            proxy_requirements=requirements,
+            browser=self._browser_for(proxied)
+        )
+        self._runtimes[key] = runtime
+        return runtime
+
+    def search(self, county, record_type: str, first_name: str, last_name: str, death_date=None) -> List[Dict]:
+        """Run the county's generated scraper on a pooled page"""
+        self.registry.register_county(county)
+        module = self.registry.load(county.state, county.name, record_type)
+        runtime = self._runtime_for(county, record_type)
+
+        start = time.time()
+        success = False
+        try:
+            results = self.registry.invoke(module, runtime.page, first_name, last_name, death_date)
+            success = True
+            return results
+        finally:
+            runtime.report_result(success, time.time() - start)
+            runtime.task_done()
+            self._browser_done(runtime)
+
+    def _browser_done(self, runtime: ManagedBrowser):
+        """Count the search against the shared browser and relaunch it if it's due"""
+        proxied = runtime.uses_proxy
+        if self._browsers.get(proxied) is not runtime.shared_browser:
+            return
+        self._browser_tasks[proxied] += 1
+        reason = runtime.browser_recycle_requested
+        limit = self.policy.max_tasks_per_browser
+        if not reason and limit and self._browser_tasks[proxied] >= limit:
+            reason = f"{self._browser_tasks[proxied]} tasks on browser"
+        if reason:
+            self._relaunch_browser(proxied, reason)
+
+    def close(self):
+        for runtime in self._runtimes.values():
+            runtime.close()
+        self._runtimes.clear()
+        for browser in self._browsers.values():
+            try:
+                browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
@@ -0,0 +1,333 @@
+"""
+Shared Playwright runtime for long-running scraper workers
+Recycles the page, context or browser once task-count or memory thresholds
+are crossed, re-applying the worker's session setup each time
+"""
+
+import time
+import csv
+from typing import Callable, Dict, List, Optional
+
+try:
+    import psutil  # Optional: browser RSS tracking
+except ImportError:
+    psutil = None
+
+
+class RecyclePolicy:
+    """
+    Thresholds that trigger recycling. Use None to disable a limit.
+
+    Levels, cheapest first:
+        page    - close the tab, open a new one in the same context
+        context - drop cookies/storage/renderer, new context + page
+        browser - relaunch Chromium (the only way to return RSS to the OS)
+
+    A context marked verified (it has passed a CAPTCHA) keeps its cookies for up
+    to max_tasks_per_verified_context tasks, and JS-heap pressure only recycles
+    its page, so the session isn't thrown away with the challenge it earned.
+    """
+
+    def __init__(self,
+                 max_tasks_per_page: Optional[int] = 100,
+                 max_tasks_per_context: Optional[int] = 300,
+                 max_tasks_per_browser: Optional[int] = 1000,
+                 max_js_heap_mb: Optional[float] = 256,
+                 max_browser_rss_mb: Optional[float] = 1500,
+                 max_tasks_per_verified_context: Optional[int] = None,
+                 check_every: int = 5):
+        self.max_tasks_per_page = max_tasks_per_page
+        self.max_tasks_per_context = max_tasks_per_context
+        self.max_tasks_per_browser = max_tasks_per_browser
+        self.max_js_heap_mb = max_js_heap_mb
+        self.max_browser_rss_mb = max_browser_rss_mb
+        self.max_tasks_per_verified_context = max_tasks_per_verified_context
+        self.check_every = max(1, check_every)
+
+
+class ManagedBrowser:
+    """
+    Owns one browser -> context -> page chain for a worker and recycles it
+    according to a RecyclePolicy.
+
+    Given a shared browser, it owns only the context and page: it never
+    launches or closes that browser, leaves max_tasks_per_browser to the
+    browser's owner, and turns a browser-level recycle (RSS) into a context
+    recycle plus browser_recycle_requested for the owner to act on.
+
+    Example:
+        with sync_playwright() as p:
+            runtime = ManagedBrowser(p, RecyclePolicy(), launch_kwargs={'headless': True},
+                                     setup=setup_search_page)
+            for task in tasks:
+                do_search(runtime.page, task)
+                runtime.task_done()
+            runtime.close()
+    """
+
+    def __init__(self, playwright, policy: RecyclePolicy = None,
+                 launch_kwargs: Dict = None, context_kwargs: Dict = None,
+                 setup: Callable = None, label: str = "RUNTIME",
+                 proxy_pool=None, proxy_requirements=None, browser=None):
+        """
+        Args:
+            playwright: Object returned by sync_playwright().start() / the with-block
+            policy: RecyclePolicy (defaults used if None)
+            launch_kwargs: Passed to chromium.launch()
+            context_kwargs: Passed to browser.new_context()
+            setup: Callable(page) run on every fresh page (login, search filters, etc.)
+            label: Prefix for log lines, e.g. "WORKER 3"
+            proxy_pool: Optional services.proxy.pool.ProxyPool
+            proxy_requirements: ProxyRequirements for the county being scraped
+            browser: Already-launched browser to open contexts in (shared with other
+                runtimes; launch it with the per-context proxy placeholder if uses_proxy)
+        """
+        self.playwright = playwright
+        self.policy = policy or RecyclePolicy()
+        self.launch_kwargs = dict(launch_kwargs or {})
+        self.context_kwargs = context_kwargs or {}
+        self.setup = setup
+        self.label = label
+        self.proxy_pool = proxy_pool
+        self.proxy_requirements = proxy_requirements
+        self.shared_browser = browser
+        self.browser_recycle_requested = None  # Reason, when a shared browser should be relaunched
+
+        if self.uses_proxy and 'proxy' not in self.launch_kwargs and browser is None:
+            # Chromium needs a launch-level placeholder to allow per-context proxies.
+            # Only set it when contexts will get a real proxy: a context created
+            # without one would inherit the placeholder and fail to connect.
+            self.launch_kwargs['proxy'] = {'server': 'per-context'}
+
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.proxy = None
+        self._cdp = None
+
+        self.context_id = 0          # Increments on every new context (telemetry key)
+        self.context_verified = False
+
+        self.total_tasks = 0
+        self.page_tasks = 0
+        self.context_tasks = 0
+        self.browser_tasks = 0
+        self.recycles = {'page': 0, 'context': 0, 'browser': 0}
+
+        # One row per memory check: the data behind the memory curve report
+        self.memory_samples: List[Dict] = []
+        self._started = time.time()
+
+        self._launch_browser()
+
+    @property
+    def uses_proxy(self) -> bool:
+        """True when contexts are routed through the pool (the county requires a proxy)"""
+        return bool(self.proxy_pool and self.proxy_requirements and self.proxy_requirements.requires_proxy)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _launch_browser(self):
+        if self.shared_browser is not None:
+            self.browser = self.shared_browser
+        else:
+            self.browser = self.playwright.chromium.launch(**self.launch_kwargs)
+        self.browser_tasks = 0
+        self._new_context()
+
+    def _new_context(self):
+        context_kwargs = dict(self.context_kwargs)
+        if self.proxy_pool:
+            self.proxy_pool.release(self.proxy)
+            self.proxy = self.proxy_pool.acquire(self.proxy_requirements)
+            context_kwargs.update(self.proxy_pool.context_options(self.proxy))
+
+        self.context = self.browser.new_context(**context_kwargs)
+        self.context_tasks = 0
+        self.context_id += 1
+        self.context_verified = False
+        self._new_page()
+
+    def _new_page(self):
+        self.page = self.context.new_page()
+        self.page_tasks = 0
+        self._cdp = None
+        if self.setup:
+            self.setup(self.page)
+
+    def _safe_close(self, obj):
+        try:
+            if obj:
+                obj.close()
+        except Exception:
+            pass
+
+    def recycle(self, level: str, reason: str = ""):
+        """Recreate the page, context or browser and re-run setup"""
+        if level == 'browser' and self.shared_browser is not None:
+            # Other runtimes have contexts in this browser - start over in a new context and
+            # leave the relaunch to the browser's owner
+            self.browser_recycle_requested = reason
+            level = 'context'
+        print(f"[{self.label}] ♻️ Recycling {level} after {self.total_tasks} tasks ({reason})")
+
+        try:
+            if level == 'page':
+                self._safe_close(self.page)
+                self._new_page()
+            elif level == 'context':
+                self._safe_close(self.context)
+                self._new_context()
+            else:
+                self._safe_close(self.browser)
+                self._launch_browser()
+        except Exception as e:
+            if level == 'browser' or self.shared_browser is not None:
+                raise
+            # Setup failed on a partial recycle - start over from a clean browser
+            print(f"[{self.label}] ⚠️ {level} recycle failed ({e}), relaunching browser")
+            self._safe_close(self.browser)
+            self._launch_browser()
+            level = 'browser'
+
+        self.recycles[level] += 1
+
+    def close(self):
+        self._safe_close(self.context if self.shared_browser is not None else self.browser)
+        if self.proxy_pool:
+            self.proxy_pool.release(self.proxy)
+        self.browser = self.context = self.page = self.proxy = None
+
+    def mark_verified(self):
+        """The current context passed a CAPTCHA - prefer keeping it (see RecyclePolicy)"""
+        self.context_verified = True
+
+    def report_result(self, success: bool, latency: float = None, banned: bool = False):
+        """
+        Feed one search outcome to the proxy pool. If that retires the
+        context's proxy, switch to a new context (and proxy) right away.
+        """
+        if not self.proxy_pool:
+            return
+        self.proxy_pool.report(self.proxy, self.proxy_requirements, success, latency, banned)
+        if self.proxy is not None and self.proxy.retired:
+            self.recycle('context', f"proxy {self.proxy.label} retired")
+
+    # ------------------------------------------------------------------
+    # Memory tracking
+    # ------------------------------------------------------------------
+
+    def js_heap_mb(self) -> Optional[float]:
+        """JS heap used by the current page's context, via CDP"""
+        try:
+            if self._cdp is None:
+                self._cdp = self.context.new_cdp_session(self.page)
+                self._cdp.send('Performance.enable')
+            metrics = self._cdp.send('Performance.getMetrics')['metrics']
+            for metric in metrics:
+                if metric['name'] == 'JSHeapUsedSize':
+                    return metric['value'] / (1024 * 1024)
+        except Exception:
+            self._cdp = None
+        return None
+
+    def browser_rss_mb(self) -> Optional[float]:
+        """
+        Resident memory of every process this worker spawned (driver + Chromium).
+        Each worker process owns exactly one browser, so this is per-browser RSS.
+        """
+        if psutil is None:
+            return None
+        try:
+            children = psutil.Process().children(recursive=True)
+            total = 0
+            for child in children:
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+
+    def sample_memory(self, action: str = "") -> Dict:
+        sample = {
+            'elapsed_s': round(time.time() - self._started, 1),
+            'tasks': self.total_tasks,
+            'js_heap_mb': self.js_heap_mb(),
+            'browser_rss_mb': self.browser_rss_mb(),
+            'action': action
+        }
+        self.memory_samples.append(sample)
+        return sample
+
+    # ------------------------------------------------------------------
+    # Policy
+    # ------------------------------------------------------------------
+
+    def task_done(self):
+        """Call after every task. Recycles if any threshold is crossed."""
+        self.total_tasks += 1
+        self.page_tasks += 1
+        self.context_tasks += 1
+        self.browser_tasks += 1
+
+        policy = self.policy
+
+        # Task-count limits are free to check, so check them every time
+        if (policy.max_tasks_per_browser and self.shared_browser is None and
+                self.browser_tasks >= policy.max_tasks_per_browser):
+            self.sample_memory('browser:tasks')
+            self.recycle('browser', f"{self.browser_tasks} tasks on browser")
+            return
+        context_limit = policy.max_tasks_per_context
+        if self.context_verified and policy.max_tasks_per_verified_context:
+            context_limit = policy.max_tasks_per_verified_context
+        if context_limit and self.context_tasks >= context_limit:
+            self.sample_memory('context:tasks')
+            self.recycle('context', f"{self.context_tasks} tasks on context")
+            return
+        if policy.max_tasks_per_page and self.page_tasks >= policy.max_tasks_per_page:
+            self.sample_memory('page:tasks')
+            self.recycle('page', f"{self.page_tasks} tasks on page")
+            return
+
+        # Memory checks cost a CDP round trip + process scan, so sample periodically
+        if self.total_tasks % policy.check_every != 0:
+            return
+
+        sample = self.sample_memory()
+        rss = sample['browser_rss_mb']
+        heap = sample['js_heap_mb']
+
+        if policy.max_browser_rss_mb and rss is not None and rss >= policy.max_browser_rss_mb:
+            sample['action'] = 'browser:rss'
+            self.recycle('browser', f"RSS {rss:.0f}MB")
+        elif policy.max_js_heap_mb and heap is not None and heap >= policy.max_js_heap_mb:
+            level = 'page' if self.context_verified else 'context'
+            sample['action'] = f'{level}:heap'
+            self.recycle(level, f"JS heap {heap:.0f}MB")
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict:
+        rss_values = [s['browser_rss_mb'] for s in self.memory_samples if s['browser_rss_mb'] is not None]
+        heap_values = [s['js_heap_mb'] for s in self.memory_samples if s['js_heap_mb'] is not None]
+        return {
+            'tasks': self.total_tasks,
+            'recycles': dict(self.recycles),
+            'peak_rss_mb': round(max(rss_values), 1) if rss_values else None,
+            'peak_js_heap_mb': round(max(heap_values), 1) if heap_values else None,
+            'samples': len(self.memory_samples)
+        }
+
+    def write_memory_log(self, filepath: str):
+        """Write the memory curve as CSV (elapsed_s, tasks, js_heap_mb, browser_rss_mb, action)"""
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['elapsed_s', 'tasks', 'js_heap_mb', 'browser_rss_mb', 'action'])
+            writer.writeheader()
+            writer.writerows(self.memory_samples)